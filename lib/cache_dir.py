@@ -0,0 +1,18 @@
+"""Location of the app's on-disk caches (model metadata, responses, indexes)."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+__all__ = ["cache_path"]
+
+HERE = Path(__file__).parent.parent
+
+CACHE_DIR = Path(os.environ.get("STARTERAPP_CACHE_DIR", HERE / ".cache"))
+
+
+def cache_path(*parts: str) -> Path:
+    """Return a path below the cache directory, creating parent folders."""
+    path = CACHE_DIR.joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
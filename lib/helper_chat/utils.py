@@ -19,12 +19,14 @@ def generate_chat_response(model, messages, temperature=0.7, stream=False):
         If stream=True, returns generator for streaming chunks
     """
     try:
-        import ollama
+        from lib.helper_ollama import chat
         
-        response = ollama.chat(
-            model=model,
-            messages=messages,
+        # Chat is interactive: it is sent ahead of queued batch requests
+        response = chat(
+            model,
+            messages,
             stream=stream,
+            priority='interactive',
             options={'temperature': temperature}
         )
         
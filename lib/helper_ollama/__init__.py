@@ -5,9 +5,42 @@ This module provides functions to discover and filter locally installed Ollama m
 by function type: embedding, tools, vision, thinking, and chat.
 """
 
-import ollama as o
-
-OLLAMA = "http://localhost:11434"
+from lib.cache_dir import cache_path
+from lib.lazy import lazy_exports, lazy_import
+
+from .capabilities import CAPABILITIES, CapabilityIndex, capabilities_from_name, capabilities_from_show
+from .registry import ModelRegistry
+from .residency import DEFAULT_MAX_LOADED, ModelRouter
+from .scheduler import PRIORITIES, current_priority, get_scheduler, request_priority
+from .singleflight import SingleFlight
+from .response_cache import (
+    ResponseCache,
+    as_record,
+    default_max_bytes,
+    is_cacheable,
+    make_key,
+    record_stream,
+    replay_stream,
+)
+from .transport import OLLAMA_HOST, get_client, get_json, post_json
+
+OLLAMA = OLLAMA_HOST
+
+# The ollama SDK and the async layer load on first use, so pages that only
+# import helper_ollama (e.g. for a model list) start without them.
+o = lazy_import("ollama")
+__getattr__ = lazy_exports(__name__, {
+    "achat": ".aio",
+    "aembed": ".aio",
+    "agenerate": ".aio",
+    "astream_chat": ".aio",
+    "astream_generate": ".aio",
+    "gather_bounded": ".aio",
+    "run_async": ".aio",
+    "submit": ".aio",
+    "aembed_many": ".embed",
+    "embed_many": ".embed",
+})
 
 
 def check_ollama_status():
@@ -18,7 +51,7 @@ def check_ollama_status():
         dict: Status information with keys 'status', 'message', and 'models'
     """
     try:
-        models = o.list().models
+        models = get_client().list().models
         
         return {
             'status': 'success',
@@ -48,9 +81,7 @@ def get_available_models():
         list: List of model names, or empty list if error
     """
     try:
-        import ollama
-        models = ollama.list().models
-        return [model['model'] for model in models]
+        return _registry.names()
     except Exception as _:
         return []
 
@@ -83,165 +114,117 @@ def get_local_llms(func=None):
     """
     
     # Validate input
-    valid_functions = ["embedding", "tools", "vision", "thinking", "chat"]
+    valid_functions = list(CAPABILITIES)
     if func and func not in valid_functions:
         raise ValueError(f"Invalid func: {func}. Must be one of {valid_functions} or None")
     
     try:
-        # Get all installed models from Ollama using direct function
-        response = o.list()
-        all_models = response.get("models", [])
-        
-        # Filter models based on function
-        filtered_models = []
-        
-        for model in all_models:
-            model_name = getattr(model, 'model', '')
-            model_name_lower = model_name.lower()
-            
-            # Detect capabilities
-            capabilities = _detect_model_capabilities(model_name_lower)
-            
-            model_info = {
-                "name": model_name,
-                "size": getattr(model, 'size', 0),
-                "modified_at": getattr(model, 'modified_at', ''),
-                "digest": getattr(model, 'digest', ''),
-                "details": getattr(model, 'details', {}),
-                "capabilities": capabilities
-            }
-            
-            # Filter by function if specified
-            if func is None:
-                # Return all models with their capabilities
-                filtered_models.append(model_info)
-            elif func in capabilities:
-                # Return only models that support the specified function
-                filtered_models.append(model_info)
-        
-        return filtered_models
-        
+        # Served from the shared registry; only hits /api/tags when the TTL expired
+        all_models = _registry.models()
     except Exception as e:
         raise Exception(f"Failed to connect to Ollama or process models: {e}")
 
+    if func is None:
+        # Return all models with their capabilities
+        return all_models
 
-def _detect_model_capabilities(model_name_lower):
-    """
-    Detect the capabilities of a model based on its name.
-    
-    Args:
-        model_name_lower: Lowercase model name
-        
-    Returns:
-        List of capabilities the model supports
-    """
-    capabilities = []
-    
-    # Check for embedding capabilities
-    if _supports_embedding(model_name_lower):
-        capabilities.append("embedding")
-    
-    # Check for vision capabilities
-    if _supports_vision(model_name_lower):
-        capabilities.append("vision")
-    
-    # Check for tool/function calling capabilities
-    if _supports_tools(model_name_lower):
-        capabilities.append("tools")
-    
-    # Check for thinking/reasoning capabilities
-    if _supports_thinking(model_name_lower):
-        capabilities.append("thinking")
-    
-    # Check for general chat capabilities (most models)
-    if _supports_chat(model_name_lower):
-        capabilities.append("chat")
-    
-    return capabilities
+    # Return only models that support the specified function
+    return [model for model in all_models if func in model["capabilities"]]
 
 
-def _supports_embedding(model_name_lower):
-    """Check if model supports text embedding."""
-    embedding_indicators = [
-        "embed", "embedding", "nomic-embed", "bge", "sentence", 
-        "all-minilm", "e5", "gte", "multilingual-e5", "paraphrase",
-        "text-embedding", "instructor", "thenlper"
+def _fetch_models():
+    """Fetch the raw model list from the Ollama server (one /api/tags call)."""
+    response = get_client().list()
+
+    return [
+        {
+            "name": getattr(model, 'model', ''),
+            "size": getattr(model, 'size', 0),
+            "modified_at": getattr(model, 'modified_at', ''),
+            "digest": getattr(model, 'digest', ''),
+            "details": getattr(model, 'details', {}),
+        }
+        for model in response.get("models", [])
     ]
-    return any(indicator in model_name_lower for indicator in embedding_indicators)
 
 
-def _supports_vision(model_name_lower):
-    """Check if model supports vision/image processing."""
-    vision_indicators = [
-        "vision", "llava", "bakllava", "moondream", "cogvlm", 
-        "qwen-vl", "qwen2-vl", "internvl", "minicpm-v", "yi-vl", 
-        "deepseek-vl", "blip", "clip", "fuyu", "kosmos", "flamingo",
-        "otter", "minigpt", "instructblip", "lynx", "idefics"
-    ]
-    return any(indicator in model_name_lower for indicator in vision_indicators)
+def _describe_model(model_info):
+    """Add derived fields to a registry entry; runs once per model digest."""
+    model_info["capabilities"] = _capability_index.capabilities(
+        model_info["name"], model_info["digest"]
+    )
+    return model_info
 
 
-def _supports_tools(model_name_lower):
-    """Check if model supports tool/function calling."""
-    # Tool calling models often have specific naming or are known capable models
-    tool_indicators = [
-        "function", "tool", "agent", "hermes", "mixtral", "command",
-        "gorilla", "toolformer", "react", "planning"
-    ]
-    
-    # Known models that support function calling
-    known_tool_models = [
-        "llama3", "llama3.1", "llama3.2", "mistral", "mixtral", 
-        "qwen", "yi", "deepseek", "phi"
-    ]
-    
-    return (any(indicator in model_name_lower for indicator in tool_indicators) or
-            any(known in model_name_lower for known in known_tool_models))
+_capability_index = CapabilityIndex(
+    cache_path("ollama", "capabilities.json"), show=lambda name: get_client().show(name)
+)
+_registry = ModelRegistry(fetch=_fetch_models, enrich=_describe_model)
+_single_flight = SingleFlight()
+_response_cache = ResponseCache(
+    cache_path("ollama", "responses.sqlite3"), max_bytes=default_max_bytes()
+)
 
 
-def _supports_thinking(model_name_lower):
-    """Check if model supports reasoning/thinking capabilities."""
-    thinking_indicators = [
-        "reasoning", "thinking", "o1", "r1", "chain", "cot", 
-        "reason", "logic", "math", "solver", "step", "thought"
-    ]
-    
-    # Known thinking/reasoning models
-    known_thinking_models = [
-        "deepseek-r1", "qwen-reasoning", "o1", "reasoning"
-    ]
-    
-    return (any(indicator in model_name_lower for indicator in thinking_indicators) or
-            any(known in model_name_lower for known in known_thinking_models))
+def _load_model(model_name, keep_alive):
+    # A request without input loads the model (keep_alive=0 unloads it).
+    payload = {"model": model_name}
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    if "embedding" in capabilities_from_name(model_name):
+        post_json("/api/embed", {**payload, "input": []})
+    else:
+        post_json("/api/generate", payload)
 
 
-def _supports_chat(model_name_lower):
-    """Check if model supports general chat/conversation."""
-    # Most models support chat unless they're specialized
-    specialized_only = ["embed", "embedding", "bge", "sentence", "nomic-embed"]
-    
-    # If it's a specialized embedding model, it doesn't support chat
-    if any(indicator in model_name_lower for indicator in specialized_only):
-        return False
-    
-    # General chat indicators (most language models)
-    chat_indicators = [
-        "llama", "mistral", "codellama", "dolphin", "orca", "vicuna", 
-        "alpaca", "wizard", "openchat", "neural", "chat", "instruct",
-        "qwen", "yi", "deepseek", "phi", "gemma", "solar", "claude",
-        "gpt", "falcon", "mpt", "bloom", "opt", "pythia", "stablelm"
-    ]
+_router = ModelRouter(
+    ps=lambda: get_json("/api/ps"), load=_load_model, max_loaded=DEFAULT_MAX_LOADED
+)
+_scheduler = get_scheduler()
+
+
+def get_model_registry():
+    """
+    Return the process-wide model registry shared by all model lists and selectors.
+
+    Use ``get_model_registry().ttl = 60`` to change the cache lifetime or
+    ``get_model_registry().invalidate()`` after pulling or deleting a model.
+    """
+    return _registry
+
+
+def _detect_model_capabilities(model_name_lower):
+    """
+    Guess the capabilities of a model from its name.
+
+    Only used when the server cannot describe the model; see
+    ``capabilities.capabilities_from_name``.
     
-    return any(indicator in model_name_lower for indicator in chat_indicators)
+    Args:
+        model_name_lower: Lowercase model name
+        
+    Returns:
+        List of capabilities the model supports
+    """
+    return capabilities_from_name(model_name_lower)
 
 
 def get_model_info(model_name):
     """Get detailed information about a specific model."""
     try:
-        response = o.show(model_name)
+        response = get_client().show(model_name)
         
-        # Add capability detection
-        capabilities = _detect_model_capabilities(model_name.lower())
+        # Capabilities from the show metadata, remembered for the model digest
+        capabilities = capabilities_from_show(response)
+        if capabilities is None:
+            capabilities = _detect_model_capabilities(model_name.lower())
+        else:
+            try:
+                cached = _registry.get(model_name)
+            except Exception:
+                cached = None
+            if cached is not None:
+                _capability_index.remember(model_name, cached["digest"], capabilities)
         
         # Create enhanced response
         enhanced_response = {
@@ -261,7 +244,7 @@ def get_model_info(model_name):
 
 
 def list_models_by_capability():
-    """Get models organized by capability."""
+    """Get models organized by capability (served from the cached capability index)."""
     try:
         all_models = get_local_llms()
         
@@ -302,29 +285,225 @@ def list_models_by_capability():
         }
 
 
-def generate(model_name, prompt, stream=False, **kwargs):
-    """Generate text using a specific model."""
+def _model_digest(model_name):
+    """Return the digest of an installed model, or "" if it is unknown."""
     try:
-        response = o.generate(
-            model=model_name,
-            prompt=prompt,
+        entry = _registry.get(model_name)
+        if entry is None and ":" not in model_name:
+            entry = _registry.get(f"{model_name}:latest")
+    except Exception:
+        return ""
+    return entry["digest"] if entry else ""
+
+
+def get_response_cache():
+    """Return the persistent response cache used by generate/chat (see ``stats()``)."""
+    return _response_cache
+
+
+def get_single_flight():
+    """Return the single-flight layer that coalesces identical in-flight requests."""
+    return _single_flight
+
+
+def get_model_router():
+    """
+    Return the router that groups requests by model and tracks resident models.
+
+    Use ``get_model_router().set_keep_alive("llama3", "30m")`` to keep a model
+    loaded longer, ``resident()`` for the models in memory and ``stats()`` for
+    queued requests and model switches.
+    """
+    return _router
+
+
+def preload_model(model_name, keep_alive=None, wait=False):
+    """
+    Load a model in the background so the first request does not wait for it.
+
+    Args:
+        model_name: Model to load
+        keep_alive: Optional keep_alive for this model (e.g. "30m", -1 for forever)
+        wait: Block until the model is loaded
+
+    Returns:
+        bool: True if a load was started, False if the model is already resident
+    """
+    return _router.preload(model_name, keep_alive=keep_alive, wait=wait)
+
+
+def unload_model(model_name):
+    """Free the memory of a loaded model."""
+    try:
+        _router.unload(model_name)
+    except Exception as e:
+        raise Exception(f"Failed to unload {model_name}: {e}")
+
+
+def show_model(model_name):
+    """Return the server's description of a model (modelfile, parameters, details)."""
+    try:
+        return get_client().show(model_name)
+    except Exception as e:
+        raise Exception(f"Failed to show {model_name}: {e}")
+
+
+def pull_model(model_name):
+    """Download a model and refresh the shared model list."""
+    try:
+        response = get_client().pull(model_name)
+    except Exception as e:
+        raise Exception(f"Failed to pull {model_name}: {e}")
+    _registry.invalidate()
+    return response
+
+
+def delete_model(model_name):
+    """Delete a model from the server and refresh the shared model list."""
+    try:
+        response = get_client().delete(model_name)
+    except Exception as e:
+        raise Exception(f"Failed to delete {model_name}: {e}")
+    _registry.invalidate()
+    return response
+
+
+def _with_keep_alive(model_name, kwargs):
+    keep_alive = _router.keep_alive_for(model_name)
+    if keep_alive is not None and "keep_alive" not in kwargs:
+        kwargs = {**kwargs, "keep_alive": keep_alive}
+    return kwargs
+
+
+def _request_key(kind, model_name, payload):
+    """Return ``(digest, key)`` of a request; the key is only cacheable with a digest."""
+    digest = _model_digest(model_name)
+    return digest, make_key(kind, model_name, digest, payload)
+
+
+def cached_request(kind, model_name, payload, call, stream=False, cache=None, coalesce=True, priority=None):
+    """
+    Run ``call()`` through the response cache, the single-flight layer, the
+    model router and the priority scheduler.
+
+    Args:
+        kind: "generate" or "chat"
+        model_name: Model name
+        payload: Request arguments that determine the output (prompt/messages, options, ...)
+        call: Zero-argument callable performing the real request
+        stream: Whether ``call()`` returns a stream of chunks
+        cache: True/False to force caching on/off; None caches deterministic
+               requests only (temperature 0 or a fixed seed)
+        coalesce: Share one upstream call between identical concurrent requests
+        priority: "interactive", "standard" or "bulk"; defaults to the
+                  surrounding ``request_priority`` block
+
+    Returns:
+        The upstream response, or on a cache hit the cached response as a dict
+        (replayed as a stream of dict chunks when ``stream`` is True).
+    """
+    # Captured here: the upstream call may run on the single-flight thread.
+    context_priority, session = current_priority()
+    priority = priority or context_priority
+
+    def routed():
+        # Wait for the model's turn first, then for a server slot by priority:
+        # a request parked at the router must not hold one of the server slots.
+        if stream:
+            return _router.stream(model_name, lambda: _scheduler.stream(priority, session, call))
+        return _router.run(model_name, lambda: _scheduler.run(priority, session, call))
+
+    use_cache = is_cacheable(payload.get("options"), cache)
+    if not use_cache and not coalesce:
+        return routed()
+
+    digest, key = _request_key(kind, model_name, payload)
+
+    upstream = routed
+    if use_cache and digest:
+        record = _response_cache.get(key)
+        if record is not None:
+            return replay_stream(record, kind) if stream else record
+
+        if stream:
+            def upstream():
+                return record_stream(routed(), kind, lambda rec: _response_cache.put(key, rec))
+        else:
+            def upstream():
+                response = routed()
+                _response_cache.put(key, as_record(response))
+                return response
+
+    if not coalesce:
+        return upstream()
+    if stream:
+        return _single_flight.stream(key, upstream)
+    return _single_flight.do(key, upstream)
+
+
+def generate(model_name, prompt, stream=False, cache=None, coalesce=True, priority=None, **kwargs):
+    """
+    Generate text using a specific model.
+
+    Identical concurrent requests share one upstream generation
+    (``coalesce=False`` opts out); see ``cached_request`` for ``cache`` and
+    ``priority``.
+    """
+    kwargs = _with_keep_alive(model_name, kwargs)
+    try:
+        response = cached_request(
+            "generate",
+            model_name,
+            {"prompt": prompt, **kwargs},
+            lambda: get_client().generate(
+                model=model_name,
+                prompt=prompt,
+                stream=stream,
+                **kwargs
+            ),
             stream=stream,
-            **kwargs
+            cache=cache,
+            coalesce=coalesce,
+            priority=priority,
         )
+        if isinstance(response, dict):
+            return o.GenerateResponse(**response)
+        if stream:
+            return (o.GenerateResponse(**part) if isinstance(part, dict) else part for part in response)
         return response
     except Exception as e:
         raise Exception(f"Failed to generate with {model_name}: {e}")
 
 
-def chat(model_name, messages, stream=False, **kwargs):
-    """Chat with a model."""
+def chat(model_name, messages, stream=False, cache=None, coalesce=True, priority=None, **kwargs):
+    """
+    Chat with a model.
+
+    Identical concurrent requests share one upstream generation
+    (``coalesce=False`` opts out); see ``cached_request`` for ``cache`` and
+    ``priority``.
+    """
+    kwargs = _with_keep_alive(model_name, kwargs)
     try:
-        response = o.chat(
-            model=model_name,
-            messages=messages,
+        response = cached_request(
+            "chat",
+            model_name,
+            {"messages": messages, **kwargs},
+            lambda: get_client().chat(
+                model=model_name,
+                messages=messages,
+                stream=stream,
+                **kwargs
+            ),
             stream=stream,
-            **kwargs
+            cache=cache,
+            coalesce=coalesce,
+            priority=priority,
         )
+        if isinstance(response, dict):
+            return o.ChatResponse(**response)
+        if stream:
+            return (o.ChatResponse(**part) if isinstance(part, dict) else part for part in response)
         return response
     except Exception as e:
         raise Exception(f"Failed to chat with {model_name}: {e}")
@@ -333,7 +512,7 @@ def chat(model_name, messages, stream=False, **kwargs):
 def embeddings(model_name, text, **kwargs):
     """Generate embeddings using an embedding model."""
     try:
-        response = o.embeddings(
+        response = get_client().embeddings(
             model=model_name,
             prompt=text,
             **kwargs
@@ -346,9 +525,32 @@ def embeddings(model_name, text, **kwargs):
 # Export main functions
 __all__ = [
     "get_local_llms",
+    "get_model_registry",
     "get_model_info",
     "list_models_by_capability",
     "generate",
     "chat",
-    "embeddings"
+    "cached_request",
+    "get_response_cache",
+    "get_single_flight",
+    "get_model_router",
+    "get_scheduler",
+    "request_priority",
+    "PRIORITIES",
+    "preload_model",
+    "unload_model",
+    "show_model",
+    "pull_model",
+    "delete_model",
+    "embeddings",
+    "embed_many",
+    "aembed_many",
+    "agenerate",
+    "achat",
+    "aembed",
+    "astream_generate",
+    "astream_chat",
+    "gather_bounded",
+    "run_async",
+    "submit",
 ]
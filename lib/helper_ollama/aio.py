@@ -0,0 +1,217 @@
+"""Asyncio counterparts of the ``helper_ollama`` request wrappers.
+
+All coroutines share one ``ollama.AsyncClient`` (and therefore one HTTP
+connection pool) per event loop, so hundreds of requests can be in flight from
+a single thread. Synchronous code such as a Streamlit page can hand coroutines
+to :func:`submit` / :func:`run_async`, which run them on one long-lived
+background loop.
+
+Example:
+    >>> from lib.helper_ollama import agenerate, gather_bounded, run_async
+    >>> prompts = ["Question 1", "Question 2", "Question 3"]
+    >>> results = run_async(
+    ...     gather_bounded([agenerate("gemma3:1b", p) for p in prompts], limit=8)
+    ... )
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import inspect
+import threading
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Iterable, List, Optional
+
+import ollama as o
+
+from .scheduler import current_priority, current_session, get_scheduler
+from .transport import async_client_kwargs
+
+__all__ = [
+    "achat",
+    "aembed",
+    "agenerate",
+    "astream_chat",
+    "astream_generate",
+    "gather_bounded",
+    "get_async_client",
+    "run_async",
+    "submit",
+]
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, o.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def get_async_client() -> o.AsyncClient:
+    """Return the ``AsyncClient`` shared by all coroutines on the running loop."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None:
+            client = o.AsyncClient(**async_client_kwargs())
+            _clients[loop] = client
+        return client
+
+
+async def _released_after(parts, priority):
+    try:
+        async for part in parts:
+            yield part
+    finally:
+        get_scheduler().release(priority)
+
+
+async def _scheduled(request, stream=False):
+    # Wait for a slot of the shared scheduler; streams keep it until exhausted.
+    priority, session = current_priority()
+    scheduler = get_scheduler()
+    try:
+        await scheduler.acquire_async(priority, session)
+    except BaseException:
+        request.close()
+        raise
+    try:
+        response = await request
+    except BaseException:
+        scheduler.release(priority)
+        raise
+    if stream:
+        return _released_after(response, priority)
+    scheduler.release(priority)
+    return response
+
+
+async def agenerate(model_name, prompt, stream=False, **kwargs):
+    """Generate text; with ``stream=True`` the result is an async iterator of chunks."""
+    try:
+        return await _scheduled(
+            get_async_client().generate(
+                model=model_name,
+                prompt=prompt,
+                stream=stream,
+                **kwargs
+            ),
+            stream,
+        )
+    except Exception as e:
+        raise Exception(f"Failed to generate with {model_name}: {e}")
+
+
+async def achat(model_name, messages, stream=False, **kwargs):
+    """Chat with a model; with ``stream=True`` the result is an async iterator of chunks."""
+    try:
+        return await _scheduled(
+            get_async_client().chat(
+                model=model_name,
+                messages=messages,
+                stream=stream,
+                **kwargs
+            ),
+            stream,
+        )
+    except Exception as e:
+        raise Exception(f"Failed to chat with {model_name}: {e}")
+
+
+async def aembed(model_name, text, **kwargs):
+    """Embed one text or a list of texts with ``/api/embed``."""
+    try:
+        return await _scheduled(
+            get_async_client().embed(
+                model=model_name,
+                input=text,
+                **kwargs
+            )
+        )
+    except Exception as e:
+        raise Exception(f"Failed to generate embeddings with {model_name}: {e}")
+
+
+async def astream_generate(model_name, prompt, **kwargs) -> AsyncIterator[str]:
+    """Yield the response text of a streamed generation piece by piece."""
+    async for part in await agenerate(model_name, prompt, stream=True, **kwargs):
+        yield part.get("response", "")
+
+
+async def astream_chat(model_name, messages, **kwargs) -> AsyncIterator[str]:
+    """Yield the assistant message content of a streamed chat piece by piece."""
+    async for part in await achat(model_name, messages, stream=True, **kwargs):
+        yield part.get("message", {}).get("content", "")
+
+
+async def gather_bounded(
+    aws: Iterable[Awaitable[Any]],
+    limit: int = 8,
+    return_exceptions: bool = False,
+    timeout: Optional[float] = None,
+) -> List[Any]:
+    """Await ``aws`` with at most ``limit`` running at once, preserving order.
+
+    If one awaitable fails (and ``return_exceptions`` is False) or ``timeout``
+    expires, all remaining ones are cancelled before the error is raised.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _bounded(aw):
+        try:
+            async with semaphore:
+                return await aw
+        except asyncio.CancelledError:
+            # Close coroutines cancelled before they started to avoid "never awaited"
+            if inspect.iscoroutine(aw) and inspect.getcoroutinestate(aw) == inspect.CORO_CREATED:
+                aw.close()
+            raise
+
+    current_session()  # the tasks inherit the caller's scheduler session
+    tasks = [asyncio.ensure_future(_bounded(aw)) for aw in aws]
+    try:
+        return await asyncio.wait_for(
+            asyncio.gather(*tasks, return_exceptions=return_exceptions), timeout
+        )
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+# --- Background loop for synchronous callers ----------------------------------------------
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="ollama-async-loop", daemon=True
+            ).start()
+        return _loop
+
+
+def submit(coro: Awaitable[Any]) -> concurrent.futures.Future:
+    """Schedule ``coro`` on the shared background loop.
+
+    Cancelling the returned future cancels the running coroutine.
+    """
+    current_session()  # the task inherits the caller's scheduler session
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop())
+
+
+def run_async(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Run ``coro`` on the shared background loop and wait for its result.
+
+    The coroutine is cancelled if ``timeout`` expires.
+    """
+    future = submit(coro)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
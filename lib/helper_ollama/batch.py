@@ -0,0 +1,386 @@
+"""Resumable batch generation over JSONL files.
+
+Prompts are streamed from an input JSONL file (one JSON object per line) and
+every result is appended to an output JSONL file as soon as it completes, so a
+run of any size needs constant memory. A small checkpoint file next to the
+output records how far the run got; after a crash or Ctrl+C the same command
+continues where it stopped. Failed requests are retried with exponential
+backoff, and the number of requests in flight is tuned with AIMD (additive
+increase, multiplicative decrease) from the observed latency and error rate.
+
+Requests go through :func:`lib.helper_ollama.generate` / ``chat`` as ``bulk``
+priority, so interactive users keep their place in the queue.
+
+Run from the command line::
+
+    python -m lib.helper_ollama.batch prompts.jsonl results.jsonl --model gemma3:1b
+    python -m lib.helper_ollama.batch requests.jsonl summaries.jsonl \\
+        --model gemma3:1b --template "Summarize: {title}. {body}" --id-field request_id
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple
+
+from .scheduler import request_priority
+from .transport import NUM_PARALLEL
+
+__all__ = ["AIMDController", "iter_jsonl", "run_batch"]
+
+
+class AIMDController:
+    """Concurrency limit tuned by additive increase / multiplicative decrease.
+
+    After ``limit`` consecutive healthy completions the limit grows by one.
+    An error, or a smoothed latency above ``tolerance`` times the best latency
+    seen so far, halves it (at most once per window).
+
+    Args:
+        start: Initial limit.
+        minimum: Lower bound.
+        maximum: Upper bound.
+        tolerance: Allowed latency growth over the baseline before backing off.
+    """
+
+    def __init__(self, start: int = 2, minimum: int = 1, maximum: int = 16, tolerance: float = 2.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(start, self.minimum), self.maximum)
+        self.tolerance = tolerance
+        self.latency: Optional[float] = None  # EWMA
+        self.baseline: Optional[float] = None
+        self._healthy = 0
+        self._since_decrease = 0
+
+    def on_success(self, latency: float) -> None:
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.baseline = self.latency if self.baseline is None else min(self.baseline, self.latency)
+        self._since_decrease += 1
+        if self.latency > self.baseline * self.tolerance:
+            self._decrease()
+            return
+        self._healthy += 1
+        if self._healthy >= self.limit:
+            self._healthy = 0
+            self.limit = min(self.maximum, self.limit + 1)
+
+    def on_error(self) -> None:
+        self._since_decrease += 1
+        self._decrease()
+
+    def _decrease(self) -> None:
+        self._healthy = 0
+        if self._since_decrease < self.limit:
+            return  # already reacted to this window
+        self._since_decrease = 0
+        self.limit = max(self.minimum, self.limit // 2)
+
+
+def iter_jsonl(path: Path, skip: int = 0) -> Iterator[Tuple[int, dict]]:
+    """Yield ``(line_index, record)`` for each non-empty line, skipping the first ``skip`` lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            if index < skip or not line.strip():
+                continue
+            yield index, json.loads(line)
+
+
+def _checkpoint_path(output: Path) -> Path:
+    return output.with_name(output.name + ".checkpoint.json")
+
+
+def _read_checkpoint(output: Path) -> dict:
+    path = _checkpoint_path(output)
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {"watermark": 0}
+
+
+def _write_checkpoint(output: Path, state: dict) -> None:
+    path = _checkpoint_path(output)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _completed(output: Path, watermark: int) -> Set[int]:
+    """Return line indexes at or above ``watermark`` that already have a result.
+
+    A partially written last line (from a crash mid-write) is cut off.
+    """
+    done: Set[int] = set()
+    if not output.exists():
+        return done
+    with open(output, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[: data.rfind(b"\n") + 1]
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("index", -1) >= watermark:
+            done.add(record["index"])
+    return done
+
+
+def _drop_failed(output: Path) -> Optional[int]:
+    """Rewrite ``output`` without its error results; return the lowest dropped index.
+
+    Run before retrying failed records, so every record keeps one result line.
+    """
+    if not output.exists():
+        return None
+    kept, dropped = [], []
+    with open(output, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "error" in record:
+                dropped.append(record["index"])
+            else:
+                kept.append(line if line.endswith(b"\n") else line + b"\n")
+    if not dropped:
+        return None
+    tmp = output.with_name(output.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.writelines(kept)
+    os.replace(tmp, output)
+    return min(dropped)
+
+
+def _request(model: str, record: dict, prompt: Optional[str], options: Optional[dict], system: Optional[str]) -> dict:
+    from . import chat, generate
+
+    if prompt is None and "messages" in record:
+        messages = record["messages"]
+        if system:
+            messages = [{"role": "system", "content": system}, *messages]
+        response = chat(model, messages, options=options)
+        text = response["message"]["content"]
+    else:
+        kwargs = {"options": options} if options else {}
+        if system:
+            kwargs["system"] = system
+        response = generate(model, prompt, **kwargs)
+        text = response["response"]
+    return {"response": text, "eval_count": response.get("eval_count")}
+
+
+def run_batch(
+    input_path: Path,
+    output_path: Path,
+    model: str,
+    prompt_field: str = "prompt",
+    template: Optional[str] = None,
+    id_field: str = "id",
+    system: Optional[str] = None,
+    options: Optional[dict] = None,
+    retries: int = 3,
+    backoff: float = 1.0,
+    max_concurrency: Optional[int] = None,
+    start_concurrency: int = 2,
+    checkpoint_every: int = 50,
+    retry_failed: bool = False,
+    session: str = "batch",
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Generate a response for every record of ``input_path`` into ``output_path``.
+
+    Args:
+        input_path: JSONL file; each record holds ``prompt_field`` or ``messages``.
+        output_path: JSONL file the results are appended to; also the resume state.
+        model: Model name.
+        prompt_field: Record field used as the prompt.
+        template: Alternatively a ``str.format`` template over the record's fields.
+        id_field: Record field copied to the result as ``id`` (line index if missing).
+        system: Optional system prompt.
+        options: Generation options (temperature, num_predict, ...).
+        retries: Attempts after the first failure, with exponential backoff.
+        backoff: First backoff delay in seconds.
+        max_concurrency: Upper bound for the adaptive limit (default 2x server slots).
+        start_concurrency: Initial number of requests in flight.
+        checkpoint_every: Write the checkpoint after this many completions.
+        retry_failed: On resume, run records again whose result holds an error;
+            their error lines are removed from the output first.
+        session: Scheduler session name, so parallel batch jobs share fairly.
+        on_progress: Called with the current stats after every completion.
+
+    Returns:
+        dict: Counters (done, failed, skipped, retried), elapsed time and final concurrency.
+    """
+    input_path, output_path = Path(input_path), Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    state = _read_checkpoint(output_path)
+    if retry_failed:
+        # Failed records can sit below the watermark: move it down to the first
+        # one, so an interrupted retry run still resumes them.
+        lowest = _drop_failed(output_path)
+        if lowest is not None and lowest < state.get("watermark", 0):
+            state["watermark"] = lowest
+            _write_checkpoint(output_path, state)
+    watermark = state.get("watermark", 0)
+    completed = _completed(output_path, watermark)
+
+    controller = AIMDController(
+        start=state.get("concurrency", start_concurrency),
+        maximum=max_concurrency or NUM_PARALLEL * 2,
+    )
+    stats: Dict[str, Any] = {"done": 0, "failed": 0, "skipped": len(completed), "retried": 0}
+    stats_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def work(index: int, record: dict) -> dict:
+        result: Dict[str, Any] = {"index": index, "id": record.get(id_field, index)}
+        try:
+            prompt = template.format_map(record) if template else record.get(prompt_field)
+        except (KeyError, IndexError, ValueError) as e:
+            result.update(error=f"Template error: {e!r}", attempts=0)
+            return result
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                with request_priority("bulk", session=session):
+                    result.update(_request(model, record, prompt, options, system))
+                result.update(latency=round(time.perf_counter() - start, 3), attempts=attempt + 1)
+                result.pop("error", None)
+                return result
+            except Exception as e:
+                result["error"] = str(e)
+                if attempt < retries:
+                    with stats_lock:
+                        stats["retried"] += 1
+                    time.sleep(min(30.0, backoff * 2**attempt) * random.uniform(0.5, 1.5))
+        result["attempts"] = retries + 1
+        return result
+
+    pending: Dict[Future, int] = {}
+    finished_indexes: Set[int] = set()
+    records = iter_jsonl(input_path, skip=watermark)
+    exhausted = False
+    since_checkpoint = 0
+
+    def advance_watermark() -> int:
+        # Lowest index not finished yet: everything below it is on disk.
+        low = min(pending.values()) if pending else None
+        return low if low is not None else (max(finished_indexes | {watermark - 1}) + 1)
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=controller.maximum, thread_name_prefix="ollama-batch"
+    ) as pool:
+        try:
+            while True:
+                while not exhausted and len(pending) < controller.limit:
+                    try:
+                        index, record = next(records)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if index in completed:
+                        continue
+                    pending[pool.submit(work, index, record)] = index
+
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    # If the worker raised (e.g. Ctrl+C), the record stays pending
+                    # and below the checkpoint watermark.
+                    result = future.result()
+                    index = pending.pop(future)
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    finished_indexes.add(index)
+                    since_checkpoint += 1
+                    if "error" in result:
+                        stats["failed"] += 1
+                        controller.on_error()
+                    else:
+                        stats["done"] += 1
+                        controller.on_success(result["latency"])
+                out.flush()
+
+                with stats_lock:
+                    stats["concurrency"] = controller.limit
+                    stats["elapsed"] = time.perf_counter() - started
+                    snapshot = dict(stats)
+                if on_progress:
+                    on_progress(snapshot)
+                if since_checkpoint >= checkpoint_every:
+                    since_checkpoint = 0
+                    _write_checkpoint(
+                        output_path, {"watermark": advance_watermark(), "concurrency": controller.limit}
+                    )
+        finally:
+            for future in pending:
+                future.cancel()
+            _write_checkpoint(output_path, {"watermark": advance_watermark(), "concurrency": controller.limit})
+
+    stats["concurrency"] = controller.limit
+    stats["elapsed"] = time.perf_counter() - started
+    return stats
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of prompts through an Ollama model.")
+    parser.add_argument("input", type=Path, help="JSONL file with one record per line")
+    parser.add_argument("output", type=Path, help="JSONL file for the results (resumed if it exists)")
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--prompt-field", default="prompt")
+    parser.add_argument("--template", help='prompt template over the record, e.g. "Summarize: {body}"')
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--system", help="system prompt")
+    parser.add_argument("--temperature", type=float)
+    parser.add_argument("--num-predict", type=int)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--max-concurrency", type=int)
+    parser.add_argument("--retry-failed", action="store_true", help="run failed records again")
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.temperature is not None:
+        options["temperature"] = args.temperature
+    if args.num_predict is not None:
+        options["num_predict"] = args.num_predict
+
+    def progress(stats: dict) -> None:
+        rate = (stats["done"] + stats["failed"]) / stats["elapsed"] if stats["elapsed"] else 0
+        print(
+            f"\rdone {stats['done']}  failed {stats['failed']}  skipped {stats['skipped']}  "
+            f"concurrency {stats['concurrency']}  {rate:.1f}/s",
+            end="",
+            flush=True,
+        )
+
+    stats = run_batch(
+        args.input,
+        args.output,
+        args.model,
+        prompt_field=args.prompt_field,
+        template=args.template,
+        id_field=args.id_field,
+        system=args.system,
+        options=options or None,
+        retries=args.retries,
+        max_concurrency=args.max_concurrency,
+        retry_failed=args.retry_failed,
+        on_progress=progress,
+    )
+    print(f"\nFinished in {stats['elapsed']:.1f}s: {stats['done']} done, {stats['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
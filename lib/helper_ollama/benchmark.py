@@ -0,0 +1,356 @@
+"""Measure model speed on this machine's Ollama server.
+
+A benchmark runs a prompt suite against one or more models at several
+concurrency levels. Each request is streamed straight from the server (the
+response cache and request coalescing are bypassed) so that every sample is a
+real generation. Per request it records time to first token, total latency and
+the server's own ``eval_count / eval_duration`` timings; per model and
+concurrency level it reports p50/p95/p99 latencies, mean tokens/s, aggregate
+throughput, load time and the resident memory from ``/api/ps``.
+
+Results are saved as JSON (all samples) plus CSV (summary) below
+``.cache/benchmarks`` and drive the charts on the model comparison page.
+
+Run from the command line::
+
+    python -m lib.helper_ollama.benchmark gemma3:1b mistral --concurrency 1 2 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from lib.cache_dir import cache_path
+
+from .transport import OLLAMA_HOST, get_json, stream_ndjson
+
+__all__ = [
+    "DEFAULT_PROMPTS",
+    "BenchmarkResult",
+    "Sample",
+    "latest_results",
+    "list_results",
+    "load_results",
+    "run_benchmark",
+    "run_request",
+    "save_results",
+    "summarize",
+]
+
+DEFAULT_PROMPTS: Dict[str, str] = {
+    "short_answer": "Explain what Python is in two sentences.",
+    "list": "List five tips for writing readable code.",
+    "code": "Write a Python function that checks whether a string is a palindrome.",
+    "summary": (
+        "Summarize in three bullet points: Streamlit turns Python scripts into "
+        "interactive web apps. Widgets rerun the script from top to bottom, and "
+        "caching decorators keep expensive results between reruns."
+    ),
+}
+
+DEFAULT_OPTIONS = {"temperature": 0, "num_predict": 128}
+
+_NS = 1e9
+
+
+@dataclass
+class Sample:
+    """Timings of one benchmark request. Durations are in seconds."""
+
+    model: str
+    prompt_id: str
+    concurrency: int
+    latency: Optional[float] = None
+    ttft: Optional[float] = None
+    load_duration: Optional[float] = None
+    prompt_eval_count: int = 0
+    prompt_eval_duration: Optional[float] = None
+    eval_count: int = 0
+    eval_duration: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def tokens_per_s(self) -> Optional[float]:
+        """Generation speed as measured by the server."""
+        if not self.eval_count or not self.eval_duration:
+            return None
+        return self.eval_count / self.eval_duration
+
+    @property
+    def prompt_tokens_per_s(self) -> Optional[float]:
+        """Prompt processing speed as measured by the server."""
+        if not self.prompt_eval_count or not self.prompt_eval_duration:
+            return None
+        return self.prompt_eval_count / self.prompt_eval_duration
+
+
+@dataclass
+class BenchmarkResult:
+    """Samples of one benchmark run plus the wall time of each level."""
+
+    samples: List[Sample] = field(default_factory=list)
+    # (model, concurrency) -> seconds for the whole level
+    wall_times: Dict[tuple, float] = field(default_factory=dict)
+    # model -> cold load time and resident memory measured during warm-up
+    models: Dict[str, dict] = field(default_factory=dict)
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    host: str = OLLAMA_HOST
+
+    def summary(self) -> List[dict]:
+        """Return one summary row per model and concurrency level."""
+        return summarize(self.samples, self.wall_times, self.models)
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "host": self.host,
+            "models": self.models,
+            "wall_times": [
+                {"model": m, "concurrency": c, "seconds": s} for (m, c), s in self.wall_times.items()
+            ],
+            "samples": [asdict(s) for s in self.samples],
+            "summary": self.summary(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BenchmarkResult":
+        return cls(
+            samples=[Sample(**s) for s in data.get("samples", [])],
+            wall_times={(w["model"], w["concurrency"]): w["seconds"] for w in data.get("wall_times", [])},
+            models=data.get("models", {}),
+            started_at=data.get("started_at", ""),
+            host=data.get("host", OLLAMA_HOST),
+        )
+
+
+def run_request(
+    model: str,
+    prompt: str,
+    options: Optional[dict] = None,
+    prompt_id: str = "",
+    concurrency: int = 1,
+    keep_alive: Optional[str] = None,
+) -> Sample:
+    """Stream one generation and return its timings; errors are recorded, not raised."""
+    sample = Sample(model=model, prompt_id=prompt_id, concurrency=concurrency)
+    payload = {"model": model, "prompt": prompt, "options": options or DEFAULT_OPTIONS}
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+
+    start = time.perf_counter()
+    try:
+        for part in stream_ndjson("/api/generate", payload):
+            if sample.ttft is None and part.get("response"):
+                sample.ttft = time.perf_counter() - start
+            if part.get("done"):
+                sample.load_duration = part.get("load_duration", 0) / _NS
+                sample.prompt_eval_count = part.get("prompt_eval_count", 0)
+                sample.prompt_eval_duration = part.get("prompt_eval_duration", 0) / _NS
+                sample.eval_count = part.get("eval_count", 0)
+                sample.eval_duration = part.get("eval_duration", 0) / _NS
+    except Exception as e:
+        sample.error = str(e)
+    sample.latency = time.perf_counter() - start
+    return sample
+
+
+def _resident_memory(model: str) -> Optional[dict]:
+    try:
+        running = get_json("/api/ps").get("models", [])
+    except Exception:
+        return None
+    for entry in running:
+        if entry.get("name") == model or entry.get("model") == model:
+            return {"size": entry.get("size", 0), "size_vram": entry.get("size_vram", 0)}
+    return None
+
+
+def _warm_up(model: str) -> dict:
+    # One tiny request loads the model; its load_duration is the cold load time.
+    sample = run_request(model, "Hi", options={"num_predict": 1})
+    info = {"load_duration": sample.load_duration, "error": sample.error}
+    memory = _resident_memory(model)
+    if memory:
+        info.update(memory)
+    return info
+
+
+def run_benchmark(
+    models: Sequence[str],
+    prompts: Optional[Dict[str, str]] = None,
+    concurrency: Iterable[int] = (1, 2, 4),
+    repeats: int = 2,
+    options: Optional[dict] = None,
+    warm_up: bool = True,
+    on_sample: Optional[Callable[[Sample, int, int], None]] = None,
+) -> BenchmarkResult:
+    """Run the prompt suite against each model at each concurrency level.
+
+    Args:
+        models: Model names to benchmark.
+        prompts: Mapping prompt id -> prompt (defaults to :data:`DEFAULT_PROMPTS`).
+        concurrency: Numbers of requests in flight at the same time.
+        repeats: How often each prompt is sent per level.
+        options: Generation options; defaults to ``temperature=0, num_predict=128``.
+        warm_up: Load each model once before measuring and record load time/memory.
+        on_sample: Called as ``on_sample(sample, done, total)`` after each request.
+
+    Returns:
+        BenchmarkResult: All samples; use ``result.summary()`` for aggregates.
+    """
+    prompts = prompts or DEFAULT_PROMPTS
+    levels = sorted({int(c) for c in concurrency if int(c) > 0})
+    jobs = [(pid, text) for pid, text in prompts.items() for _ in range(max(1, repeats))]
+    total = len(models) * len(levels) * len(jobs)
+
+    result = BenchmarkResult()
+    done = 0
+    for model in models:
+        if warm_up:
+            result.models[model] = _warm_up(model)
+        for level in levels:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=level, thread_name_prefix="ollama-bench") as pool:
+                futures = [
+                    pool.submit(run_request, model, text, options, pid, level) for pid, text in jobs
+                ]
+                for future in futures:
+                    sample = future.result()
+                    result.samples.append(sample)
+                    done += 1
+                    if on_sample:
+                        on_sample(sample, done, total)
+            result.wall_times[(model, level)] = time.perf_counter() - start
+    return result
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    return float(np.percentile(values, q)) if values else None
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return float(np.mean(values)) if values else None
+
+
+def summarize(
+    samples: Iterable[Sample],
+    wall_times: Optional[Dict[tuple, float]] = None,
+    models: Optional[Dict[str, dict]] = None,
+) -> List[dict]:
+    """Aggregate samples into one row per ``(model, concurrency)``."""
+    groups: Dict[tuple, List[Sample]] = {}
+    for s in samples:
+        groups.setdefault((s.model, s.concurrency), []).append(s)
+
+    rows = []
+    for (model, level), group in sorted(groups.items()):
+        ok = [s for s in group if s.error is None]
+        latencies = [s.latency for s in ok]
+        ttfts = [s.ttft for s in ok if s.ttft is not None]
+        wall = (wall_times or {}).get((model, level))
+        info = (models or {}).get(model, {})
+        rows.append({
+            "model": model,
+            "concurrency": level,
+            "requests": len(group),
+            "errors": len(group) - len(ok),
+            "ttft_p50": _percentile(ttfts, 50),
+            "ttft_p95": _percentile(ttfts, 95),
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+            "latency_p99": _percentile(latencies, 99),
+            "tokens_per_s": _mean([s.tokens_per_s for s in ok if s.tokens_per_s]),
+            "prompt_tokens_per_s": _mean([s.prompt_tokens_per_s for s in ok if s.prompt_tokens_per_s]),
+            "throughput_tokens_per_s": (sum(s.eval_count for s in ok) / wall) if wall else None,
+            "load_s": info.get("load_duration"),
+            "memory_gb": info["size"] / 1024**3 if info.get("size") else None,
+        })
+    return rows
+
+
+def _results_dir(directory: Optional[Path] = None) -> Path:
+    if directory is not None:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        return Path(directory)
+    return cache_path("benchmarks", "results.json").parent
+
+
+def save_results(result: BenchmarkResult, directory: Optional[Path] = None) -> Path:
+    """Write ``<timestamp>.json`` (samples) and ``<timestamp>.csv`` (summary); return the JSON path.
+
+    A run started in the same second as a saved one gets ``<timestamp>_2`` etc.
+    """
+    folder = _results_dir(directory)
+    base = "benchmark_" + result.started_at.replace(":", "").replace("-", "")
+    # Runs started in the same second (e.g. two sessions) get a numbered
+    # stem; "x" mode claims the name atomically.
+    for attempt in itertools.count(1):
+        stem = base if attempt == 1 else f"{base}_{attempt}"
+        json_path = folder / f"{stem}.json"
+        try:
+            with open(json_path, "x", encoding="utf-8") as f:
+                json.dump(result.to_dict(), f, indent=2)
+            break
+        except FileExistsError:
+            continue
+
+    rows = result.summary()
+    if rows:
+        with open(folder / f"{stem}.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return json_path
+
+
+def list_results(directory: Optional[Path] = None) -> List[Path]:
+    """Return saved benchmark files, newest first."""
+    return sorted(_results_dir(directory).glob("benchmark_*.json"), reverse=True)
+
+
+def load_results(path: Path) -> BenchmarkResult:
+    """Load a benchmark saved by :func:`save_results`."""
+    return BenchmarkResult.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def latest_results(directory: Optional[Path] = None) -> Optional[BenchmarkResult]:
+    """Return the most recent saved benchmark, or None."""
+    paths = list_results(directory)
+    return load_results(paths[0]) if paths else None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Ollama models on this machine.")
+    parser.add_argument("models", nargs="+", help="model names, e.g. gemma3:1b")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--num-predict", type=int, default=DEFAULT_OPTIONS["num_predict"])
+    args = parser.parse_args(argv)
+
+    def progress(sample: Sample, done: int, total: int) -> None:
+        status = sample.error or f"{sample.latency:.2f}s"
+        print(f"[{done}/{total}] {sample.model} c={sample.concurrency} {sample.prompt_id}: {status}")
+
+    result = run_benchmark(
+        args.models,
+        concurrency=args.concurrency,
+        repeats=args.repeats,
+        options={**DEFAULT_OPTIONS, "num_predict": args.num_predict},
+        on_sample=progress,
+    )
+    print(f"Saved {save_results(result)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Model capability detection from ``/api/show`` metadata.
+
+Capabilities are derived from what the server reports about a model
+(``capabilities``, ``details.families``, projector info, template) and stored
+on disk keyed by model digest, so each model is inspected once per digest.
+Models that cannot be inspected fall back to a single precompiled name matcher.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+__all__ = [
+    "CAPABILITIES",
+    "CapabilityIndex",
+    "capabilities_from_name",
+    "capabilities_from_show",
+]
+
+CAPABILITIES = ("embedding", "vision", "tools", "thinking", "chat")
+
+# Name indicators per capability, used only when no metadata is available.
+_NAME_INDICATORS = {
+    "embedding": [
+        "embed", "embedding", "nomic-embed", "bge", "sentence",
+        "all-minilm", "e5", "gte", "multilingual-e5", "paraphrase",
+        "text-embedding", "instructor", "thenlper",
+    ],
+    "vision": [
+        "vision", "llava", "bakllava", "moondream", "cogvlm",
+        "qwen-vl", "qwen2-vl", "internvl", "minicpm-v", "yi-vl",
+        "deepseek-vl", "blip", "clip", "fuyu", "kosmos", "flamingo",
+        "otter", "minigpt", "instructblip", "lynx", "idefics",
+    ],
+    "tools": [
+        "function", "tool", "agent", "hermes", "mixtral", "command",
+        "gorilla", "toolformer", "react", "planning",
+        "llama3", "llama3.1", "llama3.2", "mistral",
+        "qwen", "yi", "deepseek", "phi",
+    ],
+    "thinking": [
+        "reasoning", "thinking", "o1", "r1", "chain", "cot",
+        "reason", "logic", "math", "solver", "step", "thought",
+        "deepseek-r1", "qwen-reasoning",
+    ],
+    "chat": [
+        "llama", "mistral", "codellama", "dolphin", "orca", "vicuna",
+        "alpaca", "wizard", "openchat", "neural", "chat", "instruct",
+        "qwen", "yi", "deepseek", "phi", "gemma", "solar", "claude",
+        "gpt", "falcon", "mpt", "bloom", "opt", "pythia", "stablelm",
+    ],
+}
+
+
+_BOUNDARY = r"(?<![a-z0-9])"
+_SHORT_INDICATOR = 3  # indicators up to this length need a name-token boundary
+
+
+def _indicator_pattern(indicator: str) -> str:
+    # Short indicators must start a name token (after a dash, colon, slash, dot
+    # or at the start) so that "phi" does not match inside "dolphin". Longer
+    # family names match anywhere: "tinyllama", "openhermes", "codegemma".
+    if len(indicator) <= _SHORT_INDICATOR:
+        return _BOUNDARY + re.escape(indicator)
+    return re.escape(indicator)
+
+
+def _build_name_matcher():
+    owners: Dict[str, set] = {}
+    for capability, indicators in _NAME_INDICATORS.items():
+        for indicator in indicators:
+            owners.setdefault(indicator, set()).add(capability)
+
+    # Longest alternatives are tried first.
+    alternatives = sorted(owners, key=len, reverse=True)
+    pattern = re.compile("|".join(_indicator_pattern(a) for a in alternatives))
+
+    # A match on "llama3" also implies the shorter indicators it contains
+    # ("llama"), which the longest-first scan would skip.
+    caps_for = {}
+    for indicator in owners:
+        caps = set()
+        for other, other_caps in owners.items():
+            if re.search(_indicator_pattern(other), indicator):
+                caps |= other_caps
+        caps_for[indicator] = caps
+
+    return pattern, caps_for
+
+
+_NAME_PATTERN, _CAPS_FOR_INDICATOR = _build_name_matcher()
+
+
+def _ordered(caps) -> List[str]:
+    return [capability for capability in CAPABILITIES if capability in caps]
+
+
+def capabilities_from_name(model_name: str) -> List[str]:
+    """Guess capabilities from a model name with one precompiled regex scan."""
+    caps = set()
+    for match in _NAME_PATTERN.finditer(model_name.lower()):
+        caps |= _CAPS_FOR_INDICATOR[match.group(0)]
+
+    # Embedding models are not conversational
+    if "embedding" in caps:
+        caps.discard("chat")
+    return _ordered(caps)
+
+
+def _field(obj, name, default=None):
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def capabilities_from_show(show_response) -> Optional[List[str]]:
+    """Derive capabilities from an ``o.show()`` response.
+
+    Returns:
+        The capability list, or None if the response carries no usable metadata.
+    """
+    reported = _field(show_response, "capabilities") or []
+    if reported:
+        caps = set()
+        for capability in reported:
+            if capability == "completion":
+                caps.add("chat")
+            elif capability in CAPABILITIES:
+                caps.add(capability)
+        return _ordered(caps)
+
+    # Older servers: infer from families, projector info and template
+    details = _field(show_response, "details") or {}
+    families = [f.lower() for f in (_field(details, "families") or [])]
+    modelinfo = _field(show_response, "modelinfo") or {}
+    template = _field(show_response, "template") or ""
+    if not families and not modelinfo and not template:
+        return None
+
+    caps = set()
+    architecture = str(modelinfo.get("general.architecture", "")).lower()
+    if "bert" in architecture or any("bert" in f for f in families) or any(
+        key.endswith(".pooling_type") for key in modelinfo
+    ):
+        caps.add("embedding")
+    else:
+        caps.add("chat")
+
+    if _field(show_response, "projector_info") or any(
+        f in ("clip", "mllama") for f in families
+    ) or any(key.endswith(".vision.block_count") for key in modelinfo):
+        caps.add("vision")
+
+    if ".Tools" in template:
+        caps.add("tools")
+
+    if ".Think" in template:
+        caps.add("thinking")
+
+    return _ordered(caps)
+
+
+class CapabilityIndex:
+    """Digest-keyed capability cache persisted as a JSON file.
+
+    Args:
+        path: JSON file holding ``{digest: {"name": ..., "capabilities": [...]}}``.
+        show: Callable ``show(model_name)`` returning ``/api/show`` metadata.
+    """
+
+    def __init__(self, path: Path, show: Callable[[str], object]):
+        self.path = Path(path)
+        self._show = show
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, dict]] = None
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def get(self, digest: str) -> Optional[List[str]]:
+        """Return cached capabilities for ``digest`` without any network I/O."""
+        with self._lock:
+            entry = self._load().get(digest)
+        return list(entry["capabilities"]) if entry else None
+
+    def remember(self, model_name: str, digest: str, capabilities: List[str]) -> None:
+        """Store capabilities for a digest, e.g. from an existing show response."""
+        if not digest:
+            return
+        with self._lock:
+            entries = self._load()
+            entries[digest] = {"name": model_name, "capabilities": list(capabilities)}
+            try:
+                self._save()
+            except OSError:
+                pass  # the in-memory entry still saves repeated inspections
+
+    def capabilities(self, model_name: str, digest: str = "") -> List[str]:
+        """Return capabilities, inspecting the model once per digest.
+
+        Falls back to :func:`capabilities_from_name` if the model cannot be
+        inspected; such guesses are not written to disk, so the next process
+        inspects the model again.
+        """
+        if digest:
+            cached = self.get(digest)
+            if cached is not None:
+                return cached
+
+        try:
+            caps = capabilities_from_show(self._show(model_name))
+        except Exception:
+            caps = None
+
+        if caps is None:
+            return capabilities_from_name(model_name)
+
+        self.remember(model_name, digest, caps)
+        return caps
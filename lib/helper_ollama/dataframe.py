@@ -0,0 +1,133 @@
+"""Apply an LLM prompt to a DataFrame column, once per distinct value.
+
+Real-world columns repeat themselves: review texts, product names and
+categories occur many times. :func:`llm_apply` sends every distinct value
+through the model only once, reuses answers stored in the response cache by
+earlier runs, runs the remaining requests in parallel and maps the answers
+back onto all rows.
+
+Example:
+    >>> from lib.helper_ollama.dataframe import llm_apply
+    >>> df["sentiment"] = llm_apply(
+    ...     df, "review_text",
+    ...     "Sentiment of this review (Positive, Negative or Neutral): {value}",
+    ...     model="gemma3:1b",
+    ... )
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from .response_cache import as_record
+from .scheduler import request_priority
+
+__all__ = ["llm_apply"]
+
+
+def _request_kwargs(options: Optional[dict], system: Optional[str]) -> dict:
+    kwargs = {}
+    if options:
+        kwargs["options"] = options
+    if system:
+        kwargs["system"] = system
+    return kwargs
+
+
+def _fill(template: str, value: str) -> str:
+    # Only the placeholder is substituted, so templates may contain literal
+    # braces such as a JSON answer format.
+    if "{value}" in template:
+        return template.replace("{value}", value)
+    return template.replace("{}", value)
+
+
+def llm_apply(
+    df: pd.DataFrame,
+    column: str,
+    template: str,
+    model: str,
+    options: Optional[dict] = None,
+    system: Optional[str] = None,
+    parse: Optional[Callable[[str], Any]] = None,
+    concurrency: int = 4,
+    on_progress: Optional[Callable[[int, int, int], None]] = None,
+) -> pd.Series:
+    """Run ``template`` for each distinct value of ``df[column]`` and return the answers per row.
+
+    Args:
+        df: Input DataFrame (not modified).
+        column: Column whose values are inserted into the prompt.
+        template: Prompt with ``{value}`` (or ``{}``) where the cell value goes;
+            other braces are kept as they are.
+        model: Model name.
+        options: Generation options; ``temperature`` defaults to 0 for stable labels.
+        system: Optional system prompt.
+        parse: Turns the response text into the cell value (default: ``str.strip``).
+        concurrency: Requests in flight at once.
+        on_progress: Called as ``on_progress(done, total, cached)`` for distinct values.
+
+    Returns:
+        pd.Series: Answers aligned with ``df.index``; missing values and failed
+        requests give ``None``. Errors are listed in ``series.attrs["errors"]``.
+    """
+    from . import _request_key, generate, get_response_cache
+
+    parse = parse or str.strip
+    options = {"temperature": 0, **(options or {})}
+    kwargs = _request_kwargs(options, system)
+
+    values = df[column]
+    distinct = pd.unique(values[values.notna()].astype(str))
+    prompts = {value: _fill(template, value) for value in distinct}
+    total = len(prompts)
+
+    # Answers from earlier runs come straight from the response cache. Misses
+    # are stored here as well, so each value is looked up exactly once.
+    answers: Dict[str, Any] = {}
+    todo: List[str] = []
+    keys: Dict[str, Optional[str]] = {}
+    cache = get_response_cache()
+    for value, prompt in prompts.items():
+        digest, key = _request_key("generate", model, {"prompt": prompt, **kwargs})
+        keys[value] = key if digest else None
+        record = cache.get(key) if digest else None
+        if record is not None:
+            answers[value] = parse(record.get("response", ""))
+        else:
+            todo.append(value)
+    cached = len(answers)
+    if on_progress:
+        on_progress(cached, total, cached)
+
+    errors: Dict[str, str] = {}
+
+    def ask(value: str) -> str:
+        with request_priority("bulk", session=f"llm_apply:{column}"):
+            response = generate(model, prompts[value], cache=False, **kwargs)
+        if keys[value]:
+            cache.put(keys[value], as_record(response))
+        return response["response"]
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="llm-apply") as pool:
+        futures = {pool.submit(ask, value): value for value in todo}
+        for future in as_completed(futures):
+            value = futures[future]
+            try:
+                answers[value] = parse(future.result())
+            except Exception as e:
+                answers[value] = None
+                errors[value] = str(e)
+            if on_progress:
+                on_progress(len(answers), total, cached)
+
+    result = pd.Series(
+        [None if pd.isna(v) else answers.get(str(v)) for v in values],
+        index=df.index,
+        dtype=object,
+    )
+    result.attrs["errors"] = errors
+    return result
@@ -0,0 +1,105 @@
+"""Batched embeddings via ``/api/embed`` with list inputs.
+
+Instead of one HTTP request per text (the legacy ``/api/embeddings``
+endpoint), texts are grouped into size-bounded batches, the batches are sent
+concurrently and the vectors are written into one contiguous float32 matrix in
+input order.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from .aio import aembed, gather_bounded, run_async
+
+__all__ = [
+    "aembed_many",
+    "embed_many",
+    "iter_batches",
+]
+
+
+def iter_batches(
+    texts: Sequence[str], batch_size: int = 64, max_batch_chars: int = 64_000
+) -> Iterator[Tuple[int, List[str]]]:
+    """Yield ``(start_index, batch)`` with at most ``batch_size`` texts and
+    ``max_batch_chars`` characters per batch (a single longer text gets its own batch)."""
+    start, batch, chars = 0, [], 0
+    for index, text in enumerate(texts):
+        if batch and (len(batch) >= batch_size or chars + len(text) > max_batch_chars):
+            yield start, batch
+            start, batch, chars = index, [], 0
+        batch.append(text)
+        chars += len(text)
+    if batch:
+        yield start, batch
+
+
+async def aembed_many(
+    model_name: str,
+    texts: Sequence[str],
+    batch_size: int = 64,
+    max_batch_chars: int = 64_000,
+    concurrency: int = 4,
+    **kwargs,
+) -> np.ndarray:
+    """Embed ``texts`` and return a C-contiguous ``(len(texts), dim)`` float32 matrix.
+
+    Args:
+        model_name: Embedding model, e.g. ``"nomic-embed-text"``.
+        texts: Texts to embed; row ``i`` of the result belongs to ``texts[i]``.
+        batch_size: Maximum number of texts per request.
+        max_batch_chars: Maximum total characters per request.
+        concurrency: Number of batches in flight at once.
+        **kwargs: Passed to ``/api/embed`` (``truncate``, ``options``, ``keep_alive``, ...).
+    """
+    batches = list(iter_batches(texts, batch_size, max_batch_chars))
+    if not batches:
+        return np.empty((0, 0), dtype=np.float32)
+
+    responses = await gather_bounded(
+        [aembed(model_name, batch, **kwargs) for _, batch in batches],
+        limit=concurrency,
+    )
+
+    matrix = None
+    for (start, batch), response in zip(batches, responses):
+        vectors = np.asarray(response["embeddings"], dtype=np.float32)
+        if vectors.shape[0] != len(batch):
+            raise Exception(
+                f"Failed to generate embeddings with {model_name}: "
+                f"expected {len(batch)} vectors, got {vectors.shape[0]}"
+            )
+        if matrix is None:
+            matrix = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        matrix[start:start + len(batch)] = vectors
+    return matrix
+
+
+def embed_many(
+    model_name: str,
+    texts: Sequence[str],
+    batch_size: int = 64,
+    max_batch_chars: int = 64_000,
+    concurrency: int = 4,
+    **kwargs,
+) -> np.ndarray:
+    """Blocking wrapper around :func:`aembed_many`.
+
+    Example:
+        >>> matrix = embed_many("nomic-embed-text", ["first text", "second text"])
+        >>> matrix.shape
+        (2, 768)
+    """
+    return run_async(
+        aembed_many(
+            model_name,
+            texts,
+            batch_size=batch_size,
+            max_batch_chars=max_batch_chars,
+            concurrency=concurrency,
+            **kwargs,
+        )
+    )
@@ -0,0 +1,168 @@
+"""Process-wide, TTL-cached registry of the locally installed Ollama models.
+
+Every model selector, capability filter and model list in the app goes through
+one :class:`ModelRegistry` instance. Reads inside the TTL are served from memory
+without any network I/O; stale reads return the cached list immediately and
+refresh it in a background thread. When the server is unreachable the last
+known good list is kept.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+__all__ = [
+    "DEFAULT_TTL",
+    "ModelRegistry",
+]
+
+DEFAULT_TTL = float(os.environ.get("OLLAMA_MODELS_TTL", "30"))
+
+
+class ModelRegistry:
+    """Thread-safe cache of model entries with stale-while-revalidate refresh.
+
+    Args:
+        fetch: Callable returning a list of raw model dicts. Each dict must at
+            least contain ``name`` and ``digest``.
+        enrich: Optional callable ``enrich(entry) -> dict`` that adds derived
+            fields (e.g. ``capabilities``). It is only called again for a model
+            when its digest changes.
+        ttl: Seconds a fetched list is considered fresh.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], List[dict]],
+        enrich: Optional[Callable[[dict], dict]] = None,
+        ttl: float = DEFAULT_TTL,
+    ):
+        self._fetch = fetch
+        self._enrich = enrich
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._entries: List[dict] = []
+        self._by_digest: Dict[str, dict] = {}
+        self._loaded = False
+        self._fetched_at = 0.0
+        self._refreshing = False
+
+        self.version = 0
+        self.last_error: Optional[Exception] = None
+
+    # ------------------------------------------------------------------ reads
+    def models(self) -> List[dict]:
+        """Return model entries, refreshing only when the TTL has expired.
+
+        Raises:
+            Exception: If no list was ever fetched and the server is unreachable.
+        """
+        with self._lock:
+            loaded = self._loaded
+            fresh = loaded and (time.monotonic() - self._fetched_at) < self.ttl
+            if fresh:
+                return [dict(entry) for entry in self._entries]
+
+        if not loaded:
+            # Cold start: let one caller fetch while concurrent callers wait.
+            with self._load_lock:
+                if not self._loaded:
+                    self.refresh()
+        else:
+            self._refresh_in_background()
+
+        with self._lock:
+            return [dict(entry) for entry in self._entries]
+
+    def names(self) -> List[str]:
+        """Return the sorted names of all cached models."""
+        return sorted(entry["name"] for entry in self.models() if entry.get("name"))
+
+    def get(self, name: str) -> Optional[dict]:
+        """Return the entry for ``name`` or ``None`` when it is not installed."""
+        for entry in self.models():
+            if entry.get("name") == name:
+                return entry
+        return None
+
+    # ---------------------------------------------------------------- updates
+    def refresh(self) -> bool:
+        """Fetch the model list now.
+
+        Returns:
+            True if the digest set changed (models added, removed or updated).
+
+        Raises:
+            Exception: Only if the fetch fails and there is no last known list.
+        """
+        try:
+            raw = self._fetch()
+        except Exception as e:
+            with self._lock:
+                self.last_error = e
+                self._refreshing = False
+                if self._loaded:
+                    # Keep serving the last known good list; retry after one TTL.
+                    self._fetched_at = time.monotonic()
+                    return False
+            raise
+
+        entries = []
+        by_digest = {}
+        for item in raw:
+            digest = item.get("digest", "")
+            previous = self._by_digest.get(digest) if digest else None
+            if previous is not None and previous.get("name") == item.get("name"):
+                entry = previous
+            else:
+                entry = dict(item)
+                if self._enrich is not None:
+                    entry = self._enrich(entry)
+            entries.append(entry)
+            if digest:
+                by_digest[digest] = entry
+
+        with self._lock:
+            changed = set(by_digest) != set(self._by_digest) or not self._loaded
+            self._entries = entries
+            self._by_digest = by_digest
+            self._loaded = True
+            self._fetched_at = time.monotonic()
+            self._refreshing = False
+            self.last_error = None
+            if changed:
+                self.version += 1
+        return changed
+
+    def invalidate(self) -> None:
+        """Mark the cached list as stale so the next read refreshes it."""
+        with self._lock:
+            self._fetched_at = 0.0
+
+    def clear(self) -> None:
+        """Forget all cached entries, including derived per-digest data."""
+        with self._lock:
+            self._entries = []
+            self._by_digest = {}
+            self._loaded = False
+            self._fetched_at = 0.0
+            self.version += 1
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            except Exception:  # noqa: BLE001 - last_error is recorded in refresh
+                pass
+
+        threading.Thread(target=_run, name="ollama-model-registry", daemon=True).start()
@@ -0,0 +1,231 @@
+"""Keep model switches rare: track resident models and group requests by model.
+
+Ollama holds a limited number of models in memory. When requests for several
+models interleave, the server evicts and reloads weights for almost every
+request. :class:`ModelRouter` admits requests so that at most ``max_loaded``
+distinct models are in use at the same time; requests for other models wait
+and are released together, grouped by model, once a slot frees up. It also
+tracks which models are resident (``/api/ps``), remembers a ``keep_alive`` per
+model and can preload a model in the background before the first request.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set
+
+__all__ = ["DEFAULT_MAX_LOADED", "ModelRouter"]
+
+DEFAULT_MAX_LOADED = int(os.environ.get("OLLAMA_MAX_LOADED_MODELS", "3"))
+
+
+def _base(name: str) -> str:
+    return name if ":" in name else f"{name}:latest"
+
+
+class ModelRouter:
+    """Model-aware admission, residency tracking and preloading.
+
+    Args:
+        ps: Returns the ``/api/ps`` response (``{"models": [...]}``).
+        load: Loads a model, called as ``load(model, keep_alive)``.
+        max_loaded: Distinct models allowed in use at the same time.
+        ps_ttl: Seconds a ``/api/ps`` snapshot is reused.
+
+    Example:
+        >>> router.preload("gemma3:1b")           # returns immediately
+        >>> with router.slot("gemma3:1b"):
+        ...     response = client.generate(...)
+    """
+
+    def __init__(
+        self,
+        ps: Callable[[], dict],
+        load: Callable[[str, Any], None],
+        max_loaded: int = DEFAULT_MAX_LOADED,
+        ps_ttl: float = 2.0,
+    ):
+        self._ps = ps
+        self._load = load
+        self.max_loaded = max(1, max_loaded)
+        self.ps_ttl = ps_ttl
+
+        self._cond = threading.Condition()
+        self._active: Dict[str, int] = {}  # model -> requests in flight
+        # model -> number of waiting requests; insertion order = oldest group first
+        self._waiting: "OrderedDict[str, int]" = OrderedDict()
+        self._released: Set[str] = set()
+
+        self._keep_alive: Dict[str, Any] = {}
+        self._preloading: Set[str] = set()
+        self._resident: Dict[str, dict] = {}
+        self._resident_at = 0.0
+        self._ps_lock = threading.Lock()
+        self.last_error: Optional[BaseException] = None
+
+        self.switches = 0
+        self.waits = 0
+
+    # -- residency -----------------------------------------------------------
+
+    def resident(self, refresh: bool = False) -> Dict[str, dict]:
+        """Return ``{model: {"size", "size_vram", "expires_at"}}`` for loaded models."""
+        with self._ps_lock:
+            if refresh or time.monotonic() - self._resident_at > self.ps_ttl:
+                try:
+                    entries = self._ps().get("models", [])
+                    self._resident = {
+                        e.get("name") or e.get("model"): {
+                            "size": e.get("size", 0),
+                            "size_vram": e.get("size_vram", 0),
+                            "expires_at": e.get("expires_at"),
+                        }
+                        for e in entries
+                    }
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = e
+                self._resident_at = time.monotonic()
+            return dict(self._resident)
+
+    def is_resident(self, model: str) -> bool:
+        """True if ``model`` is currently loaded on the server."""
+        resident = self.resident()
+        return model in resident or _base(model) in resident
+
+    def memory(self) -> int:
+        """Bytes used by all resident models."""
+        return sum(info["size"] for info in self.resident().values())
+
+    # -- keep_alive ----------------------------------------------------------
+
+    def set_keep_alive(self, model: str, keep_alive: Any) -> None:
+        """Keep ``model`` loaded this long after its last request (e.g. ``"30m"``, ``-1``)."""
+        if keep_alive is None:
+            self._keep_alive.pop(_base(model), None)
+        else:
+            self._keep_alive[_base(model)] = keep_alive
+
+    def keep_alive_for(self, model: str) -> Any:
+        """Return the ``keep_alive`` set for ``model``, or None for the server default."""
+        return self._keep_alive.get(_base(model))
+
+    # -- preloading ----------------------------------------------------------
+
+    def preload(self, model: str, keep_alive: Any = None, wait: bool = False) -> bool:
+        """Load ``model`` ahead of the first request.
+
+        Does nothing if the model is resident or already being loaded. Returns
+        True if a load was started.
+        """
+        if keep_alive is not None:
+            self.set_keep_alive(model, keep_alive)
+        with self._cond:
+            if model in self._preloading:
+                return False
+            self._preloading.add(model)
+        if self.is_resident(model) or self.last_error is not None:
+            # Already loaded, or the server is unreachable.
+            with self._cond:
+                self._preloading.discard(model)
+            return False
+
+        def run():
+            try:
+                with self.slot(model):
+                    self._load(model, self.keep_alive_for(model))
+                self._resident_at = 0.0
+            except Exception as e:
+                self.last_error = e
+            finally:
+                with self._cond:
+                    self._preloading.discard(model)
+
+        if wait:
+            run()
+        else:
+            threading.Thread(target=run, name="ollama-preload", daemon=True).start()
+        return True
+
+    def unload(self, model: str) -> None:
+        """Ask the server to free ``model`` now."""
+        self._load(model, 0)
+        self._resident_at = 0.0
+
+    # -- admission -----------------------------------------------------------
+
+    def _admissible(self, model: str) -> bool:
+        if model in self._released:
+            return True
+        if model in self._active:
+            # Join the running group unless other models are waiting for a slot.
+            return not self._waiting or len(self._active) < self.max_loaded
+        return len(self._active) < self.max_loaded and (
+            not self._waiting or next(iter(self._waiting)) == model
+        )
+
+    def acquire(self, model: str) -> None:
+        """Block until a request for ``model`` may be sent."""
+        with self._cond:
+            if not self._admissible(model):
+                self.waits += 1
+                self._waiting[model] = self._waiting.get(model, 0) + 1
+                while not self._admissible(model):
+                    self._cond.wait()
+                self._waiting[model] -= 1
+                if not self._waiting[model]:
+                    del self._waiting[model]
+                    self._released.discard(model)
+                    # The next group may now be at the head of the queue.
+                    self._cond.notify_all()
+            if model not in self._active:
+                self.switches += 1
+            self._active[model] = self._active.get(model, 0) + 1
+
+    def release(self, model: str) -> None:
+        """Mark one request for ``model`` as finished."""
+        with self._cond:
+            self._active[model] -= 1
+            if self._active[model]:
+                return
+            del self._active[model]
+            # Hand the free slot to the oldest waiting group, all of it at once.
+            for waiting in self._waiting:
+                if waiting not in self._active and waiting not in self._released:
+                    self._released.add(waiting)
+                    break
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, model: str) -> Iterator[None]:
+        """Context manager around :meth:`acquire` / :meth:`release`."""
+        self.acquire(model)
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    def run(self, model: str, fn: Callable[[], Any]) -> Any:
+        """Call ``fn()`` once ``model`` has a slot."""
+        with self.slot(model):
+            return fn()
+
+    def stream(self, model: str, fn: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """Iterate ``fn()`` while holding a slot for ``model``."""
+        with self.slot(model):
+            yield from fn()
+
+    def stats(self) -> dict:
+        """Return models in use, queued requests per model and switch counts."""
+        with self._cond:
+            return {
+                "active": dict(self._active),
+                "waiting": dict(self._waiting),
+                "switches": self.switches,
+                "waits": self.waits,
+                "resident": sorted(self._resident),
+            }
@@ -0,0 +1,244 @@
+"""Persistent cache for deterministic generate/chat responses.
+
+Responses are stored in SQLite, keyed by model digest, the normalized prompt
+or messages and all sampling options, with size-bounded LRU eviction. A request
+is only cached when it is deterministic (``temperature`` 0 or a fixed ``seed``)
+or when the caller passes ``cache=True``. Cached responses can be replayed as a
+stream so that streaming UI code does not need to change.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+__all__ = [
+    "ResponseCache",
+    "as_record",
+    "default_max_bytes",
+    "is_cacheable",
+    "make_key",
+    "record_stream",
+    "replay_stream",
+]
+
+# kwargs that do not change the generated text
+_IGNORED_KWARGS = {"keep_alive", "stream"}
+
+_REPLAY_PIECE = re.compile(r"(?:\S+\s*){1,4}|\s+")
+
+
+def is_cacheable(options: Optional[dict], cache: Optional[bool] = None) -> bool:
+    """Return True if a request with ``options`` may be served from the cache.
+
+    ``cache=True`` / ``cache=False`` force the decision; ``None`` caches only
+    deterministic requests.
+    """
+    if cache is not None:
+        return cache
+    options = options or {}
+    return options.get("temperature", None) == 0 or options.get("seed") is not None
+
+
+def _normalize(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        value = value.model_dump(exclude_none=True)
+    if isinstance(value, str):
+        return value.replace("\r\n", "\n").strip()
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha256(value).hexdigest()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items()) if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(kind: str, model: str, digest: str, payload: dict) -> str:
+    """Build the cache key for a ``generate``/``chat`` request.
+
+    Args:
+        kind: ``"generate"`` or ``"chat"``.
+        model: Model name as requested.
+        digest: Model digest, so a re-pulled model never serves old answers.
+        payload: Prompt/messages plus all other request arguments.
+    """
+    payload = {k: v for k, v in payload.items() if k not in _IGNORED_KWARGS}
+    blob = json.dumps(
+        [kind, model, digest, _normalize(payload)],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _text_of(part: Any, kind: str) -> str:
+    if kind == "chat":
+        message = part.get("message") or {}
+        return message.get("content", "") or ""
+    return part.get("response", "") or ""
+
+
+def _with_text(record: dict, kind: str, text: str, done: bool) -> dict:
+    part = dict(record) if done else {"model": record.get("model", ""), "done": False}
+    if kind == "chat":
+        message = dict(record.get("message") or {"role": "assistant"})
+        if not done:
+            message = {"role": message.get("role", "assistant")}
+        message["content"] = text
+        part["message"] = message
+    else:
+        part["response"] = text
+    return part
+
+
+def as_record(response: Any) -> dict:
+    """Return a JSON-serializable dict for an SDK response object or dict."""
+    if hasattr(response, "model_dump"):
+        return response.model_dump(mode="json", exclude_none=True)
+    return dict(response)
+
+
+def replay_stream(record: dict, kind: str) -> Iterator[dict]:
+    """Yield a cached response as stream chunks of a few words each.
+
+    The final chunk carries ``done=True`` and the original timing stats.
+    """
+    for piece in _REPLAY_PIECE.findall(_text_of(record, kind)):
+        yield _with_text(record, kind, piece, done=False)
+    yield _with_text(record, kind, "", done=True)
+
+
+def record_stream(
+    parts: Iterable[Any], kind: str, on_complete: Callable[[dict], None]
+) -> Iterator[Any]:
+    """Pass stream chunks through and hand the assembled response to ``on_complete``.
+
+    Nothing is recorded if the stream is abandoned or fails before ``done``.
+    """
+    pieces = []
+    for part in parts:
+        pieces.append(_text_of(part, kind))
+        yield part
+        if part.get("done"):
+            on_complete(_with_text(as_record(part), kind, "".join(pieces), done=True))
+
+
+class ResponseCache:
+    """SQLite-backed response store with LRU eviction and hit/miss counters.
+
+    Args:
+        path: SQLite database file.
+        max_bytes: Evict least recently used entries above this total size.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Running total of the stored sizes; recounted only when it goes over
+        # max_bytes, which also picks up writes from other processes.
+        self._bytes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+            )
+            self._bytes = self._total(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _total(db: sqlite3.Connection) -> int:
+        return db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached response for ``key`` and mark it as recently used."""
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, record: dict) -> None:
+        """Store ``record`` and evict least recently used entries over ``max_bytes``."""
+        value = json.dumps(record, ensure_ascii=False, default=str)
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            db = self._db()
+            replaced = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._bytes += size - (replaced[0] if replaced else 0)
+            if self._bytes > self.max_bytes:
+                total = self._total(db)
+                excess = total - self.max_bytes
+                freed = 0
+                stale = []
+                for old_key, old_size in db.execute(
+                    "SELECT key, size FROM responses ORDER BY last_used ASC"
+                ):
+                    if freed >= excess:
+                        break
+                    stale.append((old_key,))
+                    freed += old_size
+                db.executemany("DELETE FROM responses WHERE key = ?", stale)
+                self._bytes = total - freed
+            db.commit()
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM responses")
+            db.commit()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size of the store."""
+        with self._lock:
+            entries, size = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+def default_max_bytes() -> int:
+    """Cache size limit from ``OLLAMA_RESPONSE_CACHE_MB`` (default 256 MB)."""
+    return int(float(os.environ.get("OLLAMA_RESPONSE_CACHE_MB", "256")) * 1024 * 1024)
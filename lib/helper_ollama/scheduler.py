@@ -0,0 +1,281 @@
+"""Client-side request scheduler with priority classes.
+
+Ollama serves ``OLLAMA_NUM_PARALLEL`` requests at a time and queues the rest
+in arrival order, so one large batch job pushes every chat message to the back
+of the queue. :class:`RequestScheduler` keeps that queue on the client instead:
+at most ``limit`` requests are sent at once and waiting requests are released
+by priority class (``interactive`` before ``standard`` before ``bulk``). Bulk
+requests never take the last free slot, and within a class the sessions take
+turns (start-time fair queuing), so one session with thousands of queued
+requests cannot starve another.
+
+The priority of a request comes from the surrounding context::
+
+    with request_priority("bulk", session="nightly-import"):
+        for row in rows:
+            generate("gemma3:1b", row)  # waits behind any interactive chat
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+from .transport import NUM_PARALLEL
+
+__all__ = [
+    "PRIORITIES",
+    "RequestScheduler",
+    "current_priority",
+    "current_session",
+    "get_scheduler",
+    "request_priority",
+]
+
+PRIORITIES = ("interactive", "standard", "bulk")
+_RANK = {name: rank for rank, name in enumerate(PRIORITIES)}
+
+_priority: contextvars.ContextVar[Tuple[str, Optional[Hashable]]] = contextvars.ContextVar(
+    "ollama_request_priority", default=("standard", None)
+)
+
+_session: contextvars.ContextVar[Hashable] = contextvars.ContextVar("ollama_request_session")
+
+
+@contextmanager
+def request_priority(priority: str, session: Optional[Hashable] = None) -> Iterator[None]:
+    """Send requests made inside the block with ``priority`` on behalf of ``session``."""
+    if priority not in _RANK:
+        raise ValueError(f"Unknown priority {priority!r}, expected one of {PRIORITIES}")
+    token = _priority.set((priority, session))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_session() -> Hashable:
+    """Return the default session of the current thread or asyncio task.
+
+    Threads and asyncio tasks each run in their own context, so each gets its
+    own session on first use. Tasks created afterwards inherit the session of
+    the code that created them, so the requests of one ``gather`` share it.
+    """
+    try:
+        return _session.get()
+    except LookupError:
+        session = object()
+        _session.set(session)
+        return session
+
+
+def current_priority() -> Tuple[str, Hashable]:
+    """Return ``(priority, session)`` for the current context.
+
+    Without an explicit session, requests are attributed to
+    :func:`current_session`.
+    """
+    priority, session = _priority.get()
+    return priority, session if session is not None else current_session()
+
+
+class _Waiter:
+    __slots__ = ("priority", "session", "enqueued", "granted", "cancelled", "notify")
+
+    def __init__(self, priority: str, session: Hashable, notify: Callable[[], None]):
+        self.priority = priority
+        self.session = session
+        self.enqueued = time.perf_counter()
+        self.granted = False
+        self.cancelled = False
+        self.notify = notify
+
+
+class RequestScheduler:
+    """Admit requests by priority class with a global concurrency limit.
+
+    Args:
+        limit: Requests in flight at once; match the server's parallel slots.
+        bulk_limit: Slots bulk requests may use; defaults to ``limit - 1`` so
+            an interactive request never waits for a whole bulk generation.
+        history: Number of recent wait times kept per class for the metrics.
+    """
+
+    def __init__(self, limit: int = NUM_PARALLEL, bulk_limit: Optional[int] = None, history: int = 1000):
+        self.limit = max(1, limit)
+        self.bulk_limit = max(1, bulk_limit if bulk_limit is not None else self.limit - 1)
+
+        self._lock = threading.Lock()
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._in_flight: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._queued: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        # start-time fair queuing: per-class virtual clock and per-session tags
+        self._clock: Dict[str, float] = {p: 0.0 for p in PRIORITIES}
+        self._tags: Dict[Tuple[str, Hashable], float] = {}
+        self._waits: Dict[str, deque] = {p: deque(maxlen=history) for p in PRIORITIES}
+        self._granted: Dict[str, int] = {p: 0 for p in PRIORITIES}
+
+    # -- queue ---------------------------------------------------------------
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        key = (waiter.priority, waiter.session)
+        tag = max(self._clock[waiter.priority], self._tags.get(key, 0.0)) + 1.0
+        self._tags[key] = tag
+        self._queued[waiter.priority] += 1
+        heapq.heappush(self._heap, (_RANK[waiter.priority], tag, next(self._seq), waiter))
+
+    def _dispatch(self) -> None:
+        # Called with the lock held: grant free slots to the best waiters.
+        while self._heap and sum(self._in_flight.values()) < self.limit:
+            _, tag, _, waiter = self._heap[0]
+            if waiter.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            if waiter.priority == "bulk" and self._in_flight["bulk"] >= self.bulk_limit:
+                # Only bulk requests are left; keep the remaining slots free.
+                break
+            heapq.heappop(self._heap)
+            self._queued[waiter.priority] -= 1
+            self._clock[waiter.priority] = tag
+            self._grant(waiter)
+            waiter.notify()
+        if not self._heap:
+            self._tags.clear()
+
+    def _grant(self, waiter: _Waiter) -> None:
+        waiter.granted = True
+        self._in_flight[waiter.priority] += 1
+        self._granted[waiter.priority] += 1
+        self._waits[waiter.priority].append(time.perf_counter() - waiter.enqueued)
+
+    def _cancel(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                self._release(waiter.priority)
+            elif not waiter.cancelled:
+                waiter.cancelled = True
+                self._queued[waiter.priority] -= 1
+
+    def _release(self, priority: str) -> None:
+        self._in_flight[priority] -= 1
+        self._dispatch()
+
+    # -- blocking API --------------------------------------------------------
+
+    def acquire(self, priority: str = "standard", session: Hashable = None, timeout: Optional[float] = None) -> None:
+        """Block until a request of ``priority`` may be sent.
+
+        Raises:
+            TimeoutError: If no slot became free within ``timeout`` seconds.
+        """
+        if session is None:
+            session = current_session()
+        event = threading.Event()
+        waiter = _Waiter(priority, session, event.set)
+        with self._lock:
+            self._enqueue(waiter)
+            self._dispatch()
+        if not event.wait(timeout):
+            # Also frees the slot if it was granted right after the timeout.
+            self._cancel(waiter)
+            raise TimeoutError(f"No Ollama slot free within {timeout}s")
+
+    def release(self, priority: str = "standard") -> None:
+        """Free the slot of a finished request."""
+        with self._lock:
+            self._release(priority)
+
+    @contextmanager
+    def slot(self, priority: str = "standard", session: Hashable = None) -> Iterator[None]:
+        """Hold one slot for the duration of the block."""
+        self.acquire(priority, session)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def run(self, priority: str, session: Hashable, fn: Callable[[], Any]) -> Any:
+        """Call ``fn()`` in a slot."""
+        with self.slot(priority, session):
+            return fn()
+
+    def stream(self, priority: str, session: Hashable, fn: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """Iterate ``fn()`` while holding a slot."""
+        with self.slot(priority, session):
+            yield from fn()
+
+    # -- asyncio API ---------------------------------------------------------
+
+    async def acquire_async(self, priority: str = "standard", session: Hashable = None) -> None:
+        """Wait for a slot without blocking the event loop."""
+        if session is None:
+            session = current_session()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = _Waiter(priority, session, notify)
+        with self._lock:
+            self._enqueue(waiter)
+            self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._cancel(waiter)
+            raise
+
+    @asynccontextmanager
+    async def aslot(self, priority: str = "standard", session: Hashable = None) -> AsyncIterator[None]:
+        """Async counterpart of :meth:`slot`."""
+        await self.acquire_async(priority, session)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    # -- metrics -------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Return slots in use, queue depth and recent wait times per priority class."""
+        with self._lock:
+            classes = {}
+            for p in PRIORITIES:
+                waits = sorted(self._waits[p])
+                classes[p] = {
+                    "in_flight": self._in_flight[p],
+                    "queued": self._queued[p],
+                    "granted": self._granted[p],
+                    "wait_mean": sum(waits) / len(waits) if waits else 0.0,
+                    "wait_p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                    "wait_max": waits[-1] if waits else 0.0,
+                }
+            return {
+                "limit": self.limit,
+                "in_flight": sum(self._in_flight.values()),
+                "queued": sum(self._queued.values()),
+                "classes": classes,
+            }
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Return the process-wide scheduler shared by all Ollama requests."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler()
+    return _scheduler
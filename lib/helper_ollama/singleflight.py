@@ -0,0 +1,131 @@
+"""Coalesce identical in-flight requests into one upstream call.
+
+When many sessions send the same request at the same time, only the first
+one goes to the server. For streams, a background thread reads the upstream
+stream once and every caller gets its own iterator over the shared chunks;
+callers that join late first receive the chunks produced so far.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+__all__ = ["SingleFlight"]
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Broadcast:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+    def subscribe(self) -> Iterator[Any]:
+        index = 0
+        while True:
+            with self.cond:
+                while index >= len(self.items) and not self.done:
+                    self.cond.wait()
+                if index < len(self.items):
+                    item = self.items[index]
+                    index += 1
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            yield item
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key.
+
+    Example:
+        >>> flights = SingleFlight()
+        >>> flights.do("key", lambda: expensive())          # blocking result
+        >>> for chunk in flights.stream("key", lambda: upstream_stream()):
+        ...     print(chunk)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self.flights = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Return ``fn()``; concurrent callers with the same key share one call."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.flights += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def stream(self, key: str, fn: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """Return an iterator over ``fn()``'s chunks shared with concurrent callers."""
+        with self._lock:
+            broadcast = self._streams.get(key)
+            leader = broadcast is None
+            if leader:
+                broadcast = self._streams[key] = _Broadcast()
+                self.flights += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            threading.Thread(
+                target=self._pump, args=(key, broadcast, fn), name="ollama-single-flight", daemon=True
+            ).start()
+        return broadcast.subscribe()
+
+    def _pump(self, key: str, broadcast: _Broadcast, fn: Callable[[], Iterable[Any]]) -> None:
+        try:
+            for item in fn():
+                with broadcast.cond:
+                    broadcast.items.append(item)
+                    broadcast.cond.notify_all()
+        except BaseException as e:  # noqa: BLE001 - re-raised in every subscriber
+            broadcast.error = e
+        finally:
+            with self._lock:
+                self._streams.pop(key, None)
+            with broadcast.cond:
+                broadcast.done = True
+                broadcast.cond.notify_all()
+
+    def stats(self) -> dict:
+        """Return the number of upstream calls and of callers that joined one."""
+        with self._lock:
+            return {
+                "flights": self.flights,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._streams),
+            }
@@ -0,0 +1,115 @@
+"""One pooled HTTP transport for every Ollama call in the app.
+
+The SDK wrappers in ``helper_ollama``, the async layer and the raw NDJSON
+streaming used by ``helper_streamlit`` and the vision pages all share one
+keep-alive connection pool per process (one more per event loop for async
+code). Settings come from the environment:
+
+- ``OLLAMA_HOST``: server base URL (default ``http://localhost:11434``)
+- ``OLLAMA_NUM_PARALLEL``: parallel slots of the server; sizes the pool (default 4)
+- ``OLLAMA_CONNECT_TIMEOUT`` / ``OLLAMA_READ_TIMEOUT``: seconds (default 5 / 300)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+from lib.lazy import lazy_import
+
+# Imported on the first request, not when a page imports helper_ollama
+httpx = lazy_import("httpx")
+o = lazy_import("ollama")
+
+__all__ = [
+    "OLLAMA_HOST",
+    "NUM_PARALLEL",
+    "async_client_kwargs",
+    "get_client",
+    "get_json",
+    "post_json",
+    "stream_ndjson",
+]
+
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
+if "://" not in OLLAMA_HOST:
+    OLLAMA_HOST = f"http://{OLLAMA_HOST}"
+
+NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", "300"))
+
+_client: Optional[o.Client] = None
+_client_lock = threading.Lock()
+
+
+def _client_kwargs() -> Dict[str, Any]:
+    # Keep one warm connection per server slot; allow a few extra for
+    # short metadata calls (/api/tags, /api/show, /api/ps) next to generations.
+    return {
+        "host": OLLAMA_HOST,
+        "timeout": httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=NUM_PARALLEL + 4,
+            max_keepalive_connections=NUM_PARALLEL,
+        ),
+    }
+
+
+def async_client_kwargs() -> Dict[str, Any]:
+    """Keyword arguments for ``ollama.AsyncClient`` with the same pool settings."""
+    return _client_kwargs()
+
+
+def get_client() -> o.Client:
+    """Return the process-wide ``ollama.Client``."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = o.Client(**_client_kwargs())
+    return _client
+
+
+def _http() -> httpx.Client:
+    # Raw requests reuse the SDK client's httpx pool instead of opening their own.
+    return get_client()._client
+
+
+def get_json(path: str, timeout: Optional[float] = None) -> dict:
+    """GET ``path`` (e.g. ``/api/tags``) and return the decoded JSON body."""
+    kwargs = {} if timeout is None else {"timeout": timeout}
+    response = _http().get(path, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+def post_json(path: str, payload: dict, timeout: Optional[float] = None) -> dict:
+    """POST ``payload`` to ``path`` and return the decoded JSON body."""
+    kwargs = {} if timeout is None else {"timeout": timeout}
+    response = _http().post(path, json=payload, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+def stream_ndjson(path: str, payload: dict) -> Iterator[dict]:
+    """POST ``payload`` to ``path`` and yield each NDJSON line as a dict.
+
+    Example:
+        >>> for part in stream_ndjson("/api/generate", {"model": "gemma3:1b", "prompt": "Hi"}):
+        ...     print(part.get("response", ""), end="")
+    """
+    payload = {**payload, "stream": True}
+    with _http().stream("POST", path, json=payload) as response:
+        if response.is_error:
+            response.read()
+            response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            part = json.loads(line)
+            if "error" in part:
+                raise Exception(part["error"])
+            yield part
@@ -0,0 +1,29 @@
+"""
+Retrieval helpers: chunking and vector indexes for RAG pages.
+"""
+
+from .chunking import chunk_text
+from .documents import DocumentCache, document_key
+from .folder_index import FolderIndex, Hit, IndexUpdate, get_folder_index
+from .ivf import IVFIndex
+from .quantized import EmbeddingFile, append_embeddings, open_embeddings, write_embeddings
+from .vector_store import SearchResult, VectorStore, normalize, top_k
+
+__all__ = [
+    "DocumentCache",
+    "EmbeddingFile",
+    "FolderIndex",
+    "Hit",
+    "IVFIndex",
+    "IndexUpdate",
+    "SearchResult",
+    "VectorStore",
+    "append_embeddings",
+    "chunk_text",
+    "document_key",
+    "get_folder_index",
+    "normalize",
+    "open_embeddings",
+    "top_k",
+    "write_embeddings",
+]
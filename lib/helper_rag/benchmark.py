@@ -0,0 +1,148 @@
+"""Recall and latency of the IVF index against exact search.
+
+For each ``nprobe`` the benchmark reports recall@k (the share of the exact
+top-k that the index also returns) and per-query latency (p50/p95, one query
+at a time, as a page would ask). Exact search over the same vectors
+(:class:`~lib.helper_rag.vector_store.VectorStore`) is the baseline. The
+vectors come from an embedding folder written by
+:func:`~lib.helper_rag.quantized.write_embeddings` or are generated: noisy
+clusters on the unit sphere, which resemble real embeddings better than
+uniform noise, where every ANN index does poorly.
+
+Results are saved as CSV below ``.cache/benchmarks``.
+
+Run from the command line::
+
+    python -m lib.helper_rag.benchmark --rows 1000000 --dim 384 --nprobe 1 4 16 64
+    python -m lib.helper_rag.benchmark --embeddings .cache/rag/pdfs
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from lib.cache_dir import cache_path
+
+from .ivf import IVFIndex
+from .quantized import open_embeddings
+from .vector_store import VectorStore
+
+__all__ = ["AnnResult", "clustered_vectors", "run_ann_benchmark", "save_ann_results"]
+
+
+@dataclass
+class AnnResult:
+    """Recall and per-query latency of one search configuration."""
+
+    method: str
+    nprobe: Optional[int]
+    recall: float
+    p50_ms: float
+    p95_ms: float
+    build_s: float
+
+
+def clustered_vectors(rows: int, dim: int, clusters: int = 1000, noise: float = 1.0, seed: int = 0) -> np.ndarray:
+    """Return ``rows`` float32 vectors scattered around ``clusters`` random centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    out = np.empty((rows, dim), dtype=np.float32)
+    for start in range(0, rows, 65536):
+        n = min(65536, rows - start)
+        out[start:start + n] = centres[rng.integers(0, clusters, n)]
+        out[start:start + n] += noise * rng.normal(size=(n, dim)).astype(np.float32)
+    return out
+
+
+def _timed(search, queries: np.ndarray) -> tuple:
+    ids, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        ids.append(search(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return ids, latencies
+
+
+def run_ann_benchmark(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    nprobes: Sequence[int] = (1, 4, 16, 64),
+    n_lists: Optional[int] = None,
+) -> List[AnnResult]:
+    """Build exact and IVF indexes over ``vectors`` and measure them on ``queries``."""
+    start = time.perf_counter()
+    exact = VectorStore(dim=vectors.shape[1], capacity=len(vectors))
+    exact.add(vectors)
+    exact_build = time.perf_counter() - start
+
+    truth, latencies = _timed(lambda q: {hit.id for hit in exact.search(q, k=k)}, queries)
+    results = [AnnResult("exact", None, 1.0, float(np.percentile(latencies, 50)),
+                         float(np.percentile(latencies, 95)), exact_build)]
+
+    start = time.perf_counter()
+    index = IVFIndex(n_lists=n_lists)
+    index.add(vectors)
+    build = time.perf_counter() - start
+
+    for nprobe in nprobes:
+        found, latencies = _timed(lambda q: index.search(q, k=k, nprobe=nprobe)[0], queries)
+        recall = np.mean([len(truth_ids & set(ids.tolist())) / k for truth_ids, ids in zip(truth, found)])
+        results.append(AnnResult(
+            f"ivf{index.n_lists}", nprobe, float(recall),
+            float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95)), build,
+        ))
+    return results
+
+
+def save_ann_results(results: List[AnnResult], directory: Optional[Path] = None) -> Path:
+    """Write the results as ``ann_<timestamp>.csv`` and return the path."""
+    folder = Path(directory) if directory else cache_path("benchmarks", "ann.csv").parent
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"ann_{datetime.now().strftime('%Y%m%dT%H%M%S')}.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(asdict(results[0])))
+        writer.writeheader()
+        writer.writerows(asdict(r) for r in results)
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare IVF search with exact search.")
+    parser.add_argument("--embeddings", help="embedding folder (write_embeddings); default: synthetic data")
+    parser.add_argument("--rows", type=int, default=200_000, help="synthetic vectors")
+    parser.add_argument("--dim", type=int, default=384, help="synthetic dimension")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=None, help="IVF clusters (default: sqrt(rows))")
+    parser.add_argument("--nprobe", nargs="+", type=int, default=[1, 4, 16, 64])
+    args = parser.parse_args(argv)
+
+    if args.embeddings:
+        vectors = open_embeddings(args.embeddings).vectors()
+    else:
+        vectors = clustered_vectors(args.rows, args.dim)
+    rng = np.random.default_rng(1)
+    # queries near, but not on, corpus vectors
+    queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+    queries = queries + 0.5 * queries.std() * rng.normal(size=queries.shape).astype(np.float32)
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}")
+    results = run_ann_benchmark(vectors, queries, k=args.k, nprobes=args.nprobe, n_lists=args.lists)
+    print(f"{'method':<10} {'nprobe':>6} {'recall':>7} {'p50':>9} {'p95':>9} {'build':>8}")
+    for r in results:
+        nprobe = "-" if r.nprobe is None else r.nprobe
+        print(f"{r.method:<10} {nprobe:>6} {r.recall:>7.3f} {r.p50_ms:>7.2f}ms {r.p95_ms:>7.2f}ms {r.build_s:>7.1f}s")
+    print(f"Saved {save_ann_results(results)}")
+
+
+if __name__ == "__main__":
+    main()
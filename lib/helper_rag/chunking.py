@@ -0,0 +1,47 @@
+"""Split documents into overlapping chunks for retrieval."""
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+__all__ = ["chunk_text"]
+
+_BREAKS = ("\n\n", "\n", ". ", " ")
+
+
+def chunk_text(text: str, size: int = 1000, overlap: int = 150) -> List[Tuple[int, str]]:
+    """Split ``text`` into chunks of at most ``size`` characters.
+
+    Each chunk ends at the last paragraph break, line break, sentence end or
+    space in its second half if there is one, and the next chunk starts
+    ``overlap`` characters before that end.
+
+    Args:
+        text: Text to split.
+        size: Maximum chunk length in characters.
+        overlap: Characters shared by neighbouring chunks.
+
+    Returns:
+        ``(start_offset, chunk)`` pairs; whitespace-only chunks are dropped.
+    """
+    if size <= 0:
+        raise ValueError("size must be positive")
+    overlap = max(0, min(overlap, size // 2))
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            for sep in _BREAKS:
+                cut = text.rfind(sep, start + size // 2, end)
+                if cut != -1:
+                    end = cut + len(sep)
+                    break
+        chunk = text[start:end]
+        if chunk.strip():
+            chunks.append((start, chunk))
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
@@ -0,0 +1,194 @@
+"""Content-addressed cache for processed documents.
+
+Pages that load, split, embed and summarize an uploaded file would otherwise
+redo all of it on every rerun. :func:`document_key` derives a key from the
+file's bytes and the processing settings (splitter, embedding model, ...);
+:class:`DocumentCache` keeps the artifacts of one key on disk below
+``.cache/rag/documents/<key>/`` and the objects loaded from them in memory:
+
+- :meth:`DocumentCache.json` for chunks and other JSON data
+- :meth:`DocumentCache.text` for summaries and other text
+- :meth:`DocumentCache.resource` for objects with their own save/load, such
+  as a FAISS index (``save_local``/``load_local``)
+
+Each artifact is built once per key; later reruns and sessions load it.
+
+Example:
+    >>> cache = DocumentCache(document_key(data, chunk_size=500, embeddings="nomic-embed-text"))
+    >>> chunks = cache.json("chunks", lambda: split(data))
+    >>> summary = cache.text("summary", lambda: summarize(chunks), variant="llama3")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from lib.cache_dir import cache_path
+
+__all__ = ["DocumentCache", "document_key"]
+
+MEMORY_ITEMS = int(os.environ.get("STARTERAPP_DOCUMENT_CACHE_ITEMS", "16"))
+
+
+def document_key(data: bytes, **settings: Any) -> str:
+    """Return a key for ``data`` processed with ``settings`` (JSON-serializable values)."""
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+# Objects loaded from disk, shared by all DocumentCache instances:
+# (key, artifact) -> object, least recently used first.
+_memory: "OrderedDict[tuple, Any]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _remember(slot: tuple, value: Any) -> Any:
+    with _memory_lock:
+        _memory[slot] = value
+        _memory.move_to_end(slot)
+        while len(_memory) > MEMORY_ITEMS:
+            _memory.popitem(last=False)
+    return value
+
+
+def _recall(slot: tuple) -> Any:
+    with _memory_lock:
+        if slot in _memory:
+            _memory.move_to_end(slot)
+            return _memory[slot]
+    return None
+
+
+# (key, artifact) -> [lock, threads using it]. Pages create a new DocumentCache
+# on every rerun, so the build lock must not live on the instance.
+_building: Dict[tuple, list] = {}
+
+
+@contextmanager
+def _build_lock(slot: tuple) -> Iterator[None]:
+    with _memory_lock:
+        entry = _building.setdefault(slot, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _memory_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _building[slot]
+
+
+class DocumentCache:
+    """Artifacts of one processed document, on disk and in memory.
+
+    Args:
+        key: Usually from :func:`document_key`.
+        root: Folder for all documents; defaults to ``.cache/rag/documents``.
+    """
+
+    def __init__(self, key: str, root: Optional[Path] = None):
+        self.key = key
+        if root is None:
+            root = cache_path("rag", "documents", key).parent
+        self.path = Path(root) / key
+
+    def _name(self, name: str, variant: Any = None) -> str:
+        name = re.sub(r"[^\w.-]", "_", name)
+        if variant is not None:
+            tag = json.dumps(variant, sort_keys=True, default=str).encode("utf-8")
+            name = f"{name}-{hashlib.sha256(tag).hexdigest()[:12]}"
+        return name
+
+    def _cached(self, artifact: str, load: Callable[[Path], Any], build_and_save: Callable[[Path], Any]) -> Any:
+        slot = (self.key, artifact)
+        value = _recall(slot)
+        if value is not None:
+            return value
+        with _build_lock(slot):  # one build per artifact even with concurrent reruns
+            value = _recall(slot)
+            if value is not None:
+                return value
+            target = self.path / artifact
+            if target.exists():
+                try:
+                    return _remember(slot, load(target))
+                except Exception:  # unreadable or from an older version: rebuild
+                    if target.is_dir():
+                        shutil.rmtree(target, ignore_errors=True)
+                    else:
+                        target.unlink(missing_ok=True)
+            self.path.mkdir(parents=True, exist_ok=True)
+            return _remember(slot, build_and_save(target))
+
+    def json(self, name: str, build: Callable[[], Any], variant: Any = None) -> Any:
+        """Return the JSON artifact ``name``, building and saving it on the first call."""
+
+        def load(target: Path) -> Any:
+            with open(target, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        def build_and_save(target: Path) -> Any:
+            value = build()
+            tmp = target.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp, target)
+            return value
+
+        return self._cached(self._name(name, variant) + ".json", load, build_and_save)
+
+    def text(self, name: str, build: Callable[[], str], variant: Any = None) -> str:
+        """Return the text artifact ``name``, building and saving it on the first call."""
+
+        def build_and_save(target: Path) -> str:
+            value = build()
+            tmp = target.with_suffix(".tmp")
+            tmp.write_text(value, encoding="utf-8")
+            os.replace(tmp, target)
+            return value
+
+        return self._cached(
+            self._name(name, variant) + ".txt",
+            lambda target: target.read_text(encoding="utf-8"),
+            build_and_save,
+        )
+
+    def resource(
+        self,
+        name: str,
+        build: Callable[[], Any],
+        save: Callable[[Any, Path], None],
+        load: Callable[[Path], Any],
+        variant: Any = None,
+    ) -> Any:
+        """Return an object that saves itself into a folder (e.g. a vector index).
+
+        Args:
+            name: Artifact name.
+            build: Creates the object on a cache miss.
+            save: ``save(obj, folder)`` writes it, e.g. ``lambda db, p: db.save_local(p)``.
+            load: ``load(folder)`` reads it back.
+            variant: Extra settings the artifact depends on.
+        """
+
+        def build_and_save(target: Path) -> Any:
+            value = build()
+            tmp = target.with_name(target.name + ".tmp")
+            shutil.rmtree(tmp, ignore_errors=True)
+            save(value, tmp)
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(tmp, target)
+            return value
+
+        return self._cached(self._name(name, variant), load, build_and_save)
@@ -0,0 +1,288 @@
+"""Persistent, incrementally updated vector index of a folder of text files.
+
+The index of a folder lives in ``.cache/rag/folders/<key>/``:
+
+- ``vectors.npy``: one L2-normalized float32 row per chunk
+- ``index.json``: the chunks (file, offset, text) in row order and, per file,
+  its modification time, size and SHA-256
+
+:meth:`FolderIndex.update` compares the folder with the stored state. Files
+whose modification time and size are unchanged are skipped without reading
+them; files that were touched but whose content hash is unchanged keep their
+rows. Only new and changed files are chunked and embedded, and rows of deleted
+files are dropped. :meth:`FolderIndex.search` embeds the query and returns the
+top-k chunks by cosine similarity.
+
+Example:
+    >>> index = get_folder_index("./docs", "nomic-embed-text")
+    >>> index.update()
+    IndexUpdate(added=12, changed=0, removed=0, unchanged=0, embedded=87)
+    >>> for hit in index.search("How do I install it?", k=4):
+    ...     print(hit.path, hit.score)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lib.cache_dir import cache_path
+
+from .chunking import chunk_text
+from .vector_store import normalize, top_k
+
+__all__ = [
+    "FolderIndex",
+    "Hit",
+    "IndexUpdate",
+    "get_folder_index",
+]
+
+DEFAULT_SUFFIXES = (".txt", ".md")
+FORMAT_VERSION = 1
+
+Embedder = Callable[[Sequence[str]], np.ndarray]
+
+
+@dataclass(frozen=True)
+class Hit:
+    """One retrieved chunk."""
+
+    path: str  # relative to the indexed folder
+    start: int  # character offset in the file
+    text: str
+    score: float
+
+
+@dataclass(frozen=True)
+class IndexUpdate:
+    """What :meth:`FolderIndex.update` did (file counts and embedded chunks)."""
+
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    embedded: int = 0
+
+    @property
+    def modified(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class FolderIndex:
+    """Chunk embeddings of all text files below one folder, kept on disk.
+
+    Args:
+        folder: Folder to index (searched recursively).
+        model: Embedding model, e.g. ``"nomic-embed-text"``.
+        chunk_size: Maximum characters per chunk.
+        overlap: Characters shared by neighbouring chunks.
+        suffixes: File extensions to index.
+        max_file_bytes: Larger files are skipped.
+        embed: ``texts -> (n, dim) matrix``; defaults to
+            :func:`lib.helper_ollama.embed_many` with ``model``.
+        index_dir: Where to keep the index; defaults to a folder below the
+            cache directory derived from the arguments above.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        model: str,
+        chunk_size: int = 1000,
+        overlap: int = 150,
+        suffixes: Sequence[str] = DEFAULT_SUFFIXES,
+        max_file_bytes: int = 5_000_000,
+        embed: Optional[Embedder] = None,
+        index_dir: Optional[Path] = None,
+    ):
+        self.folder = Path(folder).resolve()
+        self.model = model
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.suffixes = tuple(s.lower() for s in suffixes)
+        self.max_file_bytes = max_file_bytes
+        self._embed = embed or self._embed_with_ollama
+        if index_dir is None:
+            settings = f"{self.folder}|{model}|{chunk_size}|{overlap}|{','.join(self.suffixes)}"
+            key = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+            index_dir = cache_path("rag", "folders", key, "index.json").parent
+        self.index_dir = Path(index_dir)
+
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._files: Dict[str, dict] = {}
+        self._chunks: List[Tuple[str, int, str]] = []
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+
+    def _embed_with_ollama(self, texts: Sequence[str]) -> np.ndarray:
+        from lib.helper_ollama.embed import embed_many
+
+        return embed_many(self.model, texts)
+
+    # -- persistence ---------------------------------------------------------
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.index_dir / "index.json", "r", encoding="utf-8") as f:
+                state = json.load(f)
+            vectors = np.load(self.index_dir / "vectors.npy", mmap_mode="r")  # shared page cache
+        except (OSError, ValueError):
+            return
+        chunks = [tuple(c) for c in state.get("chunks", [])]
+        if state.get("version") != FORMAT_VERSION or len(chunks) != len(vectors):
+            return  # stale or torn index: rebuild from scratch
+        self._files = state["files"]
+        self._chunks = chunks
+        self._vectors = vectors.astype(np.float32, copy=False)
+
+    def _save(self) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        vectors_tmp = self.index_dir / "vectors.npy.tmp"
+        with open(vectors_tmp, "wb") as f:
+            np.save(f, self._vectors)
+        index_tmp = self.index_dir / "index.json.tmp"
+        with open(index_tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "folder": str(self.folder),
+                "model": self.model,
+                "files": self._files,
+                "chunks": self._chunks,
+            }, f, ensure_ascii=False)
+        os.replace(vectors_tmp, self.index_dir / "vectors.npy")
+        os.replace(index_tmp, self.index_dir / "index.json")
+
+    # -- indexing ------------------------------------------------------------
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        found = {}
+        for root, dirs, names in os.walk(self.folder):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in names:
+                if not name.lower().endswith(self.suffixes):
+                    continue
+                path = Path(root) / name
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if stat.st_size <= self.max_file_bytes:
+                    found[path.relative_to(self.folder).as_posix()] = stat
+        return found
+
+    def update(self) -> IndexUpdate:
+        """Bring the index in line with the folder and save it if anything changed."""
+        with self._lock:
+            self._load()
+            found = self._scan()
+
+            rows_by_file: Dict[str, List[int]] = {}
+            for row, (path, _, _) in enumerate(self._chunks):
+                rows_by_file.setdefault(path, []).append(row)
+
+            files: Dict[str, dict] = {}
+            kept_rows: List[int] = []
+            new_chunks: List[Tuple[str, int, str]] = []
+            added = changed = unchanged = 0
+            touched = False
+            for rel, stat in sorted(found.items()):
+                entry = self._files.get(rel)
+                if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                    files[rel] = entry
+                    kept_rows.extend(rows_by_file.get(rel, []))
+                    unchanged += 1
+                    continue
+                try:
+                    raw = (self.folder / rel).read_bytes()
+                except OSError:
+                    continue
+                digest = hashlib.sha256(raw).hexdigest()
+                files[rel] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+                if entry and entry["sha256"] == digest:
+                    kept_rows.extend(rows_by_file.get(rel, []))
+                    unchanged += 1
+                    touched = True
+                    continue
+                text = raw.decode("utf-8", errors="ignore")
+                new_chunks.extend((rel, start, chunk) for start, chunk in chunk_text(text, self.chunk_size, self.overlap))
+                if entry:
+                    changed += 1
+                else:
+                    added += 1
+            removed = len(set(self._files) - set(files))
+
+            result = IndexUpdate(added, changed, removed, unchanged, len(new_chunks))
+            if not result.modified:
+                if touched:
+                    self._files = files
+                    self._save()
+                return result
+
+            if new_chunks:
+                try:
+                    new_vectors = normalize(self._embed([text for _, _, text in new_chunks]))
+                except Exception as e:
+                    raise Exception(f"Failed to embed {len(new_chunks)} chunks with {self.model}: {e}")
+            else:
+                new_vectors = np.empty((0, self._vectors.shape[1]), dtype=np.float32)
+            kept = self._vectors[kept_rows] if kept_rows else np.empty((0, new_vectors.shape[1]), dtype=np.float32)
+
+            self._vectors = np.ascontiguousarray(np.concatenate([kept, new_vectors]))
+            self._chunks = [self._chunks[row] for row in kept_rows] + new_chunks
+            self._files = files
+            self._save()
+            return result
+
+    # -- querying ------------------------------------------------------------
+
+    def search(self, query: str, k: int = 4) -> List[Hit]:
+        """Return the ``k`` chunks most similar to ``query``, best first."""
+        with self._lock:
+            self._load()
+            vectors, chunks = self._vectors, self._chunks
+        if not chunks or k <= 0:
+            return []
+        try:
+            q = normalize(self._embed([query]))[0]
+        except Exception as e:
+            raise Exception(f"Failed to embed the query with {self.model}: {e}")
+        scores = vectors @ q
+        top = top_k(scores, k)[0]
+        return [Hit(*chunks[i], score=float(scores[i])) for i in top]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._chunks)
+
+    @property
+    def files(self) -> List[str]:
+        """Indexed files, relative to the folder."""
+        with self._lock:
+            self._load()
+            return sorted(self._files)
+
+
+_indexes: Dict[tuple, FolderIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_folder_index(folder: str, model: str, chunk_size: int = 1000, overlap: int = 150) -> FolderIndex:
+    """Return the shared :class:`FolderIndex` for these settings (one per process)."""
+    key = (str(Path(folder).resolve()), model, chunk_size, overlap)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = FolderIndex(folder, model, chunk_size=chunk_size, overlap=overlap)
+        return index
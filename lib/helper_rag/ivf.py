@@ -0,0 +1,311 @@
+"""Inverted-file (IVF) approximate nearest-neighbour index in NumPy.
+
+Exact search reads every vector for every query, so its cost grows linearly
+with the corpus. An IVF index splits the normalized vectors into ``n_lists``
+clusters with spherical k-means. A query is compared with the cluster
+centroids first, and only the vectors of the ``nprobe`` closest clusters are
+scored. With ``n_lists ~ sqrt(n)``, a query reads about ``nprobe / n_lists`` of
+the corpus. ``nprobe`` is the recall/latency trade-off: 1 is fastest, and
+``n_lists`` is exact search.
+
+Vectors added after training go to their nearest cluster. Once the corpus has
+outgrown the clusters (``sqrt(n)`` reaches twice ``n_lists``, or an explicit
+``n_lists`` could not be met by the first batch), :meth:`IVFIndex.add`
+retrains on everything stored. Retraining is a full rebuild, but because the
+corpus must quadruple between rebuilds its amortized cost per vector stays
+constant. Build a new index if the data drifts far from the training sample.
+
+:meth:`IVFIndex.save` writes the lists sorted by cluster as ``.npy`` files.
+:meth:`IVFIndex.load` memory-maps them, so loading is instant and processes
+share the pages.
+
+Example:
+    >>> index = IVFIndex(nprobe=16)
+    >>> index.add(vectors)                      # trains on the first batch
+    >>> ids, scores = index.search(query, k=10)
+    >>> index.save(".cache/rag/pdfs-ivf")
+
+See :mod:`lib.helper_rag.benchmark` for recall and latency against exact search.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .vector_store import normalize, top_k
+
+__all__ = ["IVFIndex", "default_n_lists", "spherical_kmeans"]
+
+FORMAT_VERSION = 1
+TRAIN_POINTS_PER_LIST = 64  # training sample size per cluster
+BLOCK_ROWS = 16384  # rows assigned per matrix multiply
+
+
+def default_n_lists(n: int) -> int:
+    """About ``sqrt(n)`` clusters, at least 1."""
+    return max(1, int(round(math.sqrt(n))))
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        scores = vectors[start:start + BLOCK_ROWS] @ centroids.T
+        labels[start:start + len(scores)] = scores.argmax(axis=1)
+    return labels
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """Cluster normalized ``vectors`` by cosine similarity; returns normalized centroids.
+
+    Centroids start at random distinct rows. A cluster that runs empty is
+    re-seeded with the row that is farthest from its own centroid.
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(vectors, centroids)
+        counts = np.bincount(labels, minlength=n_clusters)
+        order = np.argsort(labels, kind="stable")
+        filled = np.flatnonzero(counts)
+        sums = np.zeros_like(centroids)
+        starts = np.concatenate([[0], np.cumsum(counts[filled])[:-1]])
+        sums[filled] = np.add.reduceat(vectors[order], starts, axis=0)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            fit = np.einsum("ij,ij->i", vectors, centroids[labels])
+            sums[empty] = vectors[np.argsort(fit)[:len(empty)]]
+        centroids = normalize(sums)
+    return centroids
+
+
+class _InvertedList:
+    """Vectors and ids of one cluster; capacity doubles on growth."""
+
+    __slots__ = ("vectors", "ids", "size")
+
+    def __init__(self, vectors: np.ndarray, ids: np.ndarray):
+        self.vectors, self.ids, self.size = vectors, ids, len(ids)
+
+    def append(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        end = self.size + len(ids)
+        if end > len(self.ids):  # also moves a memory-mapped list into RAM
+            capacity = max(end, 2 * len(self.ids), 16)
+            grown = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            grown_ids[:self.size] = self.ids[:self.size]
+            self.vectors, self.ids = grown, grown_ids
+        self.vectors[self.size:end] = vectors
+        self.ids[self.size:end] = ids
+        self.size = end
+
+
+class IVFIndex:
+    """Approximate cosine-similarity search over clustered vectors.
+
+    Args:
+        n_lists: Number of clusters; defaults to ``sqrt(n)``, following the
+            corpus as it grows.
+        nprobe: Clusters scanned per query (recall/latency trade-off).
+        iterations: k-means iterations when training.
+        seed: Seed for the training sample and k-means.
+    """
+
+    def __init__(self, n_lists: Optional[int] = None, nprobe: int = 8, iterations: int = 10, seed: int = 0):
+        self.n_lists = n_lists
+        self._requested = n_lists
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[_InvertedList] = []
+        self._next_id = 0
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self.centroids is None else self.centroids.shape[1]
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return sum(lst.size for lst in self._lists)
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Fit the clusters on (a sample of) ``vectors``; the index must be empty."""
+        if len(self):
+            raise ValueError("train() on a non-empty index; build a new index instead")
+        vectors = normalize(np.atleast_2d(vectors))
+        n_lists = min(self._requested or default_n_lists(len(vectors)), len(vectors))
+        sample = TRAIN_POINTS_PER_LIST * n_lists
+        if len(vectors) > sample:
+            rng = np.random.default_rng(self.seed)
+            vectors = vectors[np.sort(rng.choice(len(vectors), sample, replace=False))]
+        self.centroids = spherical_kmeans(vectors, n_lists, self.iterations, self.seed)
+        self.n_lists = len(self.centroids)
+        dim = self.centroids.shape[1]
+        self._lists = [
+            _InvertedList(np.empty((0, dim), dtype=np.float32), np.empty(0, dtype=np.int64))
+            for _ in range(self.n_lists)
+        ]
+
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Insert vectors (training on them first if needed) and return their ids.
+
+        Args:
+            vectors: ``(n, dim)`` matrix; normalized on the way in.
+            ids: Optional ids (e.g. chunk numbers); default is a running counter.
+        """
+        vectors = np.atleast_2d(vectors)
+        if not len(vectors):
+            return np.empty(0, dtype=np.int64)
+        vectors = normalize(vectors)
+        if not self.is_trained:
+            self.train(vectors)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + len(vectors), dtype=np.int64)
+        else:
+            ids = np.asarray(ids, dtype=np.int64)
+            if len(ids) != len(vectors):
+                raise ValueError(f"got {len(vectors)} vectors but {len(ids)} ids")
+        self._next_id = max(self._next_id, int(ids.max()) + 1)
+
+        self._insert(vectors, ids)
+        if self._outgrown():
+            self._retrain()
+        return ids
+
+    def _insert(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        labels = _assign(vectors, self.centroids)
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(self.n_lists + 1))
+        for lst, start, end in zip(self._lists, bounds[:-1], bounds[1:]):
+            if end > start:
+                rows = order[start:end]
+                lst.append(vectors[rows], ids[rows])
+
+    def _outgrown(self) -> bool:
+        # The clusters were sized for a much smaller corpus, or the first batch
+        # had fewer vectors than the requested number of clusters.
+        wanted = min(self._requested or default_n_lists(len(self)), len(self))
+        return wanted >= 2 * self.n_lists or self.n_lists < wanted == self._requested
+
+    def _retrain(self) -> None:
+        vectors = np.concatenate([lst.vectors[:lst.size] for lst in self._lists])
+        ids = np.concatenate([lst.ids[:lst.size] for lst in self._lists])
+        self._lists = []
+        self.train(vectors)
+        self._insert(vectors, ids)
+
+    def search(
+        self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(ids, scores)`` of the ``k`` most similar vectors, best first.
+
+        Args:
+            query: One vector, or a ``(n, dim)`` matrix for a batch.
+            k: Results per query.
+            nprobe: Clusters to scan; defaults to ``self.nprobe``.
+
+        Returns:
+            Arrays of shape ``(k,)`` for one query or ``(n, k)`` for a batch.
+            Missing results (fewer than ``k`` vectors in the scanned
+            clusters) have id -1 and score ``-inf``.
+        """
+        single = np.ndim(query) == 1
+        queries = normalize(np.atleast_2d(query))
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        if not len(self) or k <= 0:
+            return (ids[0], scores[0]) if single else (ids, scores)
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"expected queries of dimension {self.dim}, got {queries.shape[1]}")
+
+        probes = top_k(queries @ self.centroids.T, min(nprobe or self.nprobe, self.n_lists))
+        found_scores: List[List[np.ndarray]] = [[] for _ in queries]
+        found_ids: List[List[np.ndarray]] = [[] for _ in queries]
+        # score each probed list once for all queries that probe it
+        for list_no in np.unique(probes):
+            lst = self._lists[list_no]
+            if not lst.size:
+                continue
+            asking = np.flatnonzero((probes == list_no).any(axis=1))
+            block = queries[asking] @ lst.vectors[:lst.size].T
+            for row, q in enumerate(asking):
+                found_scores[q].append(block[row])
+                found_ids[q].append(lst.ids[:lst.size])
+
+        for q in range(len(queries)):
+            if not found_scores[q]:
+                continue
+            candidate_scores = np.concatenate(found_scores[q])
+            candidate_ids = np.concatenate(found_ids[q])
+            best = top_k(candidate_scores, k)[0]
+            ids[q, :len(best)] = candidate_ids[best]
+            scores[q, :len(best)] = candidate_scores[best]
+        return (ids[0], scores[0]) if single else (ids, scores)
+
+    def list_sizes(self) -> np.ndarray:
+        """Number of vectors per cluster (an even spread means predictable latency)."""
+        return np.array([lst.size for lst in self._lists], dtype=np.int64)
+
+    def save(self, path: str) -> None:
+        """Write the index to the folder ``path`` (lists stored contiguously by cluster)."""
+        if not self.is_trained:
+            raise ValueError("cannot save an untrained index")
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        sizes = self.list_sizes()
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        arrays = {
+            "centroids": self.centroids,
+            "offsets": offsets,
+            "vectors": np.concatenate([lst.vectors[:lst.size] for lst in self._lists]),
+            "ids": np.concatenate([lst.ids[:lst.size] for lst in self._lists]),
+        }
+        for name, array in arrays.items():
+            with open(path / f"{name}.npy.tmp", "wb") as f:
+                np.save(f, array)
+        for name in arrays:
+            os.replace(path / f"{name}.npy.tmp", path / f"{name}.npy")
+        meta = {
+            "version": FORMAT_VERSION,
+            "n_lists": self.n_lists,
+            "requested_lists": self._requested,
+            "nprobe": self.nprobe,
+            "next_id": self._next_id,
+        }
+        (path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "IVFIndex":
+        """Load an index written by :meth:`save`; with ``mmap`` the vectors stay on disk."""
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported IVF index version {meta.get('version')!r} in {path}")
+        mode = "r" if mmap else None
+        index = cls(n_lists=meta.get("requested_lists", meta["n_lists"]), nprobe=meta["nprobe"])
+        index.n_lists = meta["n_lists"]
+        index.centroids = np.load(path / "centroids.npy")
+        offsets = np.load(path / "offsets.npy")
+        vectors = np.load(path / "vectors.npy", mmap_mode=mode)
+        ids = np.load(path / "ids.npy", mmap_mode=mode)
+        index._lists = [
+            _InvertedList(vectors[start:end], ids[start:end])
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+        index._next_id = meta["next_id"]
+        return index
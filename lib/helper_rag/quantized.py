@@ -0,0 +1,240 @@
+"""Quantized, memory-mapped embedding files.
+
+A folder written by :func:`write_embeddings` holds the normalized vectors of a
+corpus as raw arrays that :func:`open_embeddings` maps with ``np.memmap``:
+
+- ``codes.bin``: the vectors as ``int8`` (one float32 scale per row in
+  ``scales.bin``), ``float16`` or ``float32``
+- ``full.bin``: optional higher-precision copy used to rescore candidates
+- ``meta.json``: dimension, row count and dtypes
+
+Opening a file reads nothing but ``meta.json``; pages are loaded on demand and
+shared through the OS page cache by every process that maps the same file, so
+several Streamlit workers do not each hold their own copy. An ``int8`` file is
+a quarter of the float32 size (768 dims: 772 bytes per vector instead of 3072).
+
+:meth:`EmbeddingFile.search` scores all rows on the quantized codes in blocks,
+keeps ``k * oversample`` candidates and rescores only those with ``full.bin``.
+This restores exact scores and nearly exact ranking at the cost of reading
+``k * oversample`` full-precision rows.
+
+Example:
+    >>> write_embeddings(".cache/rag/pdfs", embed_many("nomic-embed-text", chunks), dtype="int8")
+    >>> vectors = open_embeddings(".cache/rag/pdfs")
+    >>> rows, scores = vectors.search(embed_many("nomic-embed-text", [question])[0], k=5)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .vector_store import QUERY_BATCH, normalize, top_k
+
+__all__ = ["DTYPES", "EmbeddingFile", "append_embeddings", "open_embeddings", "write_embeddings"]
+
+DTYPES = ("int8", "float16", "float32")
+FORMAT_VERSION = 1
+BLOCK_ROWS = 8192  # rows converted to float32 at a time while scoring
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization: ``vectors ~= codes * scales[:, None]``."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def _write_meta(path: Path, meta: dict) -> None:
+    tmp = path / "meta.json.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path / "meta.json")  # readers only see rows covered by the meta
+
+
+def _read_meta(path: Path) -> dict:
+    with open(path / "meta.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported embedding file version {meta.get('version')!r} in {path}")
+    return meta
+
+
+def _append_rows(path: Path, meta: dict, vectors: np.ndarray) -> None:
+    vectors = normalize(np.atleast_2d(vectors))
+    if meta["dim"] is None:
+        meta["dim"] = vectors.shape[1]
+    if vectors.shape[1] != meta["dim"]:
+        raise ValueError(f"expected vectors of dimension {meta['dim']}, got {vectors.shape[1]}")
+
+    if meta["dtype"] == "int8":
+        codes, scales = quantize_int8(vectors)
+        with open(path / "scales.bin", "ab") as f:
+            f.write(scales.tobytes())
+    else:
+        codes = vectors.astype(meta["dtype"])
+    with open(path / "codes.bin", "ab") as f:
+        f.write(codes.tobytes())
+    if meta["rescore"]:
+        with open(path / "full.bin", "ab") as f:
+            f.write(vectors.astype(meta["rescore"]).tobytes())
+    meta["count"] += len(vectors)
+    _write_meta(path, meta)
+
+
+def write_embeddings(
+    path: str,
+    vectors: np.ndarray,
+    dtype: str = "int8",
+    rescore: Optional[str] = "float32",
+) -> "EmbeddingFile":
+    """Write ``vectors`` (normalized on the way) to the folder ``path``, replacing its content.
+
+    Args:
+        path: Target folder.
+        vectors: ``(n, dim)`` matrix.
+        dtype: Storage type of the scanned codes: ``"int8"``, ``"float16"`` or ``"float32"``.
+        rescore: Dtype of the copy used to rescore candidates (``"float32"``,
+            ``"float16"``) or None to rank by the codes alone.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+    if rescore not in (None, "float16", "float32"):
+        raise ValueError(f"rescore must be None, 'float16' or 'float32', got {rescore!r}")
+    if rescore == dtype:
+        rescore = None  # the codes are already that precise
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for name in ("meta.json", "codes.bin", "scales.bin", "full.bin"):
+        (path / name).unlink(missing_ok=True)
+
+    meta = {"version": FORMAT_VERSION, "dim": None, "count": 0, "dtype": dtype, "rescore": rescore}
+    if len(vectors):
+        _append_rows(path, meta, vectors)
+    else:
+        _write_meta(path, meta)
+    return EmbeddingFile(path)
+
+
+def append_embeddings(path: str, vectors: np.ndarray) -> "EmbeddingFile":
+    """Append rows to an existing embedding folder; open readers keep their old view."""
+    path = Path(path)
+    meta = _read_meta(path)
+    # drop bytes of an interrupted append that the meta never covered
+    for name, width in _files(meta).items():
+        with open(path / name, "ab") as f:
+            f.truncate(meta["count"] * width)
+    _append_rows(path, meta, vectors)
+    return EmbeddingFile(path)
+
+
+def _files(meta: dict) -> dict:
+    """Data files of a folder and their bytes per row."""
+    dim = meta["dim"] or 0
+    files = {"codes.bin": dim * np.dtype(meta["dtype"]).itemsize}
+    if meta["dtype"] == "int8":
+        files["scales.bin"] = 4
+    if meta["rescore"]:
+        files["full.bin"] = dim * np.dtype(meta["rescore"]).itemsize
+    return files
+
+
+def _map(path: Path, dtype: str, shape: tuple) -> np.ndarray:
+    if shape[0] == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+class EmbeddingFile:
+    """Read-only, memory-mapped view of an embedding folder."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        meta = _read_meta(self.path)
+        self.dim: int = meta["dim"] or 0
+        self.dtype: str = meta["dtype"]
+        self.rescore_dtype: Optional[str] = meta["rescore"]
+        count = meta["count"]
+        self.codes = _map(self.path / "codes.bin", self.dtype, (count, self.dim))
+        self.scales = _map(self.path / "scales.bin", "float32", (count,)) if self.dtype == "int8" else None
+        self.full = _map(self.path / "full.bin", self.rescore_dtype, (count, self.dim)) if self.rescore_dtype else None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the data files on disk."""
+        return sum(a.nbytes for a in (self.codes, self.scales, self.full) if a is not None)
+
+    def vectors(self, rows=slice(None)) -> np.ndarray:
+        """Return the given rows as float32, from the rescoring copy if there is one."""
+        if self.full is not None:
+            return np.asarray(self.full[rows], dtype=np.float32)
+        vectors = np.asarray(self.codes[rows], dtype=np.float32)
+        if self.scales is not None:
+            vectors *= np.asarray(self.scales[rows])[..., None]
+        return vectors
+
+    def approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        """Return ``(n_queries, rows)`` dot products computed on the codes.
+
+        The result holds one float32 per query and row; :meth:`search` calls
+        this for ``QUERY_BATCH`` queries at a time.
+        """
+        queries = np.atleast_2d(queries).astype(np.float32, copy=False)
+        scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), BLOCK_ROWS):
+            block = np.asarray(self.codes[start:start + BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        if self.scales is not None:
+            scores *= np.asarray(self.scales)
+        return scores
+
+    def search(self, query: np.ndarray, k: int = 10, oversample: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(rows, scores)`` of the ``k`` nearest rows by cosine similarity.
+
+        Args:
+            query: One vector, or a ``(n, dim)`` matrix for a batch.
+            k: Results per query.
+            oversample: Candidates per result that are rescored with the
+                full-precision copy (ignored without one).
+
+        Returns:
+            Arrays of shape ``(k,)`` for one query or ``(n, k)`` for a batch,
+            best first; fewer than ``k`` columns if the file is smaller.
+        """
+        single = np.ndim(query) == 1
+        queries = normalize(np.atleast_2d(query))
+        width = max(0, min(k, len(self)))
+        rows = np.empty((len(queries), width), dtype=np.intp)
+        best = np.empty((len(queries), width), dtype=np.float32)
+        if not width:
+            return (rows[0], best[0]) if single else (rows, best)
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"expected queries of dimension {self.dim}, got {queries.shape[1]}")
+
+        for start in range(0, len(queries), QUERY_BATCH):
+            batch = queries[start:start + QUERY_BATCH]
+            scores = self.approximate_scores(batch)
+            if self.full is None:
+                picked = top_k(scores, k)
+                rows[start:start + len(batch)] = picked
+                best[start:start + len(batch)] = np.take_along_axis(scores, picked, axis=1)
+                continue
+            for q, picks in enumerate(top_k(scores, k * max(oversample, 1)), start):
+                order = np.sort(picks)  # sequential reads from the mapped file
+                exact = np.asarray(self.full[order], dtype=np.float32) @ queries[q]
+                top = top_k(exact, k)[0]
+                rows[q], best[q] = order[top], exact[top]
+        return (rows[0], best[0]) if single else (rows, best)
+
+
+def open_embeddings(path: str) -> EmbeddingFile:
+    """Map the embedding folder ``path``; only ``meta.json`` is read."""
+    return EmbeddingFile(path)
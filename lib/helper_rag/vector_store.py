@@ -0,0 +1,302 @@
+"""In-memory vector store on a contiguous float32 matrix.
+
+Vectors are L2-normalized when added, so cosine similarity is a plain dot
+product and a batch of queries is scored with one matrix multiply. The top-k
+rows come from ``np.argpartition`` (linear time) and only those k are sorted.
+
+Rows live in one preallocated matrix whose capacity doubles when it is full,
+so ``add`` is amortized O(1) per vector instead of copying the matrix on every
+call. ``delete`` only marks rows as dead; the store compacts itself once more
+than a quarter of the rows are dead.
+
+Dict filters (``where={"lang": "en"}``) are answered from an index of metadata
+value -> rows kept up to date by ``add`` and ``compact``, so a filtered search
+costs about as much as an unfiltered one. Predicate filters call the function
+on every row's metadata; prefer a dict or a boolean mask on large stores.
+
+Example:
+    >>> store = VectorStore()
+    >>> ids = store.add(embed_many("nomic-embed-text", docs), documents=docs,
+    ...                 metadata=[{"lang": "en"}] * len(docs))
+    >>> store.search(embed_many("nomic-embed-text", ["query"])[0], k=3, where={"lang": "en"})
+    [SearchResult(id=4, score=0.83, document='...', metadata={'lang': 'en'}), ...]
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Union
+
+import numpy as np
+
+__all__ = ["SearchResult", "VectorStore", "normalize", "top_k"]
+
+Filter = Union[Dict[str, Any], Callable[[Dict[str, Any]], bool], np.ndarray, None]
+
+QUERY_BATCH = 256  # queries scored per matrix multiply; bounds the score matrix
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Return ``vectors`` (1-D or 2-D) as C-contiguous float32 rows of unit length."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the ``k`` largest scores of each row, best first."""
+    scores = np.atleast_2d(scores)
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    if k < scores.shape[1]:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """One hit of :meth:`VectorStore.search`."""
+
+    id: int
+    score: float
+    document: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class VectorStore:
+    """Normalized float32 vectors with ids, documents and metadata.
+
+    Args:
+        dim: Vector dimension; taken from the first ``add`` if omitted.
+        capacity: Initial number of rows to allocate.
+        compact_ratio: Compact once this fraction of the rows is deleted.
+    """
+
+    def __init__(self, dim: Optional[int] = None, capacity: int = 1024, compact_ratio: float = 0.25):
+        self.dim = dim
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        self._size = 0
+        self._dead = 0
+        self._next_id = 0
+        self._vectors = np.empty((capacity, dim or 0), dtype=np.float32)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._documents: List[Optional[str]] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._rows: Dict[int, int] = {}  # id -> row
+        # metadata key -> value -> rows; deleted rows stay until compaction and
+        # are ruled out by the alive mask
+        self._index: Dict[str, Dict[Hashable, List[int]]] = {}
+        self._unindexed: Set[str] = set()  # keys with unhashable values, filtered by scanning
+
+    def __len__(self) -> int:
+        return self._size - self._dead
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The live rows (a copy if rows are deleted, otherwise a view)."""
+        with self._lock:
+            if self._dead:
+                return self._vectors[:self._size][self._alive[:self._size]]
+            return self._vectors[:self._size]
+
+    def _reserve(self, rows: int) -> None:
+        needed = self._size + rows
+        capacity = len(self._ids)
+        if self._vectors.shape[1] == self.dim:
+            if needed <= capacity:
+                return
+            capacity = max(needed, capacity * 2, 16)
+        else:  # dimension only known since the first add
+            capacity = max(needed, capacity, 16)
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        if self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+        ids = np.empty(capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._vectors, self._ids, self._alive = vectors, ids, alive
+
+    def add(
+        self,
+        vectors: np.ndarray,
+        documents: Optional[Sequence[str]] = None,
+        metadata: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> np.ndarray:
+        """Append vectors (one per row) and return their new ids."""
+        vectors = normalize(np.atleast_2d(vectors))
+        n = len(vectors)
+        if documents is not None and len(documents) != n:
+            raise ValueError(f"got {n} vectors but {len(documents)} documents")
+        if metadata is not None and len(metadata) != n:
+            raise ValueError(f"got {n} vectors but {len(metadata)} metadata entries")
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+            self._reserve(n)
+            start, end = self._size, self._size + n
+            ids = np.arange(self._next_id, self._next_id + n, dtype=np.int64)
+            self._vectors[start:end] = vectors
+            self._ids[start:end] = ids
+            self._alive[start:end] = True
+            self._documents.extend(documents if documents is not None else [None] * n)
+            if metadata is not None:
+                self._metadata.extend(dict(m) for m in metadata)
+            else:
+                self._metadata.extend({} for _ in range(n))
+            self._rows.update(zip(ids.tolist(), range(start, end)))
+            self._size = end
+            self._next_id += n
+            self._index_metadata(start, end)
+            return ids
+
+    def _index_metadata(self, start: int, end: int) -> None:
+        for row in range(start, end):
+            for key, value in self._metadata[row].items():
+                try:
+                    self._index.setdefault(key, {}).setdefault(value, []).append(row)
+                except TypeError:  # unhashable value
+                    self._unindexed.add(key)
+
+    def delete(self, ids: Iterable[int]) -> int:
+        """Remove the given ids; returns how many were present."""
+        with self._lock:
+            removed = 0
+            for id_ in ids:
+                row = self._rows.pop(int(id_), None)
+                if row is not None:
+                    self._alive[row] = False
+                    self._documents[row] = None
+                    self._metadata[row] = {}
+                    removed += 1
+            self._dead += removed
+            if self._dead and self._dead >= self.compact_ratio * self._size:
+                self.compact()
+            return removed
+
+    def compact(self) -> None:
+        """Drop deleted rows so searches no longer scan them."""
+        with self._lock:
+            keep = np.flatnonzero(self._alive[:self._size])
+            capacity = max(len(keep) * 2, 16)
+            vectors = np.empty((capacity, self.dim or 0), dtype=np.float32)
+            vectors[:len(keep)] = self._vectors[keep]
+            ids = np.empty(capacity, dtype=np.int64)
+            ids[:len(keep)] = self._ids[keep]
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:len(keep)] = True
+            self._documents = [self._documents[i] for i in keep]
+            self._metadata = [self._metadata[i] for i in keep]
+            self._vectors, self._ids, self._alive = vectors, ids, alive
+            self._rows = {int(id_): row for row, id_ in enumerate(ids[:len(keep)])}
+            self._size, self._dead = len(keep), 0
+            self._index, self._unindexed = {}, set()
+            self._index_metadata(0, self._size)
+
+    def get(self, id_: int) -> Optional[SearchResult]:
+        """Return the document and metadata of ``id_`` (score 1.0), or None."""
+        with self._lock:
+            row = self._rows.get(int(id_))
+            if row is None:
+                return None
+            return SearchResult(int(id_), 1.0, self._documents[row], self._metadata[row])
+
+    def _mask(self, where: Filter) -> Optional[np.ndarray]:
+        alive = self._alive[:self._size]
+        if where is None:
+            return alive if self._dead else None
+        if isinstance(where, np.ndarray):
+            if where.dtype == bool and len(where) == self._size:
+                return alive & where
+            raise ValueError("array filters must be boolean with one entry per row")
+        if callable(where):
+            match = where
+        else:
+            mask = self._indexed_mask(where)
+            if mask is not None:
+                return mask
+            items = list(where.items())
+
+            def match(meta):
+                return all(meta.get(key) == value for key, value in items)
+        return alive & np.fromiter((match(m) for m in self._metadata), dtype=bool, count=self._size)
+
+    def _indexed_mask(self, where: Dict[str, Any]) -> Optional[np.ndarray]:
+        # None if the filter needs a scan: unhashable values, or None, which
+        # also matches rows without the key
+        mask = self._alive[:self._size].copy()
+        for key, value in where.items():
+            if value is None or key in self._unindexed:
+                return None
+            try:
+                rows = self._index.get(key, {}).get(value, [])
+            except TypeError:
+                return None
+            hit = np.zeros(self._size, dtype=bool)
+            hit[rows] = True
+            mask &= hit
+        return mask
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 5,
+        where: Filter = None,
+    ) -> Union[List[SearchResult], List[List[SearchResult]]]:
+        """Return the ``k`` most similar entries, best first.
+
+        Args:
+            query: One vector, or a ``(n, dim)`` matrix for a batch of queries.
+            k: Results per query.
+            where: Metadata filter: ``{"key": value, ...}`` (all must match),
+                a predicate on the metadata dict, or a boolean row mask.
+
+        Returns:
+            A list of results, or one list per query for a matrix.
+        """
+        single = np.ndim(query) == 1
+        queries = normalize(np.atleast_2d(query))
+        with self._lock:
+            if not self._size or k <= 0:
+                return [] if single else [[] for _ in queries]
+            if queries.shape[1] != self.dim:
+                raise ValueError(f"expected queries of dimension {self.dim}, got {queries.shape[1]}")
+            mask = self._mask(where)
+            matrix = self._vectors[:self._size]
+            rows = excluded = None
+            if mask is not None:
+                selected = np.count_nonzero(mask)
+                if selected * 4 < self._size:
+                    # few rows match: score only those (gathering them is cheap)
+                    rows = np.flatnonzero(mask)
+                    matrix = matrix[rows]
+                else:
+                    # most rows match: score all and rule out the rest, no copy
+                    excluded = ~mask
+            documents, metadata, ids = self._documents, self._metadata, self._ids
+
+            results = []
+            for start in range(0, len(queries), QUERY_BATCH):
+                scores = queries[start:start + QUERY_BATCH] @ matrix.T
+                if excluded is not None:
+                    scores[:, excluded] = -np.inf
+                top = top_k(scores, k)
+                for q, picks in enumerate(top):
+                    hits = []
+                    for i in picks:
+                        if scores[q, i] == -np.inf:
+                            break
+                        row = rows[i] if rows is not None else i
+                        hits.append(SearchResult(int(ids[row]), float(scores[q, i]), documents[row], metadata[row]))
+                    results.append(hits)
+        return results[0] if single else results
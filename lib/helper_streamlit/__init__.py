@@ -2,21 +2,30 @@
 
 from __future__ import annotations
 
-import json
-from typing import Iterable, List
+from typing import List
 
-import requests
 import streamlit as st
-
-from lib.helper_ollama import OLLAMA
-
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from lib.helper_ollama import (
+    cached_request,
+    get_model_registry,
+    get_model_router,
+    preload_model,
+    request_priority,
+)
+from lib.helper_ollama.transport import stream_ndjson
+from lib.helper_streamlit.navigation import build_navigation
+from lib.helper_streamlit.snippets import execute_snippet
+from lib.helper_streamlit.source import parse_source
+from lib.helper_streamlit.streaming import StreamSink
+from lib.sandbox import get_sandbox
+
+import inspect
 import os
+import textwrap
 from pathlib import Path
 import streamlit as st
-from io import StringIO
-import sys
-import traceback
-import re
 import uuid
 
 HERE = Path(__file__).parent.parent.parent
@@ -26,11 +35,10 @@ def get_code(path, as_array=True):
     full_path = os.path.join(HERE, path)
 
     try:
-        with open(full_path, "r", encoding="utf-8") as f:
-            data = f.read()
+        data = parse_source(full_path).text
 
-            if as_array:
-                data = data.splitlines()
+        if as_array:
+            data = data.splitlines()
     except FileNotFoundError:
         data = f"# Error: File not found: {path}"
     except Exception as e:
@@ -39,85 +47,55 @@ def get_code(path, as_array=True):
     return data
 
 
-def get_code_and_output(path, filter_code=True):
-    CODE = get_code(path, as_array=filter_code)
-    CODE_OUTPUT = ""
-
-    if filter_code:
-        # Filter code between special markers
-        in_code = False
-        in_code_output = False
+def get_code_and_output(path, filter_code=True, region="code", output="output"):
+    """Return the ``(code, output)`` regions marked in ``path``.
 
-        filtered = []
-        filtered_output = []
-
-        for line in CODE:
-            if line.strip().startswith("# --- CODE START: OUTPUT"):
-                in_code = False
-                in_code_output = True
-                continue
-
-            if line.strip().startswith("# --- CODE START"):
-                in_code = True
-                in_code_output = False
-                continue
+    ``path`` may also be a function, whose source is returned as the code.
+    The file is parsed once and cached until it changes (see
+    :mod:`lib.helper_streamlit.source`); ``region``/``output`` pick named regions.
+    """
+    if callable(path):
+        try:
+            return textwrap.dedent(inspect.getsource(path)), ""
+        except (OSError, TypeError) as e:
+            return f"# Error loading source: {str(e)}", ""
 
-            if line.strip().startswith("# --- CODE END: OUTPUT"):
-                in_code = False
-                in_code_output = False
-                continue
+    if not filter_code:
+        return get_code(path, as_array=False), ""
 
-            if line.strip().startswith("# --- CODE END"):
-                in_code = False
-                in_code_output = False
-                continue
+    try:
+        parsed = parse_source(os.path.join(HERE, path))
+    except FileNotFoundError:
+        return f"# Error: File not found: {path}", ""
+    except Exception as e:
+        return f"# Error loading file: {str(e)}", ""
 
-            if in_code:
-                filtered.append(line)
+    return parsed.region(region), parsed.region(output)
 
-            if in_code_output:
-                filtered_output.append(line)
 
-        CODE = "\n".join(filtered)
-        CODE_OUTPUT = "\n".join(filtered_output)
+def run(code, namespace=None, sandbox=False, cache=False):
+    """Execute ``code`` and return its captured ``(stdout, stderr)``.
 
-    return CODE, CODE_OUTPUT
+    By default the code runs in-process with ``st`` injected, so snippets can
+    render widgets. With ``sandbox=True`` it runs in a worker of
+    :func:`lib.sandbox.get_sandbox` instead (CPU, memory and wall-time limits;
+    ``namespace`` values must be picklable and ``st`` is not available).
 
+    The compiled code is cached per source. With ``cache=True`` a snippet that
+    already ran with the same source and namespace data is replayed from its
+    recorded output instead of executed (see :mod:`lib.helper_streamlit.snippets`).
+    """
+    if sandbox:
+        result = get_sandbox().run(code, namespace)
+        errors = result.stderr
+        if result.error:
+            errors = f"{errors}{result.error}"
+        return result.stdout, errors
 
-def run(code, namespace=None):
     if namespace is None:
         namespace = {}
 
-    namespace.update(
-        {
-            "st": st,  # inject streamlit
-        }
-    )
-
-    # Create string buffers to capture output
-    try:
-        stdout_buffer = StringIO()
-        stderr_buffer = StringIO()
-
-        # Save original stdout/stderr
-        original_stdout = sys.stdout
-        original_stderr = sys.stderr
-
-        sys.stdout = stdout_buffer
-        sys.stderr = stderr_buffer
-
-        # Execute the code
-        exec(code, namespace)
-
-        # Get the output
-        output = stdout_buffer.getvalue()
-        errors = stderr_buffer.getvalue()
-
-    finally:
-        sys.stdout = original_stdout
-        sys.stderr = original_stderr
-
-    return output, errors
+    return execute_snippet(code, namespace, cache=cache)
 
 
 def run_code(code, language="python"):
@@ -126,61 +104,48 @@ def run_code(code, language="python"):
         st.info(f"Code execution is only supported for Python. Language: {language}")
         return
 
+    # Start the sandbox workers while the page renders, not on the first click
+    sandbox = get_sandbox()
+
     # Create a unique key for this button based on a hash of the code
     button_key = f"run_code_{hash(code) % 10000}"
 
     if st.button("▶️ Run Code", key=button_key):
         with st.spinner("Executing code..."):
-            # Create string buffers to capture output
-            stdout_buffer = StringIO()
-            stderr_buffer = StringIO()
-
-            # Save original stdout/stderr
-            original_stdout = sys.stdout
-            original_stderr = sys.stderr
-
-            try:
-                # Redirect stdout/stderr
-                sys.stdout = stdout_buffer
-                sys.stderr = stderr_buffer
-
-                # Create a namespace for execution
-                namespace = {}
-
-                # Execute the code
-                exec(code, namespace)
-
-                # Get the output
-                output = stdout_buffer.getvalue()
-                errors = stderr_buffer.getvalue()
-
-                # Display results
-                if output:
-                    st.success("✅ Code executed successfully!")
-                    with st.expander("📤 Output", expanded=True):
-                        st.code(output, language="text", wrap_lines=True)
-                elif errors:
-                    st.warning("⚠️ Code executed with warnings")
-                    with st.expander("⚠️ Warnings", expanded=True):
-                        st.code(errors, language="text", wrap_lines=True)
-                else:
-                    st.success("✅ Code executed successfully (no output)")
-
-            except Exception as e:
-                st.error("❌ Error executing code")
-                with st.expander("🐛 Error Details", expanded=True):
-                    error_msg = f"{type(e).__name__}: {str(e)}\n\n"
-                    error_msg += traceback.format_exc()
-                    st.code(error_msg, language="text")
-
-            finally:
-                # Restore original stdout/stderr
-                sys.stdout = original_stdout
-                sys.stderr = original_stderr
+            # Runs in a separate worker process with CPU, memory and time limits
+            result = sandbox.run(code)
 
+        output = result.stdout
+        errors = result.stderr
 
-def show_code(path):
-    CODE, CODE_OUTPUT = get_code_and_output(path)
+        # Display results
+        if result.error:
+            if result.timed_out:
+                st.error(f"⏱️ Code stopped after {sandbox.wall_seconds:g} seconds")
+            else:
+                st.error("❌ Error executing code")
+            if output:
+                with st.expander("📤 Output", expanded=True):
+                    st.code(output, language="text", wrap_lines=True)
+            with st.expander("🐛 Error Details", expanded=True):
+                st.code(f"{errors}{result.error}", language="text")
+        elif output:
+            st.success(f"✅ Code executed successfully! ({result.duration:.2f}s)")
+            with st.expander("📤 Output", expanded=True):
+                st.code(output, language="text", wrap_lines=True)
+            if errors:
+                with st.expander("⚠️ Warnings", expanded=False):
+                    st.code(errors, language="text", wrap_lines=True)
+        elif errors:
+            st.warning("⚠️ Code executed with warnings")
+            with st.expander("⚠️ Warnings", expanded=True):
+                st.code(errors, language="text", wrap_lines=True)
+        else:
+            st.success("✅ Code executed successfully (no output)")
+
+
+def show_code(path, region="code", output="output"):
+    CODE, CODE_OUTPUT = get_code_and_output(path, region=region, output=output)
 
     tab_code, tab_output = st.tabs(["Code", "Output"])
 
@@ -191,9 +156,13 @@ def show_code(path):
         st.code(CODE, language="python", wrap_lines=True)
 
 
-def show_snippet(code, namespace=None):
+def show_snippet(code, namespace=None, cache=False):
     """
     Display a two-column snippet: left shows the source code, right provides a run interface and output.
+
+    With ``cache=True`` a deterministic snippet is replayed from the result
+    cache on reruns; leave it off for snippets with widgets, randomness or
+    other side effects, whose first output would otherwise be frozen.
     """
     st.markdown("----")
 
@@ -203,89 +172,150 @@ def show_snippet(code, namespace=None):
     st.code(code, language="python")
 
     # with col_run:
-    run(code, namespace)
-
+    run(code, namespace, cache=cache)
 
-def build_navigation(folder="views"):
-    base_dir = HERE / folder
 
-    pages = {}
+def lazy_tab(tab):
+    """Render the decorated function as a fragment in ``tab``, only while the tab is open.
 
-    if not base_dir.exists() or not base_dir.is_dir():
-        return pages
+    The tabs must track their state (``st.tabs(..., on_change="rerun")``);
+    otherwise every tab renders as before. Widgets inside the section rerun
+    only the section, and closed tabs are not computed at all.
 
-    for subdir in sorted(p for p in base_dir.iterdir() if p.is_dir()):
-        page_list = []
-
-        group = re.sub(r"^\d+_", "", subdir.name).replace("_", " ")
+    Example:
+        >>> tabs = st.tabs(["Intro", "Chat"], key="tabs", on_change="rerun")
+        >>> @lazy_tab(tabs[1])
+        ... def chat_tab():
+        ...     st.button("Send")
+    """
 
-        for file in sorted(
-            f
-            for f in subdir.iterdir()
-            if f.is_file() and f.suffix in {".py", ".md", ".txt"}
-        ):
-            stem = re.sub(r"^\d+_", "", file.stem)
+    def decorator(fn):
+        fragment = st.fragment(fn)
+        if tab.open is not False:
+            with tab:
+                fragment()
+        return fragment
 
-            page_title = stem.replace("_", " ").replace("-", " ").title()
-            page_url = f"{subdir.name}_{file.stem}"
+    return decorator
 
-            rel_path = str(file.relative_to(HERE))
 
-            page = st.Page(rel_path, title=page_title, url_path=page_url)
+def models() -> List[str]:
+    """Fetch available Ollama models with sensible fallbacks.
 
-            page_list.append(page)
+    The list comes from the shared model registry, so repeated calls within its
+    TTL do not touch the network. When the Ollama server cannot be reached we
+    keep the UX intact by returning a set of commonly available models.
+    """
 
-        pages[group] = page_list
+    try:
+        names = get_model_registry().names()
+        return names or ["llama3.2", "mistral:7b"]
+    except Exception:  # noqa: BLE001 - best effort fallback for UI friendliness
+        return ["llama3.2", "mistral:7b"]
 
-    return pages
 
+def session_id() -> str | None:
+    """Return the id of the current browser session, or None outside a script run."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
 
-def _extract_model_names(models_payload: Iterable[dict]) -> List[str]:
-    """Return sorted model names from an Ollama tag payload."""
 
-    names = sorted({str(model.get("model", "")).strip() for model in models_payload})
-    return [name for name in names if name]
+def interactive():
+    """Send the Ollama requests of a block ahead of queued standard and bulk work.
 
-def models() -> List[str]:
-    """Fetch available Ollama models with sensible fallbacks.
+    Example:
+        >>> with interactive():
+        ...     stream = chat("gemma3:1b", messages, stream=True)
+    """
+    return request_priority("interactive", session=session_id())
+
+
+def generate(
+    model: str,
+    prompt: str,
+    options: dict | None = None,
+    cache: bool | None = None,
+    fps: float = 10.0,
+    show_stats: bool = False,
+) -> str:
+    """Stream responses from Ollama into the UI and return the final text.
+
+    Deterministic requests (``options`` with temperature 0 or a seed) and calls
+    with ``cache=True`` are answered from the response cache when possible; a
+    cache hit is replayed through the same streaming loop. The output is
+    repainted at most ``fps`` times per second; ``show_stats`` adds a caption
+    with time-to-first-token and tokens/s.
+    """
 
-    When the Ollama server cannot be reached we keep the UX intact by returning a
-    set of commonly available models.
+    sink = StreamSink(fps=fps)
+
+    request = {"prompt": prompt}
+    if options:
+        request["options"] = options
+    keep_alive = get_model_router().keep_alive_for(model)
+    if keep_alive is not None:
+        request["keep_alive"] = keep_alive
+
+    with interactive():
+        parts = cached_request(
+            "generate",
+            model,
+            request,
+            lambda: stream_ndjson("/api/generate", {"model": model, **request}),
+            stream=True,
+            cache=cache,
+        )
+    for part in parts:
+        sink.write(part.get("response", ""))
+    text = sink.close()
+
+    if show_stats:
+        stats = sink.stats()
+        if stats["ttft"] is not None:
+            rate = f" · {stats['tokens_per_s']:.1f} tokens/s" if stats["tokens_per_s"] else ""
+            st.caption(f"⏱️ first token after {stats['ttft']:.2f}s{rate}")
+    return text
+
+
+def llm_apply(df, column: str, template: str, model: str, **kwargs):
+    """``lib.helper_ollama.dataframe.llm_apply`` with a progress bar in the page.
+
+    Example:
+        >>> df["sentiment"] = llm_apply(df, "review", "Sentiment of: {value}", "gemma3:1b")
     """
 
-    try:
-        response = requests.get(f"{OLLAMA}/api/tags", timeout=3)
-        response.raise_for_status()
-        payload = response.json().get("models", [])
-        names = _extract_model_names(payload)
-        return names or ["llama3.2", "mistral:7b"]
-    except Exception:  # noqa: BLE001 - best effort fallback for UI friendliness
-        return ["llama3.2", "mistral:7b"]
+    bar = st.progress(0.0, text="Preparing...")
 
+    def on_progress(done: int, total: int, cached: int) -> None:
+        bar.progress(
+            done / total if total else 1.0,
+            text=f"{done}/{total} distinct values · {cached} from cache",
+        )
 
-def generate(model: str, prompt: str) -> str:
-    """Stream responses from Ollama into the UI and return the final text."""
+    from lib.helper_ollama.dataframe import llm_apply as _llm_apply  # pulls in pandas
 
-    box, acc = st.empty(), ""
+    result = _llm_apply(df, column, template, model, on_progress=on_progress, **kwargs)
+    if result.attrs.get("errors"):
+        st.warning(f"{len(result.attrs['errors'])} values failed; their rows are empty.")
+    return result
 
-    with requests.post(
-        f"{OLLAMA}/api/generate",
-        json={"model": model, "prompt": prompt, "stream": True},
-        stream=True,
-    ) as response:
-        for ln in response.iter_lines():
-            if not ln:
-                continue
-            part = json.loads(ln.decode("utf-8"))
-            acc += part.get("response", "")
-            box.markdown(acc)
-    return acc
 
+def add_select_model(label: str = "Modell", key: str = None, preload: bool = True) -> str:
+    """Render a model selectbox with the available Ollama models.
 
-def add_select_model(label: str = "Modell", key: str = None) -> str:
-    """Render a model selectbox with the available Ollama models."""
+    With ``preload`` a newly selected model is loaded in the background, so
+    the first request does not wait for the weights. Only a change of the
+    selection triggers a load; rendering the page (or the default choice) does
+    not, so reruns cause no extra requests and do not evict resident models.
+    """
 
+    picker = key or label
     if key is None:
         key = f"model_select_{uuid.uuid4().hex[:8]}"
 
-    return st.selectbox(label, models(), key=key)
\ No newline at end of file
+    model = st.selectbox(label, models(), key=key)
+    last = st.session_state.setdefault("_model_select_last", {})
+    if picker in last and last[picker] != model and preload and model:
+        preload_model(model)
+    last[picker] = model
+    return model
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""Per-context capture of ``print`` output.
+
+Streamlit runs every session's script in its own thread, so swapping
+``sys.stdout`` for a buffer lets one session's output land in another
+session's buffer. :func:`capture` instead installs a proxy on
+``sys.stdout``/``sys.stderr`` once and routes each write to the buffer of the
+current context (a ``contextvars.ContextVar``, i.e. per thread and per asyncio
+task). Writes made outside a :func:`capture` block go to the original stream.
+
+Example:
+    >>> with capture() as output:
+    ...     print("hello")
+    >>> output.stdout
+    'hello\\n'
+"""
+
+from __future__ import annotations
+
+import contextvars
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, TextIO
+
+__all__ = ["CapturedOutput", "capture", "install"]
+
+
+class CapturedOutput:
+    """Buffers filled by one :func:`capture` block."""
+
+    def __init__(self):
+        self._stdout = io.StringIO()
+        self._stderr = io.StringIO()
+
+    @property
+    def stdout(self) -> str:
+        return self._stdout.getvalue()
+
+    @property
+    def stderr(self) -> str:
+        return self._stderr.getvalue()
+
+
+_target: contextvars.ContextVar[Optional[CapturedOutput]] = contextvars.ContextVar(
+    "captured_output", default=None
+)
+
+
+class _ContextStream(io.TextIOBase):
+    """Text stream that writes to the current context's buffer or to ``fallback``."""
+
+    def __init__(self, fallback: TextIO, name: str):
+        self._fallback = fallback
+        self._name = name
+
+    def _stream(self) -> TextIO:
+        target = _target.get()
+        if target is None:
+            return self._fallback
+        return target._stdout if self._name == "stdout" else target._stderr
+
+    def write(self, s: str) -> int:
+        return self._stream().write(s)
+
+    def writelines(self, lines) -> None:
+        self._stream().writelines(lines)
+
+    def flush(self) -> None:
+        self._stream().flush()
+
+    def isatty(self) -> bool:
+        return _target.get() is None and self._fallback.isatty()
+
+    def fileno(self) -> int:
+        return self._fallback.fileno()
+
+    @property
+    def encoding(self):
+        return getattr(self._fallback, "encoding", "utf-8")
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+
+_install_lock = threading.Lock()
+
+
+def install() -> None:
+    """Put the routing proxies on ``sys.stdout``/``sys.stderr`` (idempotent).
+
+    If something replaced a stream since (a test runner, another library), the
+    new stream is wrapped and becomes the fallback.
+    """
+    with _install_lock:
+        if not isinstance(sys.stdout, _ContextStream):
+            sys.stdout = _ContextStream(sys.stdout, "stdout")
+        if not isinstance(sys.stderr, _ContextStream):
+            sys.stderr = _ContextStream(sys.stderr, "stderr")
+
+
+@contextmanager
+def capture() -> Iterator[CapturedOutput]:
+    """Collect everything the current context prints inside the block.
+
+    Threads started inside the block do not inherit the capture and print to
+    the original streams.
+    """
+    install()
+    output = CapturedOutput()
+    token = _target.set(output)
+    try:
+        yield output
+    finally:
+        _target.reset(token)
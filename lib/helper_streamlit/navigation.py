@@ -0,0 +1,138 @@
+"""Page navigation built from the ``views/`` folder tree.
+
+Every top-level folder of ``views/`` is a navigation section and every
+``.py``/``.md``/``.txt`` file in it a page; leading ``123_`` numbers set the
+order and are dropped from the titles. Nested folders (such as
+``610_🚀_Streamlit_Demo/chat_and_content``) become sections of their own,
+listed right after their parent.
+
+Walking the tree for 100+ files on every rerun is wasted work, so the result
+is kept as a manifest (titles, URL paths, sections, order). The manifest is
+rebuilt only when the modification time of a folder in the tree changes,
+which happens whenever a page is added, removed or renamed. The folders are
+checked at most every ``CHECK_INTERVAL`` seconds.
+
+The ``st.Page`` objects themselves are built fresh on every run: Streamlit
+mutates them while running a page, so sharing them between sessions lets
+concurrent runs interfere.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import streamlit as st
+
+__all__ = ["PageEntry", "build_manifest", "build_navigation"]
+
+HERE = Path(__file__).parent.parent.parent
+
+PAGE_SUFFIXES = {".py", ".md", ".txt"}
+CHECK_INTERVAL = float(os.environ.get("STARTERAPP_NAV_CHECK_INTERVAL", "2"))
+
+
+@dataclass(frozen=True)
+class PageEntry:
+    """One page of the navigation manifest."""
+
+    path: str  # relative to the app root
+    title: str
+    url_path: str
+
+
+Manifest = Dict[str, List[PageEntry]]
+Signature = Tuple[Tuple[str, int], ...]
+
+
+def _visible(entry: os.DirEntry) -> bool:
+    return not entry.name.startswith((".", "__"))
+
+
+def _signature(base_dir: Path) -> Signature:
+    """Return the modification times of all folders below ``base_dir``."""
+    found = []
+    stack = [str(base_dir)]
+    while stack:
+        path = stack.pop()
+        try:
+            found.append((path, os.stat(path).st_mtime_ns))
+            with os.scandir(path) as entries:
+                stack.extend(e.path for e in entries if _visible(e) and e.is_dir())
+        except OSError:
+            continue
+    return tuple(sorted(found))
+
+
+def _title(name: str) -> str:
+    return re.sub(r"^\d+_", "", name)
+
+
+def _section(folder: Path, base_dir: Path, prefix: str, manifest: Manifest) -> None:
+    entries = sorted(
+        (e for e in folder.iterdir() if not e.name.startswith((".", "__"))),
+        key=lambda e: e.name,
+    )
+    section = []
+    for file in entries:
+        if not file.is_file() or file.suffix not in PAGE_SUFFIXES:
+            continue
+        title = _title(file.stem).replace("_", " ").replace("-", " ").title()
+        url_path = "_".join(folder.relative_to(base_dir).parts + (file.stem,))
+        section.append(PageEntry(str(file.relative_to(HERE)), title, url_path))
+    if section:
+        manifest[prefix] = section
+
+    for subdir in entries:
+        if subdir.is_dir():
+            title = _title(subdir.name).replace("_", " ").title()
+            _section(subdir, base_dir, f"{prefix} / {title}", manifest)
+
+
+def build_manifest(folder: str = "views") -> Manifest:
+    """Walk ``folder`` and return ``{section: [PageEntry, ...]}`` in display order."""
+    base_dir = HERE / folder
+    manifest: Manifest = {}
+    if not base_dir.is_dir():
+        return manifest
+    for subdir in sorted(p for p in base_dir.iterdir() if p.is_dir() and not p.name.startswith((".", "__"))):
+        _section(subdir, base_dir, _title(subdir.name).replace("_", " "), manifest)
+    return manifest
+
+
+class _NavigationCache:
+    def __init__(self):
+        self.signature: Optional[Signature] = None
+        self.checked = 0.0
+        self.manifest: Manifest = {}
+
+
+_cache: Dict[str, _NavigationCache] = {}
+_cache_lock = threading.Lock()
+
+
+def _pages(manifest: Manifest) -> Dict[str, list]:
+    return {
+        section: [st.Page(e.path, title=e.title, url_path=e.url_path) for e in entries]
+        for section, entries in manifest.items()
+    }
+
+
+def build_navigation(folder: str = "views") -> Dict[str, list]:
+    """Return fresh ``{section: [st.Page, ...]}`` for ``st.navigation`` from the cached manifest."""
+    with _cache_lock:
+        cache = _cache.setdefault(folder, _NavigationCache())
+        now = time.monotonic()
+        if cache.signature is None or now - cache.checked >= CHECK_INTERVAL:
+            cache.checked = now
+            signature = _signature(HERE / folder)
+            if signature != cache.signature:
+                cache.signature = signature
+                cache.manifest = build_manifest(folder)
+        manifest = cache.manifest
+    return _pages(manifest)
@@ -0,0 +1,221 @@
+"""Compiled-code and result caches for snippets executed by ``run``.
+
+Every Streamlit rerun used to ``exec`` each example on a page again, although
+most examples print or ``st.write`` the same thing every time. This module
+keeps the compiled code object per source hash and, for snippets whose inputs
+can be fingerprinted, a recording of what the snippet did: its printed output,
+the ``st`` display calls it made and the names it assigned. A cached snippet is
+replayed from that recording instead of being executed.
+
+A snippet is only recorded if it uses nothing but plain display calls
+(``st.write``, ``st.markdown``, ...), leaves its inputs unchanged, and every
+namespace value is plain data (numbers, strings, lists, dicts, ...) or an
+imported module.
+Snippets with widgets, randomness or other side effects should pass
+``cache=False``.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import CodeType, ModuleType
+from typing import Any, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+from .capture import capture
+
+__all__ = ["clear_snippet_cache", "compile_snippet", "execute_snippet", "fingerprint"]
+
+MAX_CODE_ENTRIES = 512
+MAX_RESULT_ENTRIES = 512
+
+# st functions that only display their arguments and can be replayed.
+_DISPLAY_CALLS = frozenset({
+    "area_chart", "bar_chart", "caption", "code", "dataframe", "divider", "error",
+    "exception", "header", "info", "json", "latex", "line_chart", "markdown",
+    "metric", "subheader", "success", "table", "text", "title", "warning", "write",
+})
+
+_PLAIN_TYPES = (str, int, float, complex, bool, bytes, type(None))
+
+
+def _source_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+_code_cache: "OrderedDict[str, CodeType]" = OrderedDict()
+_code_lock = threading.Lock()
+
+
+def compile_snippet(code: str) -> CodeType:
+    """Compile ``code`` once per distinct source text."""
+    key = _source_hash(code)
+    with _code_lock:
+        compiled = _code_cache.get(key)
+        if compiled is not None:
+            _code_cache.move_to_end(key)
+            return compiled
+    compiled = compile(code, "<snippet>", "exec")
+    with _code_lock:
+        _code_cache[key] = compiled
+        while len(_code_cache) > MAX_CODE_ENTRIES:
+            _code_cache.popitem(last=False)
+    return compiled
+
+
+def _fingerprint_value(value: Any, depth: int = 0) -> str:
+    if depth > 20:
+        raise TypeError("nested too deeply")
+    if isinstance(value, _PLAIN_TYPES):
+        return f"{type(value).__name__}:{value!r}"
+    if isinstance(value, ModuleType):  # from "import re" in an earlier snippet
+        return f"module:{value.__name__}"
+    if isinstance(value, (list, tuple)):
+        items = ",".join(_fingerprint_value(v, depth + 1) for v in value)
+        return f"{type(value).__name__}[{items}]"
+    if isinstance(value, (set, frozenset)):
+        items = ",".join(sorted(_fingerprint_value(v, depth + 1) for v in value))
+        return f"{type(value).__name__}{{{items}}}"
+    if isinstance(value, dict):
+        items = ",".join(
+            sorted(f"{_fingerprint_value(k, depth + 1)}:{_fingerprint_value(v, depth + 1)}" for k, v in value.items())
+        )
+        return f"dict{{{items}}}"
+    raise TypeError(f"cannot fingerprint {type(value).__name__}")
+
+
+def _inputs(namespace: dict) -> Dict[str, Any]:
+    return {k: v for k, v in namespace.items() if k != "st" and not k.startswith("__")}
+
+
+def _fingerprints(namespace: dict) -> Optional[Dict[str, str]]:
+    try:
+        return {k: _fingerprint_value(v) for k, v in _inputs(namespace).items()}
+    except TypeError:
+        return None
+
+
+def _digest(prints: Dict[str, str]) -> str:
+    text = ",".join(f"{k!r}={prints[k]}" for k in sorted(prints))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def fingerprint(namespace: dict) -> Optional[str]:
+    """Return a stable hash of the namespace's data, or None if it holds other objects."""
+    prints = _fingerprints(namespace)
+    return _digest(prints) if prints is not None else None
+
+
+class _RecordingStreamlit:
+    """Stand-in for ``st`` that records display calls and notices everything else."""
+
+    def __init__(self):
+        self.calls: List[Tuple[str, tuple, dict]] = []
+        self.replayable = True
+
+    def __getattr__(self, name):
+        target = getattr(st, name)
+        if name not in _DISPLAY_CALLS:
+            self.replayable = False
+            return target
+
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return target(*args, **kwargs)
+
+        return record
+
+
+@dataclass
+class _Recording:
+    stdout: str
+    stderr: str
+    calls: List[Tuple[str, tuple, dict]] = field(default_factory=list)
+    assigned: Dict[str, Any] = field(default_factory=dict)
+
+
+_results: "OrderedDict[Tuple[str, str], _Recording]" = OrderedDict()
+_results_lock = threading.Lock()
+
+
+def _copy_assigned(assigned: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy assigned data so sessions cannot share state; modules are kept by reference.
+
+    Raises:
+        TypeError: If a value cannot be copied (e.g. a module inside a list).
+    """
+    return {k: v if isinstance(v, ModuleType) else copy.deepcopy(v) for k, v in assigned.items()}
+
+
+def _replay(recording: _Recording, namespace: dict) -> Tuple[str, str]:
+    for name, args, kwargs in recording.calls:
+        getattr(st, name)(*args, **kwargs)
+    namespace.update(_copy_assigned(recording.assigned))
+    return recording.stdout, recording.stderr
+
+
+def execute_snippet(code: str, namespace: dict, cache: bool = True) -> Tuple[str, str]:
+    """Run ``code`` in ``namespace`` (with ``st`` injected) and return ``(stdout, stderr)``.
+
+    With ``cache=True`` a snippet that ran before with the same source and
+    namespace data is replayed instead of executed.
+    """
+    compiled = compile_snippet(code)
+    prints = _fingerprints(namespace) if cache else None
+    if prints is None:
+        namespace["st"] = st
+        with capture() as captured:
+            exec(compiled, namespace)
+        return captured.stdout, captured.stderr
+
+    key = (_source_hash(code), _digest(prints))
+    with _results_lock:
+        recording = _results.get(key)
+        if recording is not None:
+            _results.move_to_end(key)
+    if recording is not None:
+        namespace["st"] = st
+        return _replay(recording, namespace)
+
+    recorder = _RecordingStreamlit()
+    namespace["st"] = recorder
+    before = {k: id(v) for k, v in namespace.items()}
+    try:
+        with capture() as captured:
+            exec(compiled, namespace)
+    finally:
+        namespace["st"] = st
+
+    # Names the snippet (re)bound are replayed; in-place changes or deletions cannot be.
+    inputs = _inputs(namespace)
+    assigned = {k: v for k, v in inputs.items() if before.get(k) != id(v)}
+    try:
+        unchanged = all(
+            k in inputs and (k in assigned or _fingerprint_value(inputs[k]) == print_)
+            for k, print_ in prints.items()
+        )
+        for value in assigned.values():
+            _fingerprint_value(value)
+        assigned = _copy_assigned(assigned)
+    except TypeError:
+        unchanged = False
+    if recorder.replayable and unchanged:
+        recording = _Recording(captured.stdout, captured.stderr, recorder.calls, assigned)
+        with _results_lock:
+            _results[key] = recording
+            while len(_results) > MAX_RESULT_ENTRIES:
+                _results.popitem(last=False)
+    return captured.stdout, captured.stderr
+
+
+def clear_snippet_cache() -> None:
+    """Forget all compiled snippets and recorded results."""
+    with _code_lock:
+        _code_cache.clear()
+    with _results_lock:
+        _results.clear()
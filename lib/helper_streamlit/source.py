@@ -0,0 +1,87 @@
+"""Parsed page sources with their ``# --- CODE START`` regions.
+
+Pages show parts of their own source with ``show_code(__file__)``. The parts
+are marked with comment lines::
+
+    # --- CODE START            region "code"
+    # --- CODE END
+    # --- CODE START: OUTPUT    region "output"
+    # --- CODE END: OUTPUT
+    # --- CODE START: setup     any other name
+    # --- CODE END: setup
+
+A ``START`` also ends the region that is open, and several blocks with the
+same name are joined. :func:`parse_source` finds all regions in one regex pass
+and keeps the result per path until the file's modification time or size
+changes, so a rerun only costs one ``os.stat``.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+__all__ = ["ParsedSource", "parse_source", "split_regions"]
+
+DEFAULT_REGION = "code"
+
+_MARKER = re.compile(r"^[ \t]*# --- CODE (START|END)\b(?:[ \t]*:[ \t]*([^\r\n]*?))?[ \t]*\r?$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class ParsedSource:
+    """File text and its marked regions (name -> code)."""
+
+    text: str
+    regions: Dict[str, str] = field(default_factory=dict)
+
+    def region(self, name: str = DEFAULT_REGION) -> str:
+        """Return the code of region ``name`` (case-insensitive), or ``""``."""
+        return self.regions.get(name.lower(), "")
+
+
+def split_regions(text: str) -> Dict[str, str]:
+    """Return ``{name: code}`` for all marked regions of ``text``."""
+    blocks: Dict[str, List[str]] = {}
+    name, start = None, 0
+    for match in _MARKER.finditer(text):
+        if name is not None:
+            block = text[start:match.start()]
+            blocks.setdefault(name, []).append(block[:-1] if block.endswith("\n") else block)
+        if match.group(1) == "START":
+            name = (match.group(2) or DEFAULT_REGION).lower()
+            start = match.end() + 1  # skip the marker's line break
+        else:
+            name = None
+    if name is not None:  # open until the end of the file
+        block = text[start:]
+        blocks.setdefault(name, []).append(block[:-1] if block.endswith("\n") else block)
+    return {name: "\n".join(parts) for name, parts in blocks.items()}
+
+
+_cache: Dict[str, Tuple[Tuple[int, int], ParsedSource]] = {}
+_cache_lock = threading.Lock()
+
+
+def parse_source(path: str) -> ParsedSource:
+    """Read and split ``path``, reusing the last result while the file is unchanged.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    parsed = ParsedSource(text, split_regions(text))
+    with _cache_lock:
+        _cache[path] = (version, parsed)
+    return parsed
@@ -51,14 +51,16 @@ def analyze_text(model, text, analysis_type):
         dict: Response with keys 'status', 'message', 'response', and 'stats'
     """
     try:
-        import ollama
+        from lib.helper_ollama import generate
         
         prompt = get_analysis_prompt(analysis_type, text)
         
-        response = ollama.generate(
-            model=model,
-            prompt=prompt,
-            options={'temperature': 0.3}  # Lower temperature for analytical tasks
+        # Repeated analyses of the same text are answered from the response cache
+        response = generate(
+            model,
+            prompt,
+            options={'temperature': 0.3},  # Lower temperature for analytical tasks
+            cache=True
         )
         
         stats = {
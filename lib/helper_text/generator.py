@@ -18,9 +18,9 @@ def generate_text(model, prompt, temperature=0.7, max_tokens=200):
         dict: Response with keys 'status', 'message', 'response', and 'stats'
     """
     try:
-        import ollama
+        from lib.helper_ollama.transport import get_client
         
-        response = ollama.generate(
+        response = get_client().generate(
             model=model,
             prompt=prompt,
             options={
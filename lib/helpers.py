@@ -1,7 +1,7 @@
 # Add lib directory to path
 # sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ollama_utils'))
 
-from lib.helper_ollama import get_local_llms
+from lib.helper_ollama import get_local_llms, get_model_registry
 
 
 def get_chat_models() -> list[str]:
@@ -82,10 +82,9 @@ def get_best_model_for_function(func: str) -> str:
 def get_model_capabilities(model_name: str) -> list[str]:
     """Get capabilities of a specific model by name."""
     try:
-        all_models = get_local_llms()
-        for model in all_models:
-            if model["name"] == model_name:
-                return model["capabilities"]
+        model = get_model_registry().get(model_name)
+        if model is not None:
+            return model["capabilities"]
     except Exception:
         pass
     return []
@@ -0,0 +1,96 @@
+"""Deferred imports for heavy dependencies.
+
+``import ollama`` (pydantic models), ``pandas`` or the ``langchain`` packages
+take hundreds of milliseconds each. Modules that only need them inside a few
+functions can bind a placeholder at import time and pay for the import on
+first use::
+
+    from lib.lazy import lazy_import
+
+    o = lazy_import("ollama")                                # module
+    FAISS = lazy_import("langchain_community.vectorstores", "FAISS")  # attribute
+
+    o.Client(...)               # imports ollama here
+    FAISS.from_documents(...)   # imports langchain_community.vectorstores here
+
+Packages can defer their re-exports with :func:`lazy_exports` (PEP 562
+module ``__getattr__``). A missing package raises ``ImportError`` on first use
+instead of at import time.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional
+
+__all__ = ["LazyObject", "lazy_exports", "lazy_import"]
+
+
+class LazyObject:
+    """Stand-in for a module (or one of its attributes) that imports it on first use."""
+
+    __slots__ = ("_module", "_attribute", "_target", "_lock")
+
+    def __init__(self, module: str, attribute: Optional[str] = None):
+        object.__setattr__(self, "_module", module)
+        object.__setattr__(self, "_attribute", attribute)
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _resolve(self) -> Any:
+        target = self._target
+        if target is None:
+            with self._lock:
+                target = self._target
+                if target is None:
+                    target = importlib.import_module(self._module)
+                    if self._attribute is not None:
+                        target = getattr(target, self._attribute)
+                    object.__setattr__(self, "_target", target)
+        return target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __dir__(self):
+        return dir(self._resolve())
+
+    def __repr__(self) -> str:
+        name = self._module if self._attribute is None else f"{self._module}.{self._attribute}"
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy {name} ({state})>"
+
+
+def lazy_import(module: str, attribute: Optional[str] = None) -> Any:
+    """Return a placeholder for ``module`` (or ``module.attribute``) that imports it on first use."""
+    return LazyObject(module, attribute)
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """Build a module ``__getattr__`` that imports ``exports`` on first access.
+
+    Args:
+        package: ``__name__`` of the module defining ``__getattr__``.
+        exports: Maps each exported name to the (relative) module providing it.
+
+    Example:
+        >>> __getattr__ = lazy_exports(__name__, {"agenerate": ".aio", "embed_many": ".embed"})
+    """
+
+    def __getattr__(name: str) -> Any:
+        source = exports.get(name)
+        if source is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(source, package), name)
+        setattr(sys.modules[package], name, value)  # later lookups skip __getattr__
+        return value
+
+    return __getattr__
@@ -0,0 +1,252 @@
+"""Run code snippets in a pool of pre-warmed worker processes.
+
+Executing user-editable snippets inside the Streamlit server means an endless
+loop blocks a server thread and a memory-hungry snippet can take down every
+session. :class:`SnippetSandbox` keeps a few worker interpreters running (with
+common modules already imported) and sends each snippet to an idle one. Every
+run is limited in CPU time and memory inside the worker (POSIX ``resource``
+limits) and in wall time by the parent, which kills and replaces a worker that
+does not answer in time. Output written to stdout/stderr is captured in the
+worker and returned with the result.
+
+Limits come from the environment:
+
+- ``STARTERAPP_SANDBOX_WORKERS``: worker processes (default 2)
+- ``STARTERAPP_SANDBOX_CPU_SECONDS``: CPU seconds per run (default 10)
+- ``STARTERAPP_SANDBOX_WALL_SECONDS``: wall-clock seconds per run (default 30)
+- ``STARTERAPP_SANDBOX_MEMORY_MB``: extra memory per worker (default 512)
+"""
+
+from __future__ import annotations
+
+import io
+import multiprocessing as mp
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows: wall-time limit only
+    resource = None
+
+__all__ = ["SandboxResult", "SnippetSandbox", "get_sandbox"]
+
+WORKERS = int(os.environ.get("STARTERAPP_SANDBOX_WORKERS", "2"))
+CPU_SECONDS = float(os.environ.get("STARTERAPP_SANDBOX_CPU_SECONDS", "10"))
+WALL_SECONDS = float(os.environ.get("STARTERAPP_SANDBOX_WALL_SECONDS", "30"))
+MEMORY_MB = int(os.environ.get("STARTERAPP_SANDBOX_MEMORY_MB", "512"))
+
+# Imported once per worker so snippets do not pay for them.
+DEFAULT_PRELOAD = ("json", "math", "random", "ollama")
+
+_MAX_OUTPUT = 1_000_000
+
+
+@dataclass
+class SandboxResult:
+    """Outcome of one snippet run."""
+
+    stdout: str = ""
+    stderr: str = ""
+    error: Optional[str] = None  # formatted traceback or limit message
+    duration: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _CPUTimeExceeded(Exception):
+    pass
+
+
+def _on_sigxcpu(signum, frame):
+    raise _CPUTimeExceeded()
+
+
+def _vm_size() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _worker_main(conn, cpu_seconds: float, memory_mb: int, preload: Sequence[str]) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for name in preload:
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+        base = _vm_size()
+        if base and memory_mb:
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (base + memory_mb * 1024 * 1024, hard))
+
+    while True:
+        try:
+            code, namespace = conn.recv()
+        except EOFError:
+            return
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        error = None
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            used = usage.ru_utime + usage.ru_stime
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (int(used + cpu_seconds) + 1, hard))
+
+        original = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = stdout, stderr
+        start = time.perf_counter()
+        try:
+            exec(compile(code, "<snippet>", "exec"), {"__name__": "__main__", **namespace})
+        except _CPUTimeExceeded:
+            error = f"CPU time limit exceeded ({cpu_seconds:g}s)"
+        except MemoryError:
+            error = f"Memory limit exceeded ({memory_mb} MB)"
+        except BaseException:
+            error = traceback.format_exc()
+        finally:
+            sys.stdout, sys.stderr = original
+            if resource is not None:
+                _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+                resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+        conn.send({
+            "stdout": stdout.getvalue()[:_MAX_OUTPUT],
+            "stderr": stderr.getvalue()[:_MAX_OUTPUT],
+            "error": error,
+            "duration": time.perf_counter() - start,
+        })
+
+
+class _Worker:
+    def __init__(self, ctx, cpu_seconds: float, memory_mb: int, preload: Sequence[str]):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child, cpu_seconds, memory_mb, tuple(preload)),
+            name="snippet-sandbox",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class SnippetSandbox:
+    """A pool of warm worker processes that run snippets with limits.
+
+    Args:
+        workers: Number of worker processes (snippets run in parallel up to this).
+        cpu_seconds: CPU time per run.
+        wall_seconds: Wall-clock time per run; the worker is replaced afterwards.
+        memory_mb: Memory a run may allocate on top of the warm interpreter.
+        preload: Modules imported by each worker before the first run.
+
+    Example:
+        >>> result = get_sandbox().run("print(sum(range(10)))")
+        >>> result.stdout
+        '45\\n'
+    """
+
+    def __init__(
+        self,
+        workers: int = WORKERS,
+        cpu_seconds: float = CPU_SECONDS,
+        wall_seconds: float = WALL_SECONDS,
+        memory_mb: int = MEMORY_MB,
+        preload: Sequence[str] = DEFAULT_PRELOAD,
+    ):
+        # "spawn" never forks the multi-threaded server process.
+        self._ctx = mp.get_context("spawn")
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.memory_mb = memory_mb
+        self.preload = tuple(preload)
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers = max(1, workers)
+        for _ in range(self._workers):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.cpu_seconds, self.memory_mb, self.preload)
+
+    def run(self, code: str, namespace: Optional[dict] = None, wall_seconds: Optional[float] = None) -> SandboxResult:
+        """Execute ``code`` in a worker and return its captured output.
+
+        ``namespace`` provides extra globals; its values must be picklable.
+        """
+        limit = wall_seconds or self.wall_seconds
+        worker = self._idle.get()
+        if not worker.process.is_alive():
+            worker = self._spawn()
+
+        start = time.perf_counter()
+        try:
+            try:
+                worker.conn.send((code, dict(namespace or {})))
+            except Exception as e:
+                raise ValueError(f"Namespace cannot be sent to the sandbox: {e}") from e
+
+            if worker.conn.poll(limit):
+                try:
+                    return SandboxResult(**worker.conn.recv())
+                except EOFError:
+                    # The worker died, e.g. killed by the OS for using too much memory.
+                    worker.kill()
+                    worker = self._spawn()
+                    return SandboxResult(
+                        error="The snippet crashed the worker process",
+                        duration=time.perf_counter() - start,
+                    )
+
+            worker.kill()
+            worker = self._spawn()
+            return SandboxResult(
+                error=f"Wall time limit exceeded ({limit:g}s)",
+                duration=time.perf_counter() - start,
+                timed_out=True,
+            )
+        finally:
+            self._idle.put(worker)
+
+    def close(self) -> None:
+        """Stop all idle workers."""
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+_sandbox: Optional[SnippetSandbox] = None
+_sandbox_lock = threading.Lock()
+
+
+def get_sandbox() -> SnippetSandbox:
+    """Return the process-wide sandbox, starting its workers on first use."""
+    global _sandbox
+    if _sandbox is None:
+        with _sandbox_lock:
+            if _sandbox is None:
+                _sandbox = SnippetSandbox()
+    return _sandbox
@@ -0,0 +1,219 @@
+"""Import-time profiler and startup budget for the app.
+
+Every measurement runs in a fresh interpreter, so the numbers are cold-start
+numbers:
+
+- :func:`import_times` runs ``python -X importtime`` and reports the
+  cumulative import time of each ``lib`` module.
+- :func:`measure_page` renders one page (or ``app.py``, i.e. navigation plus
+  the default page) with Streamlit's ``AppTest`` and reports the total time,
+  the render time and the heaviest imports the page triggered.
+- :func:`check_budget` compares the results with the budgets and lists the
+  violations; the command line exits with status 1 if there are any.
+
+Run from the command line::
+
+    python -m lib.startup                       # app cold start + lib modules
+    python -m lib.startup views/800_📚_Kurs/803_Tag_3_Ollama.py --page-budget 2
+    just startup-budget
+
+Budgets default to ``STARTERAPP_STARTUP_BUDGET`` (seconds for ``app.py``,
+default 4) and ``STARTERAPP_PAGE_BUDGET`` (seconds per page, default 3).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+__all__ = [
+    "ImportTime",
+    "PageTiming",
+    "check_budget",
+    "import_times",
+    "measure_page",
+    "parse_importtime",
+]
+
+ROOT = Path(__file__).parent.parent
+
+STARTUP_BUDGET = float(os.environ.get("STARTERAPP_STARTUP_BUDGET", "4"))
+PAGE_BUDGET = float(os.environ.get("STARTERAPP_PAGE_BUDGET", "3"))
+
+DEFAULT_MODULES = ("lib.helpers", "lib.helper_ollama", "lib.helper_streamlit")
+
+_PAGE_MARKER = "--- starterapp page render ---"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+@dataclass
+class ImportTime:
+    """One line of ``-X importtime`` output."""
+
+    module: str
+    self_s: float
+    cumulative_s: float
+    depth: int
+
+
+@dataclass
+class PageTiming:
+    """Cold-start timing of one page."""
+
+    path: str
+    total_s: float = 0.0  # interpreter start to first render finished
+    render_s: float = 0.0  # AppTest.run() incl. the page's own imports
+    imports: List[ImportTime] = field(default_factory=list)  # top-level imports during render
+    exceptions: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def parse_importtime(text: str) -> List[ImportTime]:
+    """Parse ``python -X importtime`` output (stderr) into records."""
+    records = []
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if match:
+            records.append(ImportTime(
+                module=match.group(4),
+                self_s=int(match.group(1)) / 1e6,
+                cumulative_s=int(match.group(2)) / 1e6,
+                depth=len(match.group(3)) // 2,
+            ))
+    return records
+
+
+def _python(code: str, args: Sequence[str] = (), timeout: float = 120) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+
+
+def import_times(modules: Sequence[str] = DEFAULT_MODULES, prefix: str = "lib") -> List[ImportTime]:
+    """Import ``modules`` in a fresh interpreter and return the times of modules under ``prefix``."""
+    proc = _python("; ".join(f"import {m}" for m in modules))
+    if proc.returncode != 0:
+        raise Exception(f"Failed to import {', '.join(modules)}: {proc.stderr.strip().splitlines()[-1]}")
+    return [r for r in parse_importtime(proc.stderr) if r.module == prefix or r.module.startswith(prefix + ".")]
+
+
+_PAGE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))
+print(sys.argv[3], file=sys.stderr, flush=True)
+render = time.perf_counter()
+app.run()
+end = time.perf_counter()
+print(json.dumps({
+    "total_s": end - start,
+    "render_s": end - render,
+    "exceptions": [e.message for e in app.exception],
+}))
+"""
+
+
+def measure_page(path: str, timeout: float = 60, top: int = 5) -> PageTiming:
+    """Render ``path`` once in a fresh interpreter and time it.
+
+    Args:
+        path: Page file (or ``app.py``) relative to the repository root.
+        timeout: Seconds the render may take.
+        top: Number of heaviest imports to keep.
+    """
+    timing = PageTiming(path)
+    try:
+        proc = _python(_PAGE_SCRIPT, [path, str(timeout), _PAGE_MARKER], timeout=timeout + 60)
+    except subprocess.TimeoutExpired:
+        timing.error = f"timed out after {timeout + 60:g}s"
+        return timing
+    if proc.returncode != 0 or not proc.stdout.strip():
+        lines = proc.stderr.strip().splitlines()
+        timing.error = lines[-1] if lines else f"exit status {proc.returncode}"
+        return timing
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    timing.total_s = result["total_s"]
+    timing.render_s = result["render_s"]
+    timing.exceptions = result["exceptions"]
+
+    during_render = proc.stderr.split(_PAGE_MARKER, 1)[-1]
+    roots = [r for r in parse_importtime(during_render) if r.depth == 0]
+    timing.imports = sorted(roots, key=lambda r: r.cumulative_s, reverse=True)[:top]
+    return timing
+
+
+def check_budget(
+    pages: Sequence[PageTiming],
+    startup_budget: float = STARTUP_BUDGET,
+    page_budget: float = PAGE_BUDGET,
+) -> List[str]:
+    """Return a message for every page over its budget (``app.py`` uses ``startup_budget``)."""
+    violations = []
+    for page in pages:
+        budget = startup_budget if Path(page.path).name == "app.py" else page_budget
+        if page.error:
+            violations.append(f"{page.path}: {page.error}")
+        elif page.total_s > budget:
+            violations.append(f"{page.path}: {page.total_s:.2f}s cold start exceeds the {budget:g}s budget")
+    return violations
+
+
+def _report_imports(records: List[ImportTime], limit: int = 15) -> None:
+    print(f"{'lib module':<45} {'self':>8} {'cumulative':>11}")
+    for r in sorted(records, key=lambda r: r.cumulative_s, reverse=True)[:limit]:
+        print(f"{r.module:<45} {r.self_s * 1000:>6.0f}ms {r.cumulative_s * 1000:>9.0f}ms")
+
+
+def _report_page(page: PageTiming) -> None:
+    if page.error:
+        print(f"{page.path}: ERROR {page.error}")
+        return
+    heavy = ", ".join(f"{r.module} {r.cumulative_s * 1000:.0f}ms" for r in page.imports)
+    print(f"{page.path}: {page.total_s:.2f}s total, {page.render_s:.2f}s render")
+    if heavy:
+        print(f"    imports during render: {heavy}")
+    if page.exceptions:
+        print(f"    {len(page.exceptions)} exception(s) on the page: {page.exceptions[0][:100]}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Profile cold-start import and render times.")
+    parser.add_argument("pages", nargs="*", default=["app.py"], help="page files to render (default: app.py)")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET, help="seconds for app.py")
+    parser.add_argument("--page-budget", type=float, default=PAGE_BUDGET, help="seconds per page")
+    parser.add_argument("--modules", nargs="*", default=list(DEFAULT_MODULES), help="lib modules to profile")
+    args = parser.parse_args(argv)
+
+    if args.modules:
+        _report_imports(import_times(args.modules))
+        print()
+
+    pages = [measure_page(path) for path in args.pages]
+    for page in pages:
+        _report_page(page)
+
+    violations = check_budget(pages, args.startup_budget, args.page_budget)
+    if violations:
+        print("\nOver budget:")
+        for message in violations:
+            print(f"  {message}")
+        sys.exit(1)
+    print("\nWithin budget.")
+
+
+if __name__ == "__main__":
+    main()
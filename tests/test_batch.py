@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from lib.helper_ollama import batch
+from lib.helper_ollama.batch import AIMDController, run_batch
+
+
+def write_input(path, n):
+    path.write_text("".join(json.dumps({"id": f"r{i}", "text": f"item {i}"}) + "\n" for i in range(n)))
+
+
+def read_output(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_batch_resumes_after_a_crash(monkeypatch, tmp_path):
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(source, 20)
+
+    def crashing(model, record, prompt, options, system):
+        if record["id"] == "r12":
+            raise KeyboardInterrupt
+        return {"response": prompt.upper(), "eval_count": 1}
+
+    monkeypatch.setattr(batch, "_request", crashing)
+    with pytest.raises(KeyboardInterrupt):
+        run_batch(source, target, "m", template="say {text}", start_concurrency=1, checkpoint_every=5)
+    first = read_output(target)
+    assert 0 < len(first) < 20
+
+    calls = []
+
+    def working(model, record, prompt, options, system):
+        calls.append(record["id"])
+        return {"response": prompt.upper(), "eval_count": 1}
+
+    monkeypatch.setattr(batch, "_request", working)
+    stats = run_batch(source, target, "m", template="say {text}")
+
+    results = read_output(target)
+    assert sorted(r["id"] for r in results) == sorted(f"r{i}" for i in range(20))
+    assert len(calls) == 20 - len(first)
+    assert stats["done"] == len(calls)
+    assert results[-1]["response"].startswith("SAY ITEM")
+
+
+def test_batch_retries_and_records_failures(monkeypatch, tmp_path):
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(source, 3)
+    attempts = {}
+
+    def flaky(model, record, prompt, options, system):
+        attempts[record["id"]] = attempts.get(record["id"], 0) + 1
+        if record["id"] == "r1" or attempts[record["id"]] < 2:
+            raise RuntimeError("busy")
+        return {"response": "ok", "eval_count": 1}
+
+    monkeypatch.setattr(batch, "_request", flaky)
+    stats = run_batch(source, target, "m", prompt_field="text", retries=2, backoff=0.001)
+
+    assert stats["done"] == 2 and stats["failed"] == 1
+    failed = [r for r in read_output(target) if "error" in r]
+    assert [r["id"] for r in failed] == ["r1"] and failed[0]["attempts"] == 3
+
+
+def test_aimd_grows_slowly_and_halves_on_errors():
+    controller = AIMDController(start=4, maximum=10)
+    for _ in range(4):
+        controller.on_success(1.0)
+    assert controller.limit == 5
+    controller.on_error()
+    assert controller.limit == 2
+    controller.on_error()  # same window: no second decrease
+    assert controller.limit == 2
+    for _ in range(5):
+        controller.on_success(10.0)  # latency far above the baseline
+    assert controller.limit == 1
+
+
+def test_retry_failed_replaces_error_lines(monkeypatch, tmp_path):
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(source, 30)
+
+    def failing(model, record, prompt, options, system):
+        if record["id"] in ("r1", "r7"):
+            raise RuntimeError("busy")
+        return {"response": "ok", "eval_count": 1}
+
+    monkeypatch.setattr(batch, "_request", failing)
+    run_batch(source, target, "m", prompt_field="text", retries=0, checkpoint_every=5)
+    assert batch._read_checkpoint(target)["watermark"] == 30
+
+    calls = []
+
+    def working(model, record, prompt, options, system):
+        calls.append(record["id"])
+        return {"response": "ok", "eval_count": 1}
+
+    monkeypatch.setattr(batch, "_request", working)
+    stats = run_batch(source, target, "m", prompt_field="text", retry_failed=True)
+
+    results = read_output(target)
+    assert sorted(calls) == ["r1", "r7"] and stats["done"] == 2
+    assert sorted(r["index"] for r in results) == list(range(30))
+    assert not any("error" in r for r in results)
@@ -0,0 +1,49 @@
+from lib.helper_ollama import benchmark
+from lib.helper_ollama.benchmark import Sample, list_results, load_results, run_benchmark, save_results, summarize
+
+
+def fake_stream(path, payload):
+    yield {"response": "Hello", "done": False}
+    yield {"response": " world", "done": False}
+    yield {
+        "response": "",
+        "done": True,
+        "load_duration": 1_000_000,
+        "prompt_eval_count": 10,
+        "prompt_eval_duration": 100_000_000,
+        "eval_count": 20,
+        "eval_duration": 500_000_000,
+    }
+
+
+def test_run_benchmark_records_server_timings(monkeypatch, tmp_path):
+    monkeypatch.setattr(benchmark, "stream_ndjson", fake_stream)
+    monkeypatch.setattr(benchmark, "get_json", lambda path: {"models": [{"name": "m", "size": 2 * 1024**3}]})
+
+    result = run_benchmark(["m"], prompts={"p": "x"}, concurrency=[2, 1], repeats=3)
+
+    assert len(result.samples) == 6
+    rows = result.summary()
+    assert [r["concurrency"] for r in rows] == [1, 2]
+    assert rows[0]["tokens_per_s"] == 40.0
+    assert rows[0]["prompt_tokens_per_s"] == 100.0
+    assert rows[0]["memory_gb"] == 2.0
+    assert rows[0]["ttft_p50"] is not None
+
+    path = save_results(result, tmp_path)
+    assert path.with_suffix(".csv").exists()
+    assert load_results(path).summary() == rows
+
+    again = save_results(result, tmp_path)  # same start second, e.g. another session
+    assert again != path and again.with_suffix(".csv").exists()
+    assert list_results(tmp_path) == [again, path]
+
+
+def test_summarize_percentiles_skip_errors():
+    samples = [Sample("m", "p", 1, latency=float(i), ttft=0.1) for i in range(1, 101)]
+    samples.append(Sample("m", "p", 1, latency=999.0, error="boom"))
+
+    (row,) = summarize(samples)
+    assert row["errors"] == 1
+    assert row["latency_p50"] == 50.5
+    assert 99 < row["latency_p99"] < 100
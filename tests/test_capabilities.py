@@ -0,0 +1,57 @@
+from lib.helper_ollama.capabilities import (
+    CapabilityIndex,
+    capabilities_from_name,
+    capabilities_from_show,
+)
+
+
+def test_name_matcher_respects_token_boundaries():
+    assert "tools" not in capabilities_from_name("dolphin")
+    assert capabilities_from_name("phi3") == ["tools", "chat"]
+    assert capabilities_from_name("nomic-embed-text") == ["embedding"]
+    assert "thinking" in capabilities_from_name("deepseek-r1:7b")
+
+
+def test_family_names_match_inside_longer_names():
+    assert capabilities_from_name("tinyllama") == ["chat"]
+    assert capabilities_from_name("openhermes:latest") == ["tools"]
+    assert capabilities_from_name("codeqwen:7b") == ["tools", "chat"]
+    assert capabilities_from_name("library/mistral:7b") == ["tools", "chat"]
+
+
+def test_show_metadata_wins_over_name():
+    show = {"capabilities": ["completion", "vision", "tools"]}
+    assert capabilities_from_show(show) == ["vision", "tools", "chat"]
+
+    legacy = {
+        "details": {"families": ["nomic-bert"]},
+        "modelinfo": {"general.architecture": "nomic-bert"},
+    }
+    assert capabilities_from_show(legacy) == ["embedding"]
+    assert capabilities_from_show({}) is None
+
+
+def test_index_inspects_each_digest_once_and_persists(tmp_path):
+    calls = []
+
+    def show(name):
+        calls.append(name)
+        return {"capabilities": ["completion"]}
+
+    path = tmp_path / "capabilities.json"
+    index = CapabilityIndex(path, show=show)
+    assert index.capabilities("gemma3:1b", "sha-1") == ["chat"]
+    assert index.capabilities("gemma3:1b", "sha-1") == ["chat"]
+    assert calls == ["gemma3:1b"]
+
+    reloaded = CapabilityIndex(path, show=show)
+    assert reloaded.get("sha-1") == ["chat"]
+
+
+def test_index_falls_back_to_name_when_server_is_down(tmp_path):
+    def show(name):
+        raise ConnectionError("ollama down")
+
+    index = CapabilityIndex(tmp_path / "capabilities.json", show=show)
+    assert index.capabilities("llava:13b", "sha-2") == ["vision"]
+    assert index.get("sha-2") is None
@@ -0,0 +1,48 @@
+import sys
+import threading
+
+from lib.helper_streamlit.capture import capture
+
+
+def test_capture_collects_stdout_and_stderr():
+    with capture() as output:
+        print("hello")
+        print("oops", file=sys.stderr)
+    assert output.stdout == "hello\n"
+    assert output.stderr == "oops\n"
+
+
+def test_parallel_captures_do_not_mix():
+    barrier = threading.Barrier(4)
+    results = {}
+
+    def worker(n):
+        with capture() as output:
+            for i in range(200):
+                print(n, i)
+                if i == 0:
+                    barrier.wait()
+        results[n] = output.stdout
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for n, text in results.items():
+        lines = text.splitlines()
+        assert len(lines) == 200
+        assert all(line.startswith(f"{n} ") for line in lines)
+
+
+def test_nested_capture_restores_outer(capsys):
+    with capture() as outer:
+        print("a")
+        with capture() as inner:
+            print("b")
+        print("c")
+    print("outside")
+    assert outer.stdout == "a\nc\n"
+    assert inner.stdout == "b\n"
+    assert capsys.readouterr().out == "outside\n"
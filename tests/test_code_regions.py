@@ -0,0 +1,55 @@
+import os
+
+from lib.helper_streamlit import source
+
+
+PAGE = """import streamlit as st
+
+# --- CODE START
+x = 1
+print(x)
+# --- CODE END
+
+# --- CODE START: OUTPUT
+st.write(x)
+# --- CODE END: OUTPUT
+
+# --- CODE START: setup
+y = 2
+# --- CODE END: setup
+
+# --- CODE START
+z = 3
+# --- CODE END
+"""
+
+
+def test_split_regions_finds_all_named_regions():
+    regions = source.split_regions(PAGE)
+    assert regions["code"] == "x = 1\nprint(x)\nz = 3"
+    assert regions["output"] == "st.write(x)"
+    assert regions["setup"] == "y = 2"
+
+
+def test_start_closes_open_region_and_unclosed_region_runs_to_end():
+    regions = source.split_regions("# --- CODE START\na\n# --- CODE START: OUTPUT\nb\nc\n")
+    assert regions == {"code": "a", "output": "b\nc"}
+
+
+def test_parse_source_is_cached_until_file_changes(tmp_path, monkeypatch):
+    page = tmp_path / "page.py"
+    page.write_text(PAGE, encoding="utf-8")
+
+    reads = []
+    real_open = open
+    monkeypatch.setattr(source, "open", lambda *a, **k: reads.append(a[0]) or real_open(*a, **k), raising=False)
+
+    first = source.parse_source(str(page))
+    assert source.parse_source(str(page)) is first
+    assert len(reads) == 1
+
+    page.write_text(PAGE.replace("y = 2", "y = 42"), encoding="utf-8")
+    stat = page.stat()
+    os.utime(page, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert source.parse_source(str(page)).region("setup") == "y = 42"
+    assert len(reads) == 2
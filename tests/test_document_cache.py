@@ -0,0 +1,76 @@
+import json
+import threading
+import time
+
+from lib.helper_rag import documents
+from lib.helper_rag import DocumentCache, document_key
+
+
+def test_document_key_depends_on_content_and_settings():
+    key = document_key(b"data", chunk_size=500, embeddings="nomic")
+    assert key == document_key(b"data", embeddings="nomic", chunk_size=500)
+    assert key != document_key(b"data!", chunk_size=500, embeddings="nomic")
+    assert key != document_key(b"data", chunk_size=400, embeddings="nomic")
+
+
+def test_artifacts_are_built_once_and_survive_restarts(tmp_path):
+    builds = []
+
+    def build(name, value):
+        def fn():
+            builds.append(name)
+            return value
+        return fn
+
+    cache = DocumentCache("doc", root=tmp_path)
+    assert cache.json("chunks", build("chunks", [{"page_content": "a"}])) == [{"page_content": "a"}]
+    assert cache.text("summary", build("summary", "short"), variant="llama3") == "short"
+    assert cache.json("chunks", build("chunks", None)) == [{"page_content": "a"}]
+    assert cache.text("summary", build("summary-other", "other"), variant="mistral") == "other"
+    assert builds == ["chunks", "summary", "summary-other"]
+
+    documents._memory.clear()  # new process: everything comes from disk
+    again = DocumentCache("doc", root=tmp_path)
+    assert again.json("chunks", build("chunks", None)) == [{"page_content": "a"}]
+    assert again.text("summary", build("summary", None), variant="llama3") == "short"
+    assert builds == ["chunks", "summary", "summary-other"]
+
+
+def test_resource_uses_save_and_load(tmp_path):
+    def save(value, path):
+        path.mkdir()
+        (path / "index.json").write_text(json.dumps(value))
+
+    def load(path):
+        return json.loads((path / "index.json").read_text())
+
+    cache = DocumentCache("doc", root=tmp_path)
+    assert cache.resource("faiss", lambda: {"rows": 3}, save, load) == {"rows": 3}
+    assert (tmp_path / "doc" / "faiss" / "index.json").exists()
+
+    documents._memory.clear()
+    assert cache.resource("faiss", lambda: {"rows": 0}, save, load) == {"rows": 3}
+
+    (tmp_path / "doc" / "faiss" / "index.json").write_text("broken")
+    documents._memory.clear()
+    assert cache.resource("faiss", lambda: {"rows": 5}, save, load) == {"rows": 5}
+
+
+def test_concurrent_reruns_build_once(tmp_path):
+    builds = []
+
+    def slow_build():
+        builds.append(1)
+        time.sleep(0.05)
+        return "summary"
+
+    def rerun():
+        # every rerun of a page creates its own cache object
+        DocumentCache("k2", root=tmp_path).text("summary", slow_build)
+
+    threads = [threading.Thread(target=rerun) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(builds) == 1 and documents._building == {}
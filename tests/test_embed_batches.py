@@ -0,0 +1,29 @@
+import asyncio
+
+import numpy as np
+
+from lib.helper_ollama import embed as embed_module
+from lib.helper_ollama.embed import aembed_many, iter_batches
+
+
+def test_iter_batches_bounds_count_and_characters():
+    texts = ["a" * 10] * 5 + ["b" * 100] + ["c"]
+    batches = list(iter_batches(texts, batch_size=3, max_batch_chars=50))
+
+    assert [start for start, _ in batches] == [0, 3, 5, 6]
+    assert [len(batch) for _, batch in batches] == [3, 2, 1, 1]
+
+
+def test_aembed_many_preserves_input_order(monkeypatch):
+    async def fake_aembed(model_name, batch, **kwargs):
+        await asyncio.sleep(0.001 * (10 - len(batch)))
+        return {"embeddings": [[float(text), 0.0] for text in batch]}
+
+    monkeypatch.setattr(embed_module, "aembed", fake_aembed)
+    texts = [str(i) for i in range(10)]
+
+    matrix = asyncio.run(aembed_many("nomic-embed-text", texts, batch_size=3))
+
+    assert matrix.dtype == np.float32
+    assert matrix.flags["C_CONTIGUOUS"]
+    assert matrix[:, 0].tolist() == list(range(10))
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+
+from lib.helper_rag import FolderIndex, chunk_text
+
+WORDS = ["apple", "banana", "cherry", "python", "streamlit", "ollama"]
+
+
+class CountingEmbedder:
+    """Bag-of-words embedding over WORDS; remembers how many texts it saw."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(len(texts))
+        return np.array(
+            [[text.lower().count(w) + 0.01 for w in WORDS] for text in texts],
+            dtype=np.float32,
+        )
+
+
+def make_index(folder, tmp_path, embed):
+    return FolderIndex(str(folder), "fake", chunk_size=200, overlap=20, embed=embed, index_dir=tmp_path / "index")
+
+
+def test_chunk_text_covers_text_with_overlap():
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 30 for i in range(10))
+    chunks = chunk_text(text, size=200, overlap=30)
+    assert all(len(c) <= 200 for _, c in chunks)
+    assert chunks[0][0] == 0
+    end = max(start + len(c) for start, c in chunks)
+    assert end == len(text)
+    for (s1, c1), (s2, _) in zip(chunks, chunks[1:]):
+        assert s2 <= s1 + len(c1)
+
+
+def test_update_embeds_only_changed_files(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "a.md").write_text("apple " * 20, encoding="utf-8")
+    (docs / "sub" / "b.txt").write_text("python streamlit " * 10, encoding="utf-8")
+    (docs / "ignored.pdf").write_text("ollama", encoding="utf-8")
+    embed = CountingEmbedder()
+
+    index = make_index(docs, tmp_path, embed)
+    first = index.update()
+    assert (first.added, first.embedded) == (2, len(index))
+    assert index.files == ["a.md", "sub/b.txt"]
+
+    assert not index.update().modified
+    assert len(embed.calls) == 1
+
+    # touched but identical content: no re-embedding
+    os.utime(docs / "a.md", ns=(1, 1))
+    assert not index.update().modified
+    assert len(embed.calls) == 1
+
+    (docs / "sub" / "b.txt").write_text("cherry " * 10, encoding="utf-8")
+    (docs / "c.txt").write_text("banana " * 10, encoding="utf-8")
+    second = index.update()
+    assert (second.added, second.changed, second.unchanged) == (1, 1, 1)
+    assert embed.calls[-1] == second.embedded
+
+    (docs / "a.md").unlink()
+    assert index.update().removed == 1
+    assert index.files == ["c.txt", "sub/b.txt"]
+
+
+def test_index_persists_and_searches(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "fruit.md").write_text("banana banana cherry", encoding="utf-8")
+    (docs / "code.md").write_text("python ollama streamlit", encoding="utf-8")
+    make_index(docs, tmp_path, CountingEmbedder()).update()
+
+    embed = CountingEmbedder()
+    reopened = make_index(docs, tmp_path, embed)
+    assert not reopened.update().modified
+    hits = reopened.search("banana", k=1)
+    assert hits[0].path == "fruit.md"
+    assert embed.calls == [1]  # only the query
+    assert len(reopened.search("python", k=10)) == 2
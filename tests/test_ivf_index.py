@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from lib.helper_rag import IVFIndex, normalize, top_k
+from lib.helper_rag.benchmark import clustered_vectors, run_ann_benchmark
+
+
+@pytest.fixture
+def data():
+    return clustered_vectors(5000, 32, clusters=50, noise=0.5)
+
+
+def recall(index, data, queries, nprobe, k=10):
+    exact = top_k(normalize(queries) @ normalize(data).T, k)
+    ids, _ = index.search(queries, k=k, nprobe=nprobe)
+    return np.mean([len(set(a) & set(b)) / k for a, b in zip(ids, exact)])
+
+
+def test_recall_grows_with_nprobe_and_full_probe_is_exact(data):
+    index = IVFIndex(n_lists=64)
+    index.add(data)
+    assert len(index) == 5000 and index.list_sizes().sum() == 5000
+    queries = data[:100] + 0.3
+    low, high = recall(index, data, queries, 1), recall(index, data, queries, 16)
+    assert high >= low and high >= 0.9
+    assert recall(index, data, queries, 64) == 1.0
+
+
+def test_incremental_insert_and_custom_ids(data):
+    index = IVFIndex(n_lists=32, nprobe=32)
+    index.add(data[:4000])
+    new_ids = index.add(data[4000:4010], ids=np.arange(100_000, 100_010))
+    ids, scores = index.search(data[4005], k=1)
+    assert ids[0] == new_ids[5] == 100_005
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert index.add(data[:1])[0] == 100_010
+
+
+def test_save_load_memory_maps(tmp_path, data):
+    index = IVFIndex(n_lists=32, nprobe=4)
+    index.add(data)
+    index.save(tmp_path)
+
+    loaded = IVFIndex.load(tmp_path)
+    assert isinstance(loaded._lists[0].vectors, np.memmap)
+    queries = data[:20]
+    np.testing.assert_array_equal(loaded.search(queries, k=5)[0], index.search(queries, k=5)[0])
+
+    loaded.add(data[:3])  # copies the touched lists into memory
+    assert len(loaded) == 5003
+
+
+def test_small_and_empty_cases():
+    index = IVFIndex()
+    ids, scores = index.search(np.ones(4), k=3)
+    assert list(ids) == [-1, -1, -1] and np.isinf(scores).all()
+    index.add(np.eye(4))
+    ids, _ = index.search(np.eye(4)[2], k=10, nprobe=10)
+    assert ids[0] == 2 and list(ids[4:]) == [-1] * 6
+
+
+def test_empty_batches_are_a_no_op():
+    index = IVFIndex()
+    assert len(index.add(np.empty((0, 8)))) == 0
+    assert not index.is_trained
+    index.add(np.eye(8))
+    assert len(index.add(np.empty((0, 8)))) == 0 and len(index) == 8
+
+
+def test_clusters_follow_the_corpus_as_it_grows(data):
+    index = IVFIndex()
+    index.add(data[:100])
+    assert index.n_lists == 10
+    index.add(data[100:])
+    assert index.n_lists == 71 and len(index) == 5000
+    ids, _ = index.search(data[4321], k=1, nprobe=71)
+    assert ids[0] == 4321
+
+    explicit = IVFIndex(n_lists=32)
+    explicit.add(data[:10])
+    assert explicit.n_lists == 10
+    explicit.add(data[10:40])
+    assert explicit.n_lists == 32
+    explicit.add(data[40:])
+    assert explicit.n_lists == 32 and explicit.list_sizes().sum() == 5000
+
+
+def test_benchmark_reports_exact_baseline(data):
+    results = run_ann_benchmark(data, data[:10] + 0.1, k=5, nprobes=(1, 8), n_lists=16)
+    assert [r.nprobe for r in results] == [None, 1, 8]
+    assert results[0].recall == 1.0 and 0 < results[-1].recall <= 1.0
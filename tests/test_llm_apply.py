@@ -0,0 +1,62 @@
+import pandas as pd
+
+import lib.helper_ollama as helper_ollama
+from lib.helper_ollama.dataframe import llm_apply
+from lib.helper_ollama.response_cache import ResponseCache
+
+
+def test_llm_apply_calls_once_per_distinct_value_and_memoizes(monkeypatch, tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite3")
+    calls = []
+
+    def fake_generate(model, prompt, cache=None, **kwargs):
+        assert cache is False  # llm_apply does the only cache lookup
+        calls.append(prompt)
+        return {"response": " positive " if "great" in prompt else "negative"}
+
+    monkeypatch.setattr(helper_ollama, "generate", fake_generate)
+    monkeypatch.setattr(helper_ollama, "_model_digest", lambda model: "digest")
+    monkeypatch.setattr(helper_ollama, "get_response_cache", lambda: cache)
+
+    df = pd.DataFrame({"review": ["great", "bad", "great", None, "bad", "great"]}, index=list("abcdef"))
+    progress = []
+    result = llm_apply(df, "review", "Review: {value}", "m", on_progress=lambda *p: progress.append(p))
+
+    assert len(calls) == 2
+    assert list(result.index) == list("abcdef")
+    assert result.tolist() == ["positive", "negative", "positive", None, "negative", "positive"]
+    assert progress[-1] == (2, 2, 0)
+
+    calls.clear()
+    again = llm_apply(df, "review", "Review: {value}", "m", parse=str.upper)
+    assert calls == []
+    assert again["a"] == " POSITIVE "
+    assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 2
+
+
+def test_llm_apply_keeps_literal_braces(monkeypatch):
+    prompts = []
+
+    def fake_generate(model, prompt, cache=None, **kwargs):
+        prompts.append(prompt)
+        return {"response": '{"label": "ok"}'}
+
+    monkeypatch.setattr(helper_ollama, "generate", fake_generate)
+    monkeypatch.setattr(helper_ollama, "_model_digest", lambda model: "")
+
+    template = 'Label {value}. Answer as JSON: {"label": "..."}'
+    result = llm_apply(pd.DataFrame({"x": ["cat"]}), "x", template, "m")
+    assert prompts == ['Label cat. Answer as JSON: {"label": "..."}']
+    assert result.tolist() == ['{"label": "ok"}']
+
+
+def test_llm_apply_reports_failures(monkeypatch, tmp_path):
+    def failing(model, prompt, cache=None, **kwargs):
+        raise RuntimeError("offline")
+
+    monkeypatch.setattr(helper_ollama, "generate", failing)
+    monkeypatch.setattr(helper_ollama, "_model_digest", lambda model: "")
+
+    result = llm_apply(pd.DataFrame({"x": ["a", "a"]}), "x", "{}", "m")
+    assert result.tolist() == [None, None]
+    assert result.attrs["errors"] == {"a": "offline"}
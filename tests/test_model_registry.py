@@ -0,0 +1,65 @@
+from lib.helper_ollama.registry import ModelRegistry
+
+
+def _fake_fetch(state):
+    def fetch():
+        state["calls"] += 1
+        if state.get("down"):
+            raise ConnectionError("ollama down")
+        return [dict(m) for m in state["models"]]
+
+    return fetch
+
+
+def test_registry_serves_fresh_list_without_refetching():
+    state = {"calls": 0, "models": [{"name": "llama3.2", "digest": "a"}]}
+    registry = ModelRegistry(fetch=_fake_fetch(state), ttl=60)
+
+    assert registry.names() == ["llama3.2"]
+    assert registry.names() == ["llama3.2"]
+    assert registry.get("llama3.2")["digest"] == "a"
+    assert state["calls"] == 1
+
+
+def test_registry_enriches_once_per_digest():
+    enriched = []
+
+    def enrich(entry):
+        enriched.append(entry["name"])
+        entry["capabilities"] = ["chat"]
+        return entry
+
+    state = {"calls": 0, "models": [{"name": "llama3.2", "digest": "a"}]}
+    registry = ModelRegistry(fetch=_fake_fetch(state), enrich=enrich, ttl=60)
+
+    registry.refresh()
+    assert registry.refresh() is False
+    assert enriched == ["llama3.2"]
+
+    state["models"] = [{"name": "llama3.2", "digest": "b"}]
+    assert registry.refresh() is True
+    assert enriched == ["llama3.2", "llama3.2"]
+    assert registry.models()[0]["capabilities"] == ["chat"]
+
+
+def test_registry_keeps_last_known_good_list_when_server_is_down():
+    state = {"calls": 0, "models": [{"name": "mistral", "digest": "m"}]}
+    registry = ModelRegistry(fetch=_fake_fetch(state), ttl=60)
+    registry.refresh()
+
+    state["down"] = True
+    assert registry.refresh() is False
+    assert registry.names() == ["mistral"]
+    assert isinstance(registry.last_error, ConnectionError)
+
+
+def test_registry_raises_without_any_known_list():
+    state = {"calls": 0, "models": [], "down": True}
+    registry = ModelRegistry(fetch=_fake_fetch(state), ttl=60)
+
+    try:
+        registry.models()
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("expected ConnectionError")
@@ -0,0 +1,79 @@
+import threading
+import time
+
+from lib.helper_ollama.residency import ModelRouter
+
+
+def make_router(max_loaded=1, resident=()):
+    loads = []
+    router = ModelRouter(
+        ps=lambda: {"models": [{"name": name, "size": 1024} for name in resident]},
+        load=lambda model, keep_alive: loads.append((model, keep_alive)),
+        max_loaded=max_loaded,
+    )
+    return router, loads
+
+
+def test_queued_requests_are_grouped_by_model():
+    router, _ = make_router(max_loaded=1)
+    order = []
+    router.acquire("a")
+
+    def request(model):
+        with router.slot(model):
+            order.append(model)
+            time.sleep(0.01)
+
+    threads = []
+    for model in ["b", "a", "b", "c", "b"]:
+        t = threading.Thread(target=request, args=(model,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.02)
+
+    router.release("a")
+    for t in threads:
+        t.join(2)
+
+    # all "b" requests run back to back before switching models again
+    assert order == ["b", "b", "b", "a", "c"]
+    assert router.stats()["active"] == {}
+
+
+def test_same_model_requests_run_concurrently():
+    router, _ = make_router(max_loaded=1)
+    router.acquire("a")
+    router.acquire("a")
+    assert router.stats()["active"] == {"a": 2}
+
+
+def test_preload_skips_resident_models_and_sets_keep_alive():
+    router, loads = make_router(resident=["gemma3:1b"])
+    assert router.preload("gemma3:1b") is False
+    assert router.preload("mistral", keep_alive="30m", wait=True) is True
+    assert loads == [("mistral", "30m")]
+    assert router.keep_alive_for("mistral:latest") == "30m"
+    assert router.is_resident("gemma3") is False
+    assert router.memory() == 1024
+
+
+def test_requests_waiting_for_a_model_hold_no_server_slot(monkeypatch):
+    import lib.helper_ollama as h
+    from lib.helper_ollama.scheduler import RequestScheduler
+
+    router, _ = make_router(max_loaded=1)
+    scheduler = RequestScheduler(limit=1)
+    monkeypatch.setattr(h, "_router", router)
+    monkeypatch.setattr(h, "_scheduler", scheduler)
+
+    router.acquire("a")
+    t = threading.Thread(target=h.cached_request, args=("generate", "b", {}, lambda: {}),
+                         kwargs={"cache": False, "coalesce": False})
+    t.start()
+    time.sleep(0.05)
+    assert router.stats()["waiting"] == {"b": 1}
+    assert scheduler.stats()["in_flight"] == 0
+
+    router.release("a")
+    t.join(2)
+    assert router.stats()["active"] == {} and scheduler.stats()["in_flight"] == 0
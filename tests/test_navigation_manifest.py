@@ -0,0 +1,40 @@
+from lib.helper_streamlit import navigation
+
+
+def test_manifest_includes_nested_folders():
+    manifest = navigation.build_manifest()
+    sections = list(manifest)
+    assert "🚀 Streamlit Demo" in sections
+    assert "🚀 Streamlit Demo / Chat And Content" in sections
+    # nested sections follow their parent
+    assert sections.index("🚀 Streamlit Demo / Chat And Content") > sections.index("🚀 Streamlit Demo")
+
+    urls = [e.url_path for entries in manifest.values() for e in entries]
+    assert len(urls) == len(set(urls))
+    assert all("/" not in url for url in urls)
+    assert "610_🚀_Streamlit_Demo_chat_and_content_11_Chat_Sand_Box" in urls
+
+
+def test_manifest_is_rebuilt_only_when_folders_change(monkeypatch):
+    calls = []
+    original = navigation.build_manifest
+    monkeypatch.setattr(navigation, "build_manifest", lambda folder: calls.append(folder) or original(folder))
+    monkeypatch.setattr(navigation, "CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(navigation, "_cache", {})
+
+    signature = navigation._signature(navigation.HERE / "views")
+    navigation.build_navigation()
+    navigation.build_navigation()
+    assert len(calls) == 1
+
+    monkeypatch.setattr(navigation, "_signature", lambda base: signature + (("new", 1),))
+    navigation.build_navigation()
+    assert len(calls) == 2
+
+
+def test_each_run_gets_its_own_page_objects(monkeypatch):
+    monkeypatch.setattr(navigation, "_cache", {})
+    first = navigation.build_navigation()
+    second = navigation.build_navigation()
+    section = next(iter(first))
+    assert first[section][0] is not second[section][0]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from lib.helper_rag import append_embeddings, normalize, open_embeddings, top_k, write_embeddings
+
+
+def exact_top(data, queries, k):
+    return top_k(normalize(queries) @ normalize(data).T, k)
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 48))
+    return (centers[rng.integers(0, 20, 4000)] + 0.3 * rng.normal(size=(4000, 48))).astype(np.float32)
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_rescored_search_matches_exact(tmp_path, data, dtype):
+    write_embeddings(tmp_path, data, dtype=dtype)
+    vectors = open_embeddings(tmp_path)
+    assert isinstance(vectors.codes, np.memmap)
+    assert len(vectors) == 4000 and vectors.dim == 48
+
+    queries = data[:50] + 0.1
+    rows, scores = vectors.search(queries, k=10)
+    expected = exact_top(data, queries, 10)
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(rows, expected)])
+    assert recall >= 0.98
+    exact = normalize(queries[0]) @ normalize(data[rows[0]]).T
+    np.testing.assert_allclose(scores[0], exact, rtol=1e-5)
+
+
+def test_int8_without_rescoring_is_a_quarter_of_float32(tmp_path, data):
+    small = write_embeddings(tmp_path / "int8", data, dtype="int8", rescore=None)
+    full = write_embeddings(tmp_path / "f32", data, dtype="float32")
+    assert small.full is None and full.full is None
+    assert small.nbytes < full.nbytes / 3.5
+
+    rows, _ = small.search(data[7], k=5)
+    assert rows[0] == 7
+    np.testing.assert_allclose(small.vectors([7])[0], normalize(data[7]), atol=0.02)
+
+
+def test_append_and_reopen(tmp_path, data):
+    write_embeddings(tmp_path, data[:1000], dtype="int8")
+    before = open_embeddings(tmp_path)
+    append_embeddings(tmp_path, data[1000:1500])
+    assert len(before) == 1000  # an open view keeps its rows
+    after = open_embeddings(tmp_path)
+    assert len(after) == 1500
+    assert after.search(data[1200], k=1)[0][0] == 1200
+
+    with pytest.raises(ValueError):
+        append_embeddings(tmp_path, np.ones((1, 3)))
+
+
+def test_empty_file_returns_no_results(tmp_path):
+    empty = write_embeddings(tmp_path, np.empty((0, 8)))
+    rows, scores = empty.search(np.ones(8), k=3)
+    assert rows.shape == scores.shape == (0,)
+    rows, _ = empty.search(np.ones((2, 8)), k=3)
+    assert rows.shape == (2, 0)
+
+
+def test_large_query_batches_are_split(tmp_path, data, monkeypatch):
+    import lib.helper_rag.quantized as quantized
+
+    vectors = write_embeddings(tmp_path, data, dtype="int8")
+    queries = data[:70] + 0.1
+    expected = vectors.search(queries, k=5)
+    monkeypatch.setattr(quantized, "QUERY_BATCH", 16)
+    rows, scores = vectors.search(queries, k=5)
+    np.testing.assert_array_equal(rows, expected[0])
+    np.testing.assert_allclose(scores, expected[1])
@@ -0,0 +1,80 @@
+from lib.helper_ollama.response_cache import (
+    ResponseCache,
+    is_cacheable,
+    make_key,
+    record_stream,
+    replay_stream,
+)
+
+
+def test_only_deterministic_requests_are_cacheable_by_default():
+    assert is_cacheable({"temperature": 0})
+    assert is_cacheable({"temperature": 0.7, "seed": 42})
+    assert not is_cacheable({"temperature": 0.7})
+    assert not is_cacheable(None)
+    assert is_cacheable(None, cache=True)
+    assert not is_cacheable({"temperature": 0}, cache=False)
+
+
+def test_key_normalizes_prompt_and_depends_on_digest_and_options():
+    base = make_key("generate", "gemma3:1b", "sha-1", {"prompt": "Hi\r\n", "options": {"temperature": 0}})
+    same = make_key("generate", "gemma3:1b", "sha-1", {"prompt": " Hi", "options": {"temperature": 0}, "keep_alive": "5m"})
+    assert base == same
+    assert base != make_key("generate", "gemma3:1b", "sha-2", {"prompt": "Hi", "options": {"temperature": 0}})
+    assert base != make_key("generate", "gemma3:1b", "sha-1", {"prompt": "Hi", "options": {"temperature": 0, "seed": 1}})
+
+
+def test_record_and_replay_round_trip():
+    upstream = [
+        {"model": "m", "response": "Hello ", "done": False},
+        {"model": "m", "response": "world", "done": False},
+        {"model": "m", "response": "", "done": True, "eval_count": 2},
+    ]
+    recorded = []
+    passed = list(record_stream(upstream, "generate", recorded.append))
+
+    assert passed == upstream
+    assert recorded[0]["response"] == "Hello world"
+    assert recorded[0]["eval_count"] == 2
+
+    replayed = list(replay_stream(recorded[0], "generate"))
+    assert "".join(part["response"] for part in replayed) == "Hello world"
+    assert replayed[-1]["done"] is True and replayed[-1]["eval_count"] == 2
+
+
+def test_chat_replay_keeps_message_shape():
+    record = {"model": "m", "done": True, "message": {"role": "assistant", "content": "a b c d e f"}}
+    parts = list(replay_stream(record, "chat"))
+    assert "".join(p["message"]["content"] for p in parts) == "a b c d e f"
+    assert all(p["message"]["role"] == "assistant" for p in parts)
+
+
+def test_lru_eviction_and_counters(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite3", max_bytes=250)
+    cache.put("a", {"response": "x" * 80})
+    cache.put("b", {"response": "y" * 80})
+    assert cache.get("a") is not None  # "a" is now more recently used than "b"
+    cache.put("c", {"response": "z" * 80})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 1
+    assert stats["entries"] == 2 and stats["bytes"] <= 250
+
+
+def test_running_size_total(tmp_path):
+    path = tmp_path / "responses.sqlite3"
+    cache = ResponseCache(path, max_bytes=10_000)
+    cache.put("a", {"response": "x" * 80})
+    cache.put("b", {"response": "y" * 80})
+    cache.put("a", {"response": "x" * 20})  # replacing an entry frees its old size
+    assert cache._bytes == cache.stats()["bytes"]
+
+    reopened = ResponseCache(path, max_bytes=150)
+    reopened.put("c", {"response": "z" * 80})  # over the limit: recount and evict
+    assert reopened._bytes == reopened.stats()["bytes"] <= 150
+    reopened.clear()
+    assert reopened._bytes == 0
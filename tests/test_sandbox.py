@@ -0,0 +1,41 @@
+import pytest
+
+from lib.sandbox import SnippetSandbox
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    sandbox = SnippetSandbox(workers=1, cpu_seconds=1, wall_seconds=3, memory_mb=200, preload=("json",))
+    yield sandbox
+    sandbox.close()
+
+
+def test_captures_output(sandbox):
+    result = sandbox.run("import sys\nprint(x * 2)\nprint('careful', file=sys.stderr)", {"x": 21})
+    assert result.ok
+    assert result.stdout == "42\n"
+    assert result.stderr == "careful\n"
+
+
+def test_reports_exceptions(sandbox):
+    result = sandbox.run("print('before')\n1 / 0")
+    assert result.stdout == "before\n"
+    assert "ZeroDivisionError" in result.error
+
+
+def test_wall_time_limit_replaces_worker(sandbox):
+    result = sandbox.run("import time\ntime.sleep(10)", wall_seconds=0.5)
+    assert result.timed_out
+    assert sandbox.run("print('alive')").stdout == "alive\n"
+
+
+def test_cpu_and_memory_limits(sandbox):
+    assert "CPU time limit" in sandbox.run("while True: pass").error
+    assert "Memory limit" in sandbox.run("data = bytearray(500 * 1024 * 1024)").error
+    assert sandbox.run("print('alive')").ok
+
+
+def test_rejects_unpicklable_namespace(sandbox):
+    with pytest.raises(ValueError):
+        sandbox.run("pass", {"f": lambda: 1})
+    assert sandbox.run("print('alive')").ok
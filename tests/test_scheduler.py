@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from lib.helper_ollama.aio import gather_bounded
+from lib.helper_ollama.scheduler import RequestScheduler, current_priority, current_session, request_priority
+
+
+def start_waiting(scheduler, order, priority, session, label):
+    def run():
+        with scheduler.slot(priority, session):
+            order.append(label)
+
+    t = threading.Thread(target=run)
+    t.start()
+    time.sleep(0.02)
+    return t
+
+
+def test_interactive_requests_jump_ahead_of_queued_bulk_work():
+    scheduler = RequestScheduler(limit=1)
+    scheduler.acquire("standard", "x")
+    order = []
+    threads = [start_waiting(scheduler, order, "bulk", "job", f"bulk{i}") for i in range(3)]
+    threads.append(start_waiting(scheduler, order, "interactive", "chat", "chat"))
+
+    assert scheduler.stats()["classes"]["bulk"]["queued"] == 3
+    scheduler.release("standard")
+    for t in threads:
+        t.join(2)
+
+    assert order == ["chat", "bulk0", "bulk1", "bulk2"]
+    stats = scheduler.stats()
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+    assert stats["classes"]["bulk"]["wait_max"] > 0
+
+
+def test_bulk_never_takes_the_last_slot():
+    scheduler = RequestScheduler(limit=2)
+    scheduler.acquire("bulk", "job")
+    with pytest.raises(TimeoutError):
+        scheduler.acquire("bulk", "job", timeout=0.05)
+    scheduler.acquire("interactive", "chat", timeout=0.05)
+    assert scheduler.stats()["queued"] == 0
+
+
+def test_sessions_take_turns_within_a_class():
+    scheduler = RequestScheduler(limit=1)
+    scheduler.acquire("standard", "x")
+    order = []
+    threads = [start_waiting(scheduler, order, "standard", "big", f"big{i}") for i in range(3)]
+    threads.append(start_waiting(scheduler, order, "standard", "small", "small"))
+    scheduler.release("standard")
+    for t in threads:
+        t.join(2)
+
+    assert order.index("small") < order.index("big1")
+
+
+def test_async_acquire_and_context_priority():
+    scheduler = RequestScheduler(limit=1)
+
+    async def main():
+        with request_priority("bulk", session="job"):
+            assert current_priority() == ("bulk", "job")
+        async with scheduler.aslot("interactive"):
+            waiter = asyncio.ensure_future(scheduler.acquire_async("standard"))
+            await asyncio.sleep(0.01)
+            assert not waiter.done()
+            waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.stats()["in_flight"] == 0
+        assert scheduler.stats()["queued"] == 0
+
+    asyncio.run(main())
+    assert current_priority()[0] == "standard"
+
+
+def test_default_sessions_follow_threads_and_tasks():
+    main = current_session()
+    assert current_session() is main and current_priority()[1] is main
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(current_session()))
+    t.start()
+    t.join()
+    assert other[0] is not main
+
+    async def session():
+        await asyncio.sleep(0)
+        return current_session()
+
+    async def job():
+        # tasks started by one job share its session
+        return await gather_bounded([session() for _ in range(3)])
+
+    async def two_jobs():
+        return await asyncio.gather(asyncio.ensure_future(job()), asyncio.ensure_future(job()))
+
+    first, second = contextvars.Context().run(asyncio.run, two_jobs())
+    assert len(set(first)) == 1 and len(set(second)) == 1
+    assert first[0] is not second[0]
@@ -0,0 +1,21 @@
+from streamlit.testing.v1 import AppTest
+
+PAGE = '''
+import streamlit as st
+import lib.helper_streamlit as h
+
+calls = st.session_state.setdefault("preloaded", [])
+h.preload_model = calls.append
+h.models = lambda: ["gemma3:1b", "mistral"]
+h.add_select_model(key="model")
+'''
+
+
+def test_preload_only_when_the_selection_changes():
+    at = AppTest.from_string(PAGE).run()
+    at.run()
+    assert at.session_state["preloaded"] == []
+
+    at.selectbox[0].select("mistral").run()
+    at.run()
+    assert at.session_state["preloaded"] == ["mistral"]
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from lib.helper_ollama.singleflight import SingleFlight
+
+
+def test_concurrent_identical_streams_share_one_upstream_call():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def upstream():
+        calls.append(1)
+        release.wait(2)
+        for token in ["a", "b", "c"]:
+            yield token
+
+    iterators = [flights.stream("same", upstream) for _ in range(30)]
+    results = [None] * len(iterators)
+
+    def consume(i):
+        results[i] = "".join(iterators[i])
+
+    threads = [threading.Thread(target=consume, args=(i,)) for i in range(len(iterators))]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(2)
+
+    assert calls == [1]
+    assert results == ["abc"] * 30
+    assert flights.stats()["coalesced"] == 29
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_stream_errors_reach_every_subscriber():
+    flights = SingleFlight()
+
+    def upstream():
+        yield "a"
+        raise ConnectionError("ollama down")
+
+    first = flights.stream("k", upstream)
+    second = flights.stream("k", upstream)
+    for iterator in (first, second):
+        received = []
+        try:
+            for item in iterator:
+                received.append(item)
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("expected ConnectionError")
+        assert received == ["a"]
+
+
+def test_do_shares_blocking_result():
+    flights = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", slow))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(2)
+
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
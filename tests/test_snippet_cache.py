@@ -0,0 +1,106 @@
+import pytest
+
+from lib.helper_streamlit import snippets
+
+
+class FakeStreamlit:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args))
+
+
+@pytest.fixture
+def fake_st(monkeypatch):
+    fake = FakeStreamlit()
+    monkeypatch.setattr(snippets, "st", fake)
+    snippets.clear_snippet_cache()
+    yield fake
+    snippets.clear_snippet_cache()
+
+
+CODE = """
+print(text.upper())
+st.write("Stripped:", text.strip())
+shout = text.upper() + "!"
+"""
+
+
+def test_compiled_code_is_reused():
+    assert snippets.compile_snippet("x = 1") is snippets.compile_snippet("x = 1")
+
+
+def test_deterministic_snippet_is_replayed(fake_st, monkeypatch):
+    executed = []
+    real_exec = exec
+    monkeypatch.setattr(snippets, "exec", lambda code, ns: (executed.append(1), real_exec(code, ns)), raising=False)
+
+    first = snippets.execute_snippet(CODE, {"text": " hi "})
+    namespace = {"text": " hi "}
+    second = snippets.execute_snippet(CODE, namespace)
+
+    assert first == second == (" HI \n", "")
+    assert executed == [1]
+    assert fake_st.calls == [("write", ("Stripped:", "hi"))] * 2
+    assert namespace["shout"] == " HI !"
+
+
+def test_changed_inputs_run_again(fake_st):
+    assert snippets.execute_snippet("print(n * 2)", {"n": 1})[0] == "2\n"
+    assert snippets.execute_snippet("print(n * 2)", {"n": 2})[0] == "4\n"
+
+
+def test_widgets_and_mutations_are_not_cached(fake_st, monkeypatch):
+    executed = []
+    real_exec = exec
+    monkeypatch.setattr(snippets, "exec", lambda code, ns: (executed.append(1), real_exec(code, ns)), raising=False)
+
+    for _ in range(2):
+        snippets.execute_snippet("st.button('go')", {})
+        snippets.execute_snippet("items.append(1)", {"items": []})
+        snippets.execute_snippet("print(1)", {"obj": object()})
+        snippets.execute_snippet("print(1)", {}, cache=False)
+    assert len(executed) == 8
+
+
+def test_replayed_values_are_not_shared(fake_st):
+    first = {}
+    snippets.execute_snippet("words = ['a']", first)
+    second = {}
+    snippets.execute_snippet("words = ['a']", second)
+    third = {}
+    snippets.execute_snippet("words = ['a']", third)
+    second["words"].append("b")
+    assert third["words"] == ["a"]
+
+
+def test_snippets_with_imports_are_cached(fake_st):
+    for _ in range(2):
+        namespace = {}
+        out, _ = snippets.execute_snippet("import re\nprint(re.sub('a', 'b', 'aa'))", namespace)
+        assert out == "bb\n"
+        assert namespace["re"].__name__ == "re"
+    # a module nested in a container cannot be copied: the snippet just is not cached
+    for _ in range(2):
+        namespace = {}
+        snippets.execute_snippet("import re\nmods = [re]", namespace)
+        assert namespace["mods"][0].__name__ == "re"
+
+
+def test_string_page_replays_its_snippets_on_rerun(monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    executed = []
+    real_exec = exec
+    monkeypatch.setattr(snippets, "exec", lambda code, ns: (executed.append(1), real_exec(code, ns)), raising=False)
+    snippets.clear_snippet_cache()
+
+    at = AppTest.from_file("../views/100_🐍_Python/107_String_Manipulation.py").run()
+    first = [m.value for m in at.markdown]
+    assert len(executed) == 11 and any("Stripped:" in m for m in first)
+
+    at.run()
+    assert len(executed) == 11  # nothing executed again
+    assert [m.value for m in at.markdown] == first and not at.exception
+    snippets.clear_snippet_cache()
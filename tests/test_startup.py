@@ -0,0 +1,67 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from lib.lazy import lazy_exports, lazy_import
+from lib.startup import PageTiming, check_budget, parse_importtime
+
+ROOT = Path(__file__).parent.parent
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2500 |       3000 | lib.helpers
+--- starterapp page render ---
+"""
+
+
+def test_parse_importtime():
+    records = parse_importtime(SAMPLE)
+    assert [r.module for r in records] == ["_io", "lib.helpers"]
+    assert records[0].depth == 1 and records[1].depth == 0
+    assert records[1].self_s == 0.0025
+    assert records[1].cumulative_s == 0.003
+
+
+def test_lazy_import_defers_until_first_use():
+    name = "json.tool"
+    sys.modules.pop(name, None)
+    tool = lazy_import(name)
+    assert name not in sys.modules
+    assert callable(tool.main)
+    assert name in sys.modules
+
+    dumps = lazy_import("json", "dumps")
+    assert dumps([1]) == "[1]"
+
+
+def test_lazy_exports_caches_on_the_module():
+    module = type(sys)("lazy_test_module")
+    sys.modules[module.__name__] = module
+    try:
+        module.__getattr__ = lazy_exports(module.__name__, {"dumps": "json"})
+        assert module.dumps is __import__("json").dumps
+        assert "dumps" in vars(module)
+    finally:
+        del sys.modules[module.__name__]
+
+
+def test_importing_helpers_skips_heavy_packages():
+    code = (
+        "import sys, lib.helpers; "
+        "print(' '.join(m for m in ('ollama', 'httpx', 'pandas') if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == ""
+
+
+def test_check_budget():
+    pages = [
+        PageTiming("app.py", total_s=3.5),
+        PageTiming("views/slow.py", total_s=3.5),
+        PageTiming("views/broken.py", error="ModuleNotFoundError: No module named 'x'"),
+    ]
+    violations = check_budget(pages, startup_budget=4, page_budget=3)
+    assert len(violations) == 2
+    assert violations[0].startswith("views/slow.py: 3.50s")
+    assert "ModuleNotFoundError" in violations[1]
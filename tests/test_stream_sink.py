@@ -0,0 +1,44 @@
+from lib.helper_streamlit.streaming import StreamSink
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.frames = []
+
+    def markdown(self, body):
+        self.frames.append(body)
+
+
+def test_sink_throttles_repaints_and_flushes_final_text():
+    box = FakePlaceholder()
+    sink = StreamSink(box, fps=0.001)
+    for token in ["Hello", " ", "world", "!"] * 50:
+        sink.write(token)
+    text = sink.close()
+
+    assert text == "Hello world!" * 50
+    # one frame for the first token, one final flush without cursor
+    assert box.frames == ["Hello▌", text]
+
+
+def test_sink_repaints_every_n_tokens():
+    box = FakePlaceholder()
+    sink = StreamSink(box, fps=0.001, every=10)
+    sink.consume(str(i % 10) for i in range(35))
+
+    assert len(box.frames) == 5
+    assert box.frames[-1] == "".join(str(i % 10) for i in range(35))
+
+
+def test_sink_reports_ttft_and_rate():
+    sink = StreamSink(FakePlaceholder())
+    assert sink.stats()["ttft"] is None
+    sink.write("")
+    sink.write("a")
+    sink.write("b")
+    sink.close()
+
+    stats = sink.stats()
+    assert stats["tokens"] == 2
+    assert stats["ttft"] >= 0
+    assert stats["repaints"] >= 1
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from lib.helper_rag import VectorStore, normalize, top_k
+
+
+def brute_force(matrix, query, k):
+    scores = normalize(matrix) @ normalize(query)
+    return list(np.argsort(-scores, kind="stable")[:k])
+
+
+def test_top_k_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.normal(size=(3, 50)).astype(np.float32)
+    top = top_k(scores, 5)
+    for row, picks in zip(scores, top):
+        assert list(picks) == list(np.argsort(-row)[:5])
+    assert top_k(scores, 100).shape == (3, 50)
+
+
+def test_search_matches_brute_force_and_grows():
+    rng = np.random.default_rng(1)
+    data = rng.normal(size=(3000, 32)).astype(np.float32)
+    store = VectorStore(capacity=16)
+    for start in range(0, len(data), 250):
+        store.add(data[start:start + 250], documents=[f"doc {i}" for i in range(start, start + 250)])
+    assert len(store) == 3000
+
+    query = rng.normal(size=32)
+    hits = store.search(query, k=10)
+    assert [h.id for h in hits] == brute_force(data, query, 10)
+    assert hits[0].document == f"doc {hits[0].id}"
+    assert hits[0].score >= hits[-1].score
+
+    batch = store.search(data[:4], k=1)
+    assert [r[0].id for r in batch] == [0, 1, 2, 3]
+
+
+def test_filters_delete_and_compact():
+    rng = np.random.default_rng(2)
+    data = rng.normal(size=(100, 8)).astype(np.float32)
+    metadata = [{"lang": "de" if i % 2 else "en", "i": i} for i in range(100)]
+    store = VectorStore(compact_ratio=0.5)
+    ids = store.add(data, metadata=metadata)
+
+    hits = store.search(data[3], k=5, where={"lang": "de"})
+    assert hits[0].id == 3 and all(h.metadata["lang"] == "de" for h in hits)
+    hits = store.search(data[3], k=5, where=lambda m: m["i"] > 50)
+    assert all(h.metadata["i"] > 50 for h in hits)
+
+    assert store.delete(ids[:10]) == 10
+    assert store.get(ids[0]) is None
+    assert all(h.id >= 10 for h in store.search(data[0], k=20))
+    assert len(store) == 90 and store.vectors.shape == (90, 8)
+
+    store.delete(ids[10:60])  # crosses the compaction threshold
+    assert store._size == 40 and store._dead == 0
+    assert store.search(data[70], k=1)[0].id == 70
+    assert store.get(ids[70]).metadata["i"] == 70
+
+
+def test_dimension_mismatch():
+    store = VectorStore()
+    store.add(np.ones((2, 4)))
+    with pytest.raises(ValueError):
+        store.add(np.ones((1, 5)))
+    with pytest.raises(ValueError):
+        store.search(np.ones(5))
+
+
+def test_dict_filters_use_the_metadata_index():
+    store = VectorStore(compact_ratio=0.5)
+    ids = store.add(np.eye(6), metadata=[
+        {"lang": "en", "tags": ["a"]}, {"lang": "de"}, {"lang": "en", "n": 1},
+        {"lang": "en", "n": 1.0}, {}, {"lang": "de", "tags": ["b"]},
+    ])
+    found = lambda where: sorted(h.id for h in store.search(np.ones(6), k=6, where=where))  # noqa: E731
+
+    assert found({"lang": "en"}) == [0, 2, 3]
+    assert found({"lang": "en", "n": 1}) == [2, 3]
+    assert found({"lang": "fr"}) == []
+    assert found({"n": None}) == [0, 1, 4, 5]  # missing keys match None
+    assert found({"tags": ["b"]}) == [5]  # unhashable values fall back to a scan
+
+    store.delete([ids[0]])
+    assert found({"lang": "en"}) == [2, 3]
+    store.delete(ids[1:3])  # compacts and rebuilds the index
+    assert store._dead == 0 and found({"lang": "en"}) == [3]
+    new = store.add(np.eye(6)[:1], metadata=[{"lang": "en"}])
+    assert found({"lang": "en"}) == sorted([3, int(new[0])])
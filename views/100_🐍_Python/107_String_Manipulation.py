@@ -22,12 +22,15 @@ namespace = {
 # =================================================================================================
 # show_code(__file__)
 
+# The snippets only display fixed values, so reruns replay their recorded output.
+
 show_snippet(
     """
 st.write("Original:", repr(text))
 st.write("Stripped:", text.strip())
 """,
     namespace=namespace,
+    cache=True,
 )
 
 
@@ -38,6 +41,7 @@ st.write("Upper case:", text.upper())
 st.write("Title case:", text.title())
 """,
     namespace=namespace,
+    cache=True,
 )
 
 show_snippet(
@@ -46,9 +50,10 @@ st.write("message:", message)
 st.write("Replace:", message.replace("awesome", "amazing"))
 """,
     namespace=namespace,
+    cache=True,
 )
 
-show_snippet("""st.write("Split:", message.split())""", namespace=namespace)
+show_snippet("""st.write("Split:", message.split())""", namespace=namespace, cache=True)
 
 show_snippet(
     """
@@ -56,6 +61,7 @@ st.write("Starts with 'Python':", message.startswith("Python"))
 st.write("Contains 'is':", "is" in message)
 """,
     namespace=namespace,
+    cache=True,
 )
 
 
@@ -65,6 +71,7 @@ st.write("First 4 chars:", text[:4])
 st.write("Last 4 chars:", text[-4:])
 """,
     namespace=namespace,
+    cache=True,
 )
 
 
@@ -74,6 +81,7 @@ st.write("Every 2nd char:", text[::2])
 st.write("Reversed:", text[::-1])
 """,
     namespace=namespace,
+    cache=True,
 )
 
 show_snippet(
@@ -81,6 +89,7 @@ show_snippet(
 st.write("f-string:", f"Name: {name}, Age: {age}")
 """,
     namespace=namespace,
+    cache=True,
 )
 
 show_snippet(
@@ -88,6 +97,7 @@ show_snippet(
 st.write("format():", "Name: {}, Age: {}".format(name, age))
 """,
     namespace=namespace,
+    cache=True,
 )
 
 show_snippet(
@@ -95,6 +105,7 @@ show_snippet(
 st.write("%-formatting:", "Name: %s, Age: %d" % (name, age))
 """,
     namespace=namespace,
+    cache=True,
 )
 
 show_snippet(
@@ -103,4 +114,5 @@ sentence = " ".join(["Python", "is", "fun"])
 st.write("Joined:", sentence)
 """,
     namespace=namespace,
+    cache=True,
 )
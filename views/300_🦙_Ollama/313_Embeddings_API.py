@@ -180,43 +180,62 @@ if st.button("Calculate Similarity"):
 st.subheader("🗄️ Vector Database Integration")
 
 vector_db_code = """
-# Using a simple in-memory vector store
+import numpy as np
+from lib.helper_ollama import embed_many
+
+# A minimal in-memory vector store: one normalized float32 matrix,
+# so a search is a single matrix-vector product instead of a Python loop
 class VectorStore:
-    def __init__(self):
+    def __init__(self, model='nomic-embed-text'):
+        self.model = model
         self.documents = []
-        self.embeddings = []
-    
-    def add(self, text):
-        '''Add document to store'''
-        response = ollama.embeddings(model='gemma3:1b', prompt=text)
-        self.documents.append(text)
-        self.embeddings.append(response['embedding'])
-    
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+
+    def add(self, texts):
+        '''Embed texts in one batched request and append them'''
+        vectors = embed_many(self.model, texts)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.matrix = vectors if not self.documents else np.vstack([self.matrix, vectors])
+        self.documents.extend(texts)
+
     def search(self, query, top_k=5):
-        '''Search for similar documents'''
-        # Get query embedding
-        response = ollama.embeddings(model='gemma3:1b', prompt=query)
-        query_emb = response['embedding']
-        
-        # Calculate similarities
-        results = []
-        for i, doc_emb in enumerate(self.embeddings):
-            sim = cosine_similarity(query_emb, doc_emb)
-            results.append((sim, self.documents[i]))
-        
-        # Sort and return top k
-        results.sort(reverse=True)
-        return results[:top_k]
+        '''Return the top_k most similar documents'''
+        q = embed_many(self.model, [query])[0]
+        scores = self.matrix @ (q / np.linalg.norm(q))        # cosine similarity
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]    # O(n), no full sort
+        best = best[np.argsort(-scores[best])]
+        return [(float(scores[i]), self.documents[i]) for i in best]
 
 # Usage
 store = VectorStore()
-store.add("Python is great for data science")
-store.add("JavaScript is used for web development")
-store.add("Machine learning models need training data")
+store.add([
+    "Python is great for data science",
+    "JavaScript is used for web development",
+    "Machine learning models need training data",
+])
 
 results = store.search("data analysis tools")
 for score, doc in results:
     print(f"{score:.4f}: {doc}")
+
+# For larger collections use lib.helper_rag.VectorStore: amortized appends,
+# batched queries, metadata filters and deletes
+from lib.helper_rag import VectorStore as FastStore
+
+docs = [
+    "How do I reset my password?",
+    "Which payment methods do you accept?",
+    "Python is great for data science",
+]
+sources = [{"source": "faq"}, {"source": "faq"}, {"source": "blog"}]
+query = "I forgot my login"
+
+store = FastStore()
+store.add(embed_many('nomic-embed-text', docs), documents=docs, metadata=sources)
+hits = store.search(embed_many('nomic-embed-text', [query])[0], k=5, where={"source": "faq"})
+for hit in hits:
+    print(f"{hit.score:.4f}: {hit.document}")
 """
 
 st.code(vector_db_code, language="python")
@@ -260,6 +279,28 @@ embedding = get_embedding_cached("My text")
 
 st.code(caching_code, language="python")
 
+st.write("""
+A pickle of Python lists works for a few hundred texts. For a large corpus it
+costs several GB of RAM in every process that loads it. Store the matrix as a
+memory-mapped file instead; int8 codes are a quarter of the float32 size:
+""")
+
+memmap_code = """
+from lib.helper_ollama import embed_many
+from lib.helper_rag import open_embeddings, write_embeddings
+
+# Once: int8 codes for scanning + a float32 copy for rescoring the best hits
+write_embeddings('.cache/rag/pdfs', embed_many('nomic-embed-text', chunks), dtype='int8')
+
+# Every process: opening maps the files, nothing is loaded yet;
+# all workers share the same pages through the OS page cache
+vectors = open_embeddings('.cache/rag/pdfs')
+rows, scores = vectors.search(embed_many('nomic-embed-text', [question])[0], k=5)
+context = [chunks[i] for i in rows]
+"""
+
+st.code(memmap_code, language="python")
+
 # Best practices
 st.subheader("💡 Best Practices")
 
@@ -302,10 +343,11 @@ st.info("Some models are specifically designed for embeddings and may perform be
 st.subheader("📋 Complete Example: Document Clustering")
 
 clustering_code = """
-import ollama
 import numpy as np
 from sklearn.cluster import KMeans
 
+from lib.helper_ollama import embed_many
+
 # Documents to cluster
 docs = [
     "Python programming tutorial",
@@ -316,14 +358,9 @@ docs = [
     "Neural networks explained"
 ]
 
-# Generate embeddings
-embeddings = []
-for doc in docs:
-    response = ollama.embeddings(model='gemma3:1b', prompt=doc)
-    embeddings.append(response['embedding'])
-
-# Convert to numpy array
-X = np.array(embeddings)
+# Generate all embeddings with one batched /api/embed request
+# (float32 matrix, one row per document)
+X = embed_many('nomic-embed-text', docs)
 
 # Cluster into 2 groups
 kmeans = KMeans(n_clusters=2, random_state=42)
@@ -1,5 +1,8 @@
+import pandas as pd
 import streamlit as st
 
+from lib.helper_ollama import benchmark, get_available_models
+
 st.header("⚖️ Model Comparison — Ollama Basics")
 st.markdown("Comparing different Ollama models for various tasks.")
 
@@ -23,7 +26,6 @@ models_table = {
     "Best For": ["General", "General", "Chat", "Code", "Quick tasks", "General"]
 }
 
-import pandas as pd
 df = pd.DataFrame(models_table)
 st.dataframe(df, width='stretch', hide_index=True)
 
@@ -93,19 +95,61 @@ with st.expander("💎 Gemma (7B)"):
 # Performance comparison
 st.subheader("⚡ Performance Metrics")
 
-st.write("**Approximate Response Times (for ~100 token response):**")
-
-perf_data = {
-    "Model": ["phi", "mistral", "gemma", "gemma3:1b", "llama3", "codellama"],
-    "Speed (tokens/sec)": [40, 30, 25, 20, 18, 20],
-    "RAM Usage (GB)": [2, 4, 4, 4, 5, 4]
-}
-
-perf_df = pd.DataFrame(perf_data)
-st.bar_chart(perf_df.set_index("Model")["Speed (tokens/sec)"])
+st.write("""
+Speed depends on your hardware, so these numbers are measured on this machine:
+time to first token, generation speed (tokens/s reported by Ollama), latency
+percentiles and memory, for each model and number of parallel requests.
+""")
 
-st.write("**RAM Usage:**")
-st.bar_chart(perf_df.set_index("Model")["RAM Usage (GB)"])
+with st.expander("🧪 Run benchmark", expanded=benchmark.latest_results() is None):
+    bench_models = st.multiselect("Models", get_available_models(), key="bench_models")
+    bench_levels = st.multiselect("Parallel requests", [1, 2, 4, 8], default=[1, 2], key="bench_levels")
+    bench_repeats = st.slider("Repeats per prompt", 1, 5, 2, key="bench_repeats")
+
+    if st.button("▶️ Start benchmark", disabled=not (bench_models and bench_levels)):
+        progress = st.progress(0.0, text="Loading models...")
+
+        def on_sample(sample, done, total):
+            progress.progress(done / total, text=f"{sample.model} · {sample.concurrency} parallel · {done}/{total}")
+
+        result = benchmark.run_benchmark(
+            bench_models, concurrency=bench_levels, repeats=bench_repeats, on_sample=on_sample
+        )
+        path = benchmark.save_results(result)
+        progress.empty()
+        st.success(f"Saved {path.name}")
+
+saved = benchmark.list_results()
+if not saved:
+    st.info("No benchmark results yet. Run a benchmark above or from the command line: "
+            "`python -m lib.helper_ollama.benchmark gemma3:1b mistral`")
+else:
+    chosen = st.selectbox("Results", saved, format_func=lambda p: p.stem, key="bench_file")
+    perf_df = pd.DataFrame(benchmark.load_results(chosen).summary())
+
+    # one row per model: its lowest concurrency level, NaN where all requests failed
+    lowest = perf_df.groupby("model")["concurrency"].transform("min")
+    single = perf_df[perf_df["concurrency"] == lowest].set_index("model")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Generation speed (tokens/s, 1 request):**")
+        st.bar_chart(single["tokens_per_s"])
+    with col2:
+        st.write("**Time to first token (p50, seconds):**")
+        st.bar_chart(single["ttft_p50"])
+
+    st.write("**Latency p95 by parallel requests (seconds):**")
+    st.line_chart(perf_df.pivot(index="concurrency", columns="model", values="latency_p95"))
+
+    st.write("**Throughput by parallel requests (tokens/s, all requests together):**")
+    st.line_chart(perf_df.pivot(index="concurrency", columns="model", values="throughput_tokens_per_s"))
+
+    if single["memory_gb"].notna().any():
+        st.write("**Memory when loaded (GB):**")
+        st.bar_chart(single["memory_gb"])
+
+    st.dataframe(perf_df, width='stretch', hide_index=True)
 
 # Quality comparison
 st.subheader("🎯 Quality Comparison")
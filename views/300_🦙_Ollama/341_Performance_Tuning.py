@@ -277,35 +277,26 @@ st.code(caching_code, language="python")
 st.subheader("📊 Monitoring Performance")
 
 monitoring_code = """
-import time
-import ollama
+from lib.helper_ollama.benchmark import run_benchmark, save_results
+
+# Each request is streamed, so the harness sees the first token and the
+# server's own timings (eval_count / eval_duration) instead of split() counts.
+result = run_benchmark(
+    ["phi", "gemma3:1b"],
+    prompts={"one_sentence": "Explain Python in one sentence"},
+    concurrency=[1, 2, 4],
+    repeats=5,
+)
+
+for row in result.summary():
+    print(
+        f"{row['model']:>10} x{row['concurrency']}: "
+        f"TTFT p50 {row['ttft_p50']:.2f}s, "
+        f"{row['tokens_per_s']:.1f} tokens/s, "
+        f"latency p95 {row['latency_p95']:.2f}s"
+    )
 
-def benchmark_model(model, prompt, iterations=5):
-    '''Benchmark model performance'''
-    
-    times = []
-    
-    for i in range(iterations):
-        start = time.time()
-        
-        response = ollama.generate(
-            model=model,
-            prompt=prompt
-        )
-        
-        elapsed = time.time() - start
-        times.append(elapsed)
-        
-        tokens = len(response['response'].split())
-        print(f"Run {i+1}: {elapsed:.2f}s ({tokens} tokens)")
-    
-    avg = sum(times) / len(times)
-    print(f"\\nAverage: {avg:.2f}s")
-    return avg
-
-# Compare models
-benchmark_model('phi', 'Explain Python in one sentence')
-benchmark_model('gemma3:1b', 'Explain Python in one sentence')
+save_results(result)  # JSON + CSV, shown on the Model Comparison page
 """
 
 st.code(monitoring_code, language="python")
@@ -99,6 +99,30 @@ print(f"Average per request: {elapsed/len(prompts):.2f}s")
 
 st.code(parallel_code, language="python")
 
+st.write("**Async alternative: many requests in flight from one thread**")
+async_code = """
+from lib.helper_ollama import agenerate, gather_bounded, request_priority, run_async
+
+prompts = [f"Question {i}" for i in range(100)]
+
+# One shared connection pool, at most 16 requests in flight,
+# remaining requests are cancelled if one fails or the timeout expires.
+# As "bulk" work the batch waits whenever chat users need a server slot.
+with request_priority("bulk", session="question-batch"):
+    results = run_async(
+        gather_bounded(
+            [agenerate('gemma3:1b', prompt) for prompt in prompts],
+            limit=16,
+            timeout=600,
+        )
+    )
+
+for result in results:
+    print(result['response'][:100])
+"""
+
+st.code(async_code, language="python")
+
 # Progress tracking
 st.subheader("📊 Progress Tracking")
 
@@ -251,40 +275,37 @@ st.subheader("📄 Processing CSV Data")
 
 csv_processing = """
 import pandas as pd
-import ollama
-from tqdm import tqdm
+from lib.helper_ollama.dataframe import llm_apply
 
 # Load data
 df = pd.read_csv('reviews.csv')
 
-def analyze_sentiment(text):
-    '''Analyze sentiment of text'''
-    prompt = f'''
+# One request per *distinct* review text, 8 in parallel. Answers from
+# earlier runs come from the response cache, so rerunning costs nothing.
+df['sentiment'] = llm_apply(
+    df,
+    'review_text',
+    '''
     Analyze the sentiment of this review.
     Respond with only: Positive, Negative, or Neutral
-    
-    Review: {text}
-    
-    Sentiment:
-    '''
-    
-    response = ollama.generate(
-        model='gemma3:1b',
-        prompt=prompt,
-        options={'num_predict': 10}
-    )
-    
-    return response['response'].strip()
 
-# Process all reviews
-tqdm.pandas(desc="Analyzing sentiment")
-df['sentiment'] = df['review_text'].progress_apply(analyze_sentiment)
+    Review: {value}
+
+    Sentiment:
+    ''',
+    model='gemma3:1b',
+    options={'num_predict': 10},
+    concurrency=8,
+    on_progress=lambda done, total, cached: print(f"{done}/{total} ({cached} cached)"),
+)
 
 # Save results
 df.to_csv('reviews_with_sentiment.csv', index=False)
 
 print("\\nSentiment distribution:")
 print(df['sentiment'].value_counts())
+
+# In a Streamlit page, lib.helper_streamlit.llm_apply shows a progress bar instead
 """
 
 st.code(csv_processing, language="python")
@@ -292,32 +313,33 @@ st.code(csv_processing, language="python")
 # Optimization strategies
 st.subheader("🎯 Batch Optimization Strategies")
 
-st.write("**1. Optimal Batch Size**")
+st.write("**1. Adaptive Concurrency and Checkpoints**")
+st.write("""
+Instead of sweeping batch sizes by hand, `lib.helper_ollama.batch` adjusts the number
+of parallel requests while it runs: it adds one request after each healthy round and
+halves on errors or rising latency (AIMD). Results are appended to a JSONL file as they
+complete, and a checkpoint lets a crashed run continue where it stopped.
+""")
 st.code("""
-# Find optimal batch size for your system
-def find_optimal_batch_size(prompts, sizes=[1, 2, 4, 8, 16]):
-    '''Test different batch sizes'''
-    
-    results = {}
-    
-    for size in sizes:
-        start = time.time()
-        
-        with ThreadPoolExecutor(max_workers=size) as executor:
-            futures = [
-                executor.submit(process_single, p) 
-                for p in prompts[:20]  # Test with 20 prompts
-            ]
-            list(as_completed(futures))
-        
-        elapsed = time.time() - start
-        results[size] = elapsed
-        print(f"Batch size {size}: {elapsed:.2f}s")
-    
-    optimal = min(results, key=results.get)
-    print(f"\\nOptimal batch size: {optimal}")
-    return optimal
+from lib.helper_ollama.batch import run_batch
+
+# prompts.jsonl: {"id": "r1", "review_text": "..."} per line
+stats = run_batch(
+    "prompts.jsonl",
+    "sentiment.jsonl",             # appended to; rerun the same call to resume
+    model="gemma3:1b",
+    template="Sentiment of this review (positive/negative/neutral): {review_text}",
+    options={"temperature": 0},
+    retries=3,                     # exponential backoff between attempts
+    on_progress=lambda s: print(s["done"], s["concurrency"]),
+)
+print(stats)  # {'done': ..., 'failed': ..., 'skipped': ..., 'concurrency': ...}
 """, language="python")
+st.code("""
+# Same from the shell (Ctrl+C and rerun to resume)
+python -m lib.helper_ollama.batch prompts.jsonl sentiment.jsonl --model gemma3:1b \\
+    --template "Sentiment of this review: {review_text}" --temperature 0
+""", language="bash")
 
 st.write("**2. Chunking Large Batches**")
 st.code("""
@@ -1,5 +1,6 @@
 import streamlit as st
-from lib.helper_streamlit import add_select_model
+from lib.helper_streamlit import StreamSink, add_select_model
+from lib.helper_ollama import chat, check_ollama_status, generate
 
 st.set_page_config(page_title="10 Steps: Ollama Basics & Features", page_icon="🦙", layout="wide")
 
@@ -47,16 +48,13 @@ with tabs[0]:
         
         st.markdown("**6. Test Connection:**")
         if st.button("Test Ollama Connection", key="test_connection"):
-            try:
-                import ollama
-                models = ollama.list()
-                st.success(f"✅ Ollama is running! Found {len(models.get('models', []))} model(s)")
-                for model in models.get('models', []):
-                    st.write(f"- {model.get('name', 'unknown')}")
-            except ImportError:
-                st.error("❌ Ollama Python SDK not installed. Run: pip install ollama")
-            except Exception as e:
-                st.error(f"❌ Connection error: {str(e)}")
+            status = check_ollama_status()
+            if status['status'] == 'success':
+                st.success(f"✅ Ollama is running! Found {len(status['models'])} model(s)")
+                for model in status['models']:
+                    st.write(f"- {model.model}")
+            else:
+                st.error(f"❌ {status['message']}")
                 st.info("Make sure Ollama is running in the background.")
     
     with col2:
@@ -105,9 +103,8 @@ with tabs[1]:
         if st.button("Generate", key="basic_generate"):
             with st.spinner("Generating..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt=prompt_basic
                     )
                     st.success("✅ Generated!")
@@ -159,22 +156,20 @@ with tabs[2]:
         if st.button("Generate with Streaming", key="stream_generate"):
             st.markdown("**Streaming Response:**")
             response_placeholder = st.empty()
-            full_response = ""
             
             try:
-                import ollama
-                stream = ollama.generate(
-                    model='llama2',
+                stream = generate(
+                    model_name='llama2',
                     prompt=prompt_stream,
                     stream=True
                 )
                 
+                sink = StreamSink(response_placeholder)
                 for chunk in stream:
                     if 'response' in chunk:
-                        full_response += chunk['response']
-                        response_placeholder.markdown(full_response + "▌")
+                        sink.write(chunk['response'])
                 
-                response_placeholder.markdown(full_response)
+                sink.close()
                 st.success("✅ Streaming complete!")
             except ImportError:
                 st.error("❌ Ollama not installed")
@@ -303,9 +298,8 @@ with tabs[4]:
         if st.button("Generate with Parameters", key="param_generate"):
             with st.spinner("Generating..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt=param_prompt,
                         options={
                             'temperature': temperature,
@@ -386,9 +380,8 @@ with tabs[5]:
         if st.button("Chat with System Message", key="system_generate"):
             with st.spinner("Generating..."):
                 try:
-                    import ollama
-                    response = ollama.chat(
-                        model='llama2',
+                    response = chat(
+                        model_name='llama2',
                         messages=[
                             {
                                 'role': 'system',
@@ -470,9 +463,8 @@ with tabs[6]:
         with col_a:
             if st.button("Send (with context)", key="with_context"):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt=context_prompt,
                         context=st.session_state.context
                     )
@@ -551,9 +543,8 @@ with tabs[7]:
                 })
                 
                 try:
-                    import ollama
-                    response = ollama.chat(
-                        model='llama2',
+                    response = chat(
+                        model_name='llama2',
                         messages=st.session_state.chat_history
                     )
                     
@@ -633,11 +624,10 @@ with tabs[8]:
         st.markdown("### Test Error Handling:")
         if st.button("Test Error Handling", key="test_error"):
             try:
-                import ollama
                 # Try to use non-existent model
                 try:
-                    response = ollama.generate(
-                        model='nonexistent_model',
+                    response = generate(
+                        model_name='nonexistent_model',
                         prompt='test'
                     )
                 except Exception as e:
@@ -645,8 +635,8 @@ with tabs[8]:
                     st.info("Using fallback model...")
                     
                     # Fallback to default model
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt='Say hello'
                     )
                     st.success(f"✅ Fallback successful: {response['response']}")
@@ -748,7 +738,6 @@ with tabs[9]:
                 st.warning("Please enter a prompt")
             else:
                 try:
-                    import ollama
                     
                     # Adjust system message based on task
                     task_systems = {
@@ -773,25 +762,24 @@ with tabs[9]:
                     
                     if use_streaming:
                         response_placeholder = st.empty()
-                        full_response = ""
                         
-                        stream = ollama.chat(
-                            model=selected_model,
+                        stream = chat(
+                            model_name=selected_model,
                             messages=messages,
                             stream=True,
                             options={'temperature': temp_setting}
                         )
                         
+                        sink = StreamSink(response_placeholder)
                         for chunk in stream:
                             if 'message' in chunk and 'content' in chunk['message']:
-                                full_response += chunk['message']['content']
-                                response_placeholder.markdown(full_response + "▌")
+                                sink.write(chunk['message']['content'])
                         
-                        response_placeholder.markdown(full_response)
+                        sink.close()
                     else:
                         with st.spinner(f"Generating with {selected_model}..."):
-                            response = ollama.chat(
-                                model=selected_model,
+                            response = chat(
+                                model_name=selected_model,
                                 messages=messages,
                                 options={'temperature': temp_setting}
                             )
@@ -1,7 +1,7 @@
 import streamlit as st
-import ollama
 
-from lib.helper_streamlit import add_select_model
+from lib.helper_ollama import chat, delete_model, generate, get_model_registry, pull_model, show_model
+from lib.helper_streamlit import StreamSink, add_select_model
 
 st.set_page_config(page_title="10 Steps: Ollama Mini Apps", page_icon="🚀", layout="wide")
 
@@ -54,30 +54,30 @@ with tabs[get_tab_index(TAB_MODEL_MANAGEMENT)]:
         
         # List models
         try:
-            models = ollama.list()
+            models = get_model_registry().models()
             
-            if models and 'models' in models:
+            if models:
                 st.markdown("**Available Models:**")
-                for model in models['models']:
-                    with st.expander(f"📦 {model['model']}"):
+                for model in models:
+                    with st.expander(f"📦 {model['name']}"):
                         st.write(f"**Size:** {model.get('size', 'N/A')}")
                         st.write(f"**Modified:** {model.get('modified_at', 'N/A')}")
                         
                         col_info, col_del = st.columns(2)
                         
                         with col_info:
-                            if st.button("ℹ️ Info", key=f"info_{model['model']}"):
+                            if st.button("ℹ️ Info", key=f"info_{model['name']}"):
                                 try:
-                                    info = ollama.show(model['model'])
-                                    st.json(info)
+                                    info = show_model(model['name'])
+                                    st.json(info.model_dump(mode='json'))
                                 except Exception as e:
                                     st.error(f"Error: {str(e)}")
                         
                         with col_del:
-                            if st.button("🗑️ Delete", key=f"del_{model['model']}"):
+                            if st.button("🗑️ Delete", key=f"del_{model['name']}"):
                                 try:
-                                    ollama.delete(model['model'])
-                                    st.success(f"Deleted {model['model']}")
+                                    delete_model(model['name'])
+                                    st.success(f"Deleted {model['name']}")
                                     st.rerun()
                                 except Exception as e:
                                     st.error(f"Error: {str(e)}")
@@ -95,7 +95,7 @@ with tabs[get_tab_index(TAB_MODEL_MANAGEMENT)]:
             if model_to_pull:
                 with st.spinner(f"Pulling {model_to_pull}..."):
                     try:
-                        ollama.pull(model_to_pull)
+                        pull_model(model_to_pull)
                         st.success(f"Successfully pulled {model_to_pull}")
                         st.rerun()
                     except Exception as e:
@@ -180,9 +180,8 @@ with tabs[get_tab_index(TAB_CHAT_BASICS)]:
             
             # Generate response
             try:
-                import ollama
-                response = ollama.chat(
-                    model=selected_model,
+                response = chat(
+                    model_name=selected_model,
                     messages=st.session_state.step1_messages
                 )
                 
@@ -278,9 +277,8 @@ with tabs[get_tab_index(TAB_MESSAGE_HISTORY)]:
                 st.session_state.step2_messages = st.session_state.step2_messages[-max_history:]
             
             try:
-                import ollama
-                response = ollama.chat(
-                    model=selected_model,
+                response = chat(
+                    model_name=selected_model,
                     messages=st.session_state.step2_messages
                 )
                 
@@ -374,22 +372,20 @@ with tabs[get_tab_index(TAB_STREAM_CHAT)]:
             # Stream assistant response
             with st.chat_message("assistant"):
                 message_placeholder = st.empty()
-                full_response = ""
                 
                 try:
-                    import ollama
-                    stream = ollama.chat(
-                        model=selected_model,
+                    stream = chat(
+                        model_name=selected_model,
                         messages=st.session_state.step3_messages,
                         stream=True
                     )
                     
+                    sink = StreamSink(message_placeholder)
                     for chunk in stream:
                         if 'message' in chunk and 'content' in chunk['message']:
-                            full_response += chunk['message']['content']
-                            message_placeholder.markdown(full_response + "▌")
+                            sink.write(chunk['message']['content'])
                     
-                    message_placeholder.markdown(full_response)
+                    full_response = sink.close()
                     
                     # Save response
                     st.session_state.step3_messages.append({
@@ -490,9 +486,8 @@ with tabs[get_tab_index(TAB_TEXT_GENERATOR)]:
             if final_prompt:
                 with st.spinner(f"Generating with {gen_model}..."):
                     try:
-                        import ollama
-                        response = ollama.generate(
-                            model=gen_model,
+                        response = generate(
+                            model_name=gen_model,
                             prompt=final_prompt,
                             options={
                                 'temperature': gen_temp,
@@ -597,23 +592,21 @@ with tabs[get_tab_index(TAB_CREATIVE_WRITING)]:
             
             st.markdown("### Generated Content:")
             placeholder = st.empty()
-            full_text = ""
             
             try:
-                import ollama
-                stream = ollama.generate(
-                    model=selected_model,
+                stream = generate(
+                    model_name=selected_model,
                     prompt=prompt,
                     options={'temperature': 0.9},  # High creativity
                     stream=True
                 )
                 
+                sink = StreamSink(placeholder)
                 for chunk in stream:
                     if 'response' in chunk:
-                        full_text += chunk['response']
-                        placeholder.markdown(full_text + "▌")
+                        sink.write(chunk['response'])
                 
-                placeholder.markdown(full_text)
+                sink.close()
                 st.success("✅ Creation complete!")
             except Exception as e:
                 st.error(f"Error: {str(e)}")
@@ -712,9 +705,8 @@ with tabs[get_tab_index(TAB_TEXT_ANALYZER)]:
                 
                 with st.spinner("Analyzing..."):
                     try:
-                        import ollama
-                        response = ollama.generate(
-                            model=selected_model,
+                        response = generate(
+                            model_name=selected_model,
                             prompt=prompts[analysis_type],
                             options={'temperature': 0.3}  # Low for factual
                         )
@@ -826,9 +818,8 @@ with tabs[get_tab_index(TAB_SUMMARIZATION)]:
             
             with st.spinner(f"Summarizing using {selected_model}..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model=selected_model,
+                    response = generate(
+                        model_name=selected_model,
                         prompt=prompt,
                         options={'temperature': 0.3}
                     )
@@ -926,9 +917,8 @@ with tabs[get_tab_index(TAB_SENTIMENT)]:
             
             with st.spinner("Analyzing sentiment..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model=selected_model,
+                    response = generate(
+                        model_name=selected_model,
                         prompt=prompt,
                         options={'temperature': 0.2}
                     )
@@ -1012,9 +1002,8 @@ with tabs[get_tab_index(TAB_KEY_POINTS)]:
             
             with st.spinner("Extracting key points..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model=selected_model,
+                    response = generate(
+                        model_name=selected_model,
                         prompt=prompt,
                         options={'temperature': 0.2}
                     )
@@ -1115,22 +1104,20 @@ with tabs[get_tab_index(TAB_FULL_APPS)]:
             # Stream response
             with st.chat_message("assistant"):
                 placeholder = st.empty()
-                full_response = ""
                 
                 try:
-                    import ollama
-                    stream = ollama.chat(
-                        model=chat_model,
+                    stream = chat(
+                        model_name=chat_model,
                         messages=messages,
                         stream=True
                     )
                     
+                    sink = StreamSink(placeholder)
                     for chunk in stream:
                         if 'message' in chunk and 'content' in chunk['message']:
-                            full_response += chunk['message']['content']
-                            placeholder.markdown(full_response + "▌")
+                            sink.write(chunk['message']['content'])
                     
-                    placeholder.markdown(full_response)
+                    full_response = sink.close()
                     
                     st.session_state.final_chat_messages.append({
                         "role": "assistant",
@@ -1170,9 +1157,8 @@ with tabs[get_tab_index(TAB_FULL_APPS)]:
                 if gen_prompt_final:
                     with st.spinner("Generating..."):
                         try:
-                            import ollama
-                            response = ollama.generate(
-                                model=selected_model,
+                            response = generate(
+                                model_name=selected_model,
                                 prompt=gen_prompt_final,
                                 options={'temperature': gen_temp_final}
                             )
@@ -1213,9 +1199,8 @@ with tabs[get_tab_index(TAB_FULL_APPS)]:
                 if analyze_text_final:
                     with st.spinner("Summarizing..."):
                         try:
-                            import ollama
-                            response = ollama.generate(
-                                model=selected_model,
+                            response = generate(
+                                model_name=selected_model,
                                 prompt=f"Summarize this text concisely:\n\n{analyze_text_final}",
                                 options={'temperature': 0.3}
                             )
@@ -1229,9 +1214,8 @@ with tabs[get_tab_index(TAB_FULL_APPS)]:
                 if analyze_text_final:
                     with st.spinner("Analyzing..."):
                         try:
-                            import ollama
-                            response = ollama.generate(
-                                model=selected_model,
+                            response = generate(
+                                model_name=selected_model,
                                 prompt=f"Identify the sentiment (Positive/Negative/Neutral) of this text:\n\n{analyze_text_final}",
                                 options={'temperature': 0.2}
                             )
@@ -1245,10 +1229,9 @@ with tabs[get_tab_index(TAB_FULL_APPS)]:
                 if analyze_text_final:
                     with st.spinner("Extracting..."):
                         try:
-                            import ollama
                             import streamlit as st
-                            response = ollama.generate(
-                                model=selected_model,
+                            response = generate(
+                                model_name=selected_model,
                                 prompt=f"Extract 5 key points from this text:\n\n{analyze_text_final}",
                                 options={'temperature': 0.2}
                             )
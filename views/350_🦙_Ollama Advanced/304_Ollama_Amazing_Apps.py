@@ -1,6 +1,9 @@
 import streamlit as st
 import json
 
+from lib.helper_streamlit import StreamSink
+from lib.helper_ollama import generate
+
 st.set_page_config(page_title="10 Steps: Ollama Amazing Apps", page_icon="⭐", layout="wide")
 
 st.title("⭐ 10 Steps: Ollama Amazing Small Apps")
@@ -58,9 +61,8 @@ with tabs[0]:
             
             with st.spinner(f"Generating {code_lang} code..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='codellama',  # Best for code
+                    response = generate(
+                        model_name='codellama',  # Best for code
                         prompt=prompt,
                         options={'temperature': 0.2}  # Low for accuracy
                     )
@@ -171,9 +173,8 @@ with tabs[1]:
             
             with st.spinner("Analyzing code..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='codellama',
+                    response = generate(
+                        model_name='codellama',
                         prompt=prompt,
                         options={'temperature': 0.3}
                     )
@@ -276,9 +277,8 @@ with tabs[2]:
             
             with st.spinner("Translating..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt=prompt,
                         options={'temperature': 0.3}
                     )
@@ -289,8 +289,8 @@ with tabs[2]:
                     # Back-translation for verification
                     if st.checkbox("Show back-translation (verify accuracy)", key="back_trans"):
                         back_prompt = f"Translate this {to_lang} text back to {from_lang}:\n\n{response['response']}"
-                        back_response = ollama.generate(
-                            model='llama2',
+                        back_response = generate(
+                            model_name='llama2',
                             prompt=back_prompt,
                             options={'temperature': 0.3}
                         )
@@ -400,23 +400,21 @@ with tabs[3]:
             
             st.markdown("### Your Story:")
             placeholder = st.empty()
-            full_story = ""
             
             try:
-                import ollama
-                stream = ollama.generate(
-                    model='llama2',
+                stream = generate(
+                    model_name='llama2',
                     prompt=prompt,
                     options={'temperature': 0.9},  # High creativity
                     stream=True
                 )
                 
+                sink = StreamSink(placeholder)
                 for chunk in stream:
                     if 'response' in chunk:
-                        full_story += chunk['response']
-                        placeholder.markdown(full_story + "▌")
+                        sink.write(chunk['response'])
                 
-                placeholder.markdown(full_story)
+                full_story = sink.close()
                 
                 # Download option
                 st.download_button(
@@ -529,9 +527,8 @@ The email should be clear, concise, and professional."""
             
             with st.spinner("Composing email..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt=prompt,
                         options={'temperature': 0.4}
                     )
@@ -653,9 +650,8 @@ Be specific and constructive in your feedback."""
             
             with st.spinner("Analyzing resume..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt=prompt,
                         options={'temperature': 0.3}
                     )
@@ -768,9 +764,8 @@ Action Items:
             
             with st.spinner("Summarizing meeting..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt=prompt,
                         options={'temperature': 0.2}
                     )
@@ -906,9 +901,8 @@ Answer:"""
             
             with st.spinner("Finding answer..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt=prompt,
                         options={'temperature': 0.2}
                     )
@@ -1026,9 +1020,8 @@ Description: {description}
             
             with st.spinner("Generating creative names..."):
                 try:
-                    import ollama
-                    response = ollama.generate(
-                        model='llama2',
+                    response = generate(
+                        model_name='llama2',
                         prompt=prompt,
                         options={'temperature': 0.8}  # Creative
                     )
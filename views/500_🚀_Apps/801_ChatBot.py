@@ -1,6 +1,7 @@
 import streamlit as st
 
 from lib import helper_streamlit
+from lib.helper_streamlit import StreamSink
 from lib.helper_chat import utils
 
 import lib.helper_text.generator as text_generator
@@ -62,8 +63,7 @@ if prompt := st.chat_input("Type your message..."):
     
     # Generate assistant response
     with st.chat_message("assistant"):
-        message_placeholder = st.empty()
-        full_response = ""
+        sink = StreamSink(st.empty())
         
         # Prepare messages
         messages = utils.prepare_chat_messages(
@@ -81,10 +81,9 @@ if prompt := st.chat_input("Type your message..."):
         
         for chunk in stream:
             if 'message' in chunk and 'content' in chunk['message']:
-                full_response += chunk['message']['content']
-                message_placeholder.markdown(full_response + "▌")
+                sink.write(chunk['message']['content'])
         
-        message_placeholder.markdown(full_response)
+        full_response = sink.close()
     
     # Add assistant response to history
     st.session_state.messages.append({"role": "assistant", "content": full_response})
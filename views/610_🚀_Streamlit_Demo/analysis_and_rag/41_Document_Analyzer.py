@@ -1,16 +1,13 @@
 import io
-import json
 
-import requests
 import streamlit as st
 
-from lib.helper_streamlit import models
+from lib.helper_ollama.transport import stream_ndjson
+from lib.helper_streamlit import StreamSink, models
 
 st.set_page_config(page_title="Mini Data Analyzer", page_icon="📄")
 st.title("📄🔍 Mini Data Analyzer (CSV & PDF)")
 
-OLLAMA = "http://localhost:11434"
-
 # --- Model wählen --------------------------------------------------------------------------------
 available_models = models()
 
@@ -92,19 +89,12 @@ if st.button("🚀 Analysieren", disabled=not (up and doc_text.strip())):
     payload = {
         "model": model,
         "prompt": f"{sys_prompt}\n\n{user_prompt}",
-        "stream": True,
     }
-    box = st.empty()
-    acc = ""
+    sink = StreamSink()
     try:
-        with requests.post(f"{OLLAMA}/api/generate", json=payload, stream=True) as r:
-            r.raise_for_status()
-            for ln in r.iter_lines():
-                if not ln:
-                    continue
-                chunk = json.loads(ln.decode("utf-8"))
-                acc += chunk.get("response", "")
-                box.markdown(acc)
+        for chunk in stream_ndjson("/api/generate", payload):
+            sink.write(chunk.get("response", ""))
+        acc = sink.close()
         st.download_button(
             "⬇️ Ergebnis speichern",
             acc.encode("utf-8"),
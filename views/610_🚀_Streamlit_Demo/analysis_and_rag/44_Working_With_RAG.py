@@ -3,67 +3,95 @@ import os
 
 import streamlit as st
 
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, UnstructuredImageLoader
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_community.llms import Ollama
-from langchain.chains import RetrievalQA
-
+from lib.helper_rag import DocumentCache, document_key
 from lib.helper_streamlit import add_select_model
+from lib.lazy import lazy_import
+
+# Loaded on first use: a cached document needs neither the loaders nor torch.
+PyPDFLoader = lazy_import("langchain_community.document_loaders", "PyPDFLoader")
+TextLoader = lazy_import("langchain_community.document_loaders", "TextLoader")
+UnstructuredImageLoader = lazy_import("langchain_community.document_loaders", "UnstructuredImageLoader")
+HuggingFaceEmbeddings = lazy_import("langchain_community.embeddings", "HuggingFaceEmbeddings")
+FAISS = lazy_import("langchain_community.vectorstores", "FAISS")
+Ollama = lazy_import("langchain_community.llms", "Ollama")
+RetrievalQA = lazy_import("langchain.chains", "RetrievalQA")
+Document = lazy_import("langchain_core.documents", "Document")
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
 st.set_page_config(page_title="RAG MiniApp", page_icon="🔍")
 st.title("🔍 Minimal RAG App for PDF, TXT, and Images (Ollama Local)")
 
-uploaded_file = st.file_uploader("Upload a PDF, TXT, or Image file", type=["pdf", "txt", "png", "jpg", "jpeg"])
 
-if not uploaded_file:
-    st.info("Upload a PDF, TXT, or image file to get started.")    
-else:
+@st.cache_resource
+def get_embeddings(model_name):
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+def load_documents(name, data):
     with tempfile.TemporaryDirectory() as tmpdir:
-        file_path = os.path.join(tmpdir, uploaded_file.name)
+        file_path = os.path.join(tmpdir, name)
         with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+            f.write(data)
 
-        # Load document
-        if uploaded_file.name.lower().endswith(".pdf"):
+        if name.lower().endswith(".pdf"):
             loader = PyPDFLoader(file_path)
-        elif uploaded_file.name.lower().endswith(".txt"):
+        elif name.lower().endswith(".txt"):
             loader = TextLoader(file_path)
-        elif uploaded_file.name.lower().endswith((".png", ".jpg", ".jpeg")):
-            loader = UnstructuredImageLoader(file_path)
         else:
-            st.error("Unsupported file type.")
-            st.stop()
-
-        docs = loader.load()
-        st.success(f"Loaded {len(docs)} document chunk(s).")
-
-        # Embeddings and Vectorstore
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        db = FAISS.from_documents(docs, embeddings)
-
-        # LLM (using Ollama locally)
-        model = add_select_model()
-        if not model:
-            st.info("Please enter the Ollama model name to proceed.")
-        else:            
-            llm = Ollama(
-                model=model,
-                temperature=0.1,
-                max_tokens=256,
-            )
-            qa = RetrievalQA.from_chain_type(
-                llm=llm,
-                retriever=db.as_retriever(),
-                return_source_documents=True,
-            )
-
-            query = st.text_input("Ask a question about your document:")
-            if query:
-                with st.spinner("Generating answer..."):
-                    result = qa({"query": query})
-                st.markdown("**Answer:**")
-                st.write(result["result"])
-                st.markdown("**Source Document(s):**")
-                for i, doc in enumerate(result["source_documents"]):
-                    st.write(f"Chunk {i+1}: {doc.page_content[:300]}...")
+            loader = UnstructuredImageLoader(file_path)
+        return [{"page_content": d.page_content, "metadata": d.metadata} for d in loader.load()]
+
+
+uploaded_file = st.file_uploader("Upload a PDF, TXT, or Image file", type=["pdf", "txt", "png", "jpg", "jpeg"])
+
+if not uploaded_file:
+    st.info("Upload a PDF, TXT, or image file to get started.")
+elif not uploaded_file.name.lower().endswith((".pdf", ".txt", ".png", ".jpg", ".jpeg")):
+    st.error("Unsupported file type.")
+else:
+    # Loading and indexing run once per file content; reruns (e.g. typing a
+    # question) and later sessions reuse the chunks and the FAISS index.
+    data = uploaded_file.getvalue()
+    suffix = os.path.splitext(uploaded_file.name)[1].lower()
+    cache = DocumentCache(document_key(data, loader=suffix, embeddings=EMBEDDING_MODEL))
+
+    with st.spinner("Loading document..."):
+        chunks = cache.json("chunks", lambda: load_documents(uploaded_file.name, data))
+    st.success(f"Loaded {len(chunks)} document chunk(s).")
+
+    # Embeddings and Vectorstore
+    embeddings = get_embeddings(EMBEDDING_MODEL)
+    with st.spinner("Building the index..."):
+        db = cache.resource(
+            "faiss",
+            lambda: FAISS.from_documents([Document(**c) for c in chunks], embeddings),
+            save=lambda index, path: index.save_local(str(path)),
+            load=lambda path: FAISS.load_local(str(path), embeddings, allow_dangerous_deserialization=True),
+        )
+
+    # LLM (using Ollama locally)
+    model = add_select_model()
+    if not model:
+        st.info("Please enter the Ollama model name to proceed.")
+    else:
+        llm = Ollama(
+            model=model,
+            temperature=0.1,
+            max_tokens=256,
+        )
+        qa = RetrievalQA.from_chain_type(
+            llm=llm,
+            retriever=db.as_retriever(),
+            return_source_documents=True,
+        )
+
+        query = st.text_input("Ask a question about your document:")
+        if query:
+            with st.spinner("Generating answer..."):
+                result = qa({"query": query})
+            st.markdown("**Answer:**")
+            st.write(result["result"])
+            st.markdown("**Source Document(s):**")
+            for i, doc in enumerate(result["source_documents"]):
+                st.write(f"Chunk {i+1}: {doc.page_content[:300]}...")
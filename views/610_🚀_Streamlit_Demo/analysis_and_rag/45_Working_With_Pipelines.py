@@ -1,14 +1,33 @@
 import os
+import tempfile
+
 import streamlit as st
 
-from langchain_ollama import ChatOllama, OllamaEmbeddings
-from langchain_community.document_loaders import TextLoader, PyPDFLoader
-from langchain_community.vectorstores import FAISS
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from lib.helper_rag import DocumentCache, document_key
+from lib.lazy import lazy_import
+
+# Loaded on first use, so a cached document skips the loaders and splitter.
+ChatOllama = lazy_import("langchain_ollama", "ChatOllama")
+OllamaEmbeddings = lazy_import("langchain_ollama", "OllamaEmbeddings")
+TextLoader = lazy_import("langchain_community.document_loaders", "TextLoader")
+PyPDFLoader = lazy_import("langchain_community.document_loaders", "PyPDFLoader")
+FAISS = lazy_import("langchain_community.vectorstores", "FAISS")
+RecursiveCharacterTextSplitter = lazy_import("langchain.text_splitter", "RecursiveCharacterTextSplitter")
+Document = lazy_import("langchain_core.documents", "Document")
+
+ChatPromptTemplate = lazy_import("langchain_core.prompts", "ChatPromptTemplate")
+create_stuff_documents_chain = lazy_import("langchain.chains.combine_documents", "create_stuff_documents_chain")
+create_retrieval_chain = lazy_import("langchain.chains.retrieval", "create_retrieval_chain")
+
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+EMBEDDING_MODEL = "nomic-embed-text"
+LLM_MODEL = "llama3"
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain.chains.retrieval import create_retrieval_chain
+SUMMARY_PROMPT = (
+    "You are a concise technical summarizer.\n"
+    "Summarize the following document chunks into a short overview:\n\n{context}"
+)
 
 st.set_page_config(page_title="RAG Pipeline MiniApp", layout="wide")
 st.title("🔧 Working With Pipelines: RAG with Python & Ollama")
@@ -23,13 +42,12 @@ Upload a text or PDF document, and this app will:
 uploaded_file = st.file_uploader("Upload a text or PDF file", type=["txt", "pdf"])
 question = st.text_input("Ask a question about the document:")
 
-if uploaded_file:
-    ext = uploaded_file.name.split(".")[-1].lower()
-    temp_file_path = f"temp_doc.{ext}"
 
-    try:
+def split_document(ext, data):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        temp_file_path = os.path.join(tmpdir, f"doc.{ext}")
         with open(temp_file_path, "wb") as f:
-            f.write(uploaded_file.read())
+            f.write(data)
 
         # Loader
         if ext == "pdf":
@@ -38,26 +56,54 @@ if uploaded_file:
             loader = TextLoader(temp_file_path, encoding="utf-8")
         docs = loader.load()
 
-        # Split
-        splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-        splits = splitter.split_documents(docs)
-
-        # Vector store
-        embeddings = OllamaEmbeddings(model="nomic-embed-text")
-        vectordb = FAISS.from_documents(splits, embeddings)
-        retriever = vectordb.as_retriever(search_kwargs={"k": 4})
+    # Split
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return [{"page_content": d.page_content, "metadata": d.metadata} for d in splitter.split_documents(docs)]
 
-        # LLM
-        llm = ChatOllama(model="llama3")
 
-        # Summarization chain (stuff)
-        summary_prompt = ChatPromptTemplate.from_template(
-            "You are a concise technical summarizer.\n"
-            "Summarize the following document chunks into a short overview:\n\n{context}"
+if uploaded_file:
+    # Everything derived from the file is cached by its content and the
+    # settings below, so a new question costs one query embedding and one
+    # LLM call; the split, the index and the summary are built only once.
+    data = uploaded_file.getvalue()
+    ext = uploaded_file.name.split(".")[-1].lower()
+    cache = DocumentCache(document_key(
+        data, ext=ext, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, embeddings=EMBEDDING_MODEL,
+    ))
+
+    with st.spinner("Splitting document..."):
+        splits = [Document(**c) for c in cache.json("splits", lambda: split_document(ext, data))]
+
+    # Vector store
+    embeddings = OllamaEmbeddings(model=EMBEDDING_MODEL)
+    with st.spinner("Embedding chunks..."):
+        vectordb = cache.resource(
+            "faiss",
+            lambda: FAISS.from_documents(splits, embeddings),
+            save=lambda index, path: index.save_local(str(path)),
+            load=lambda path: FAISS.load_local(str(path), embeddings, allow_dangerous_deserialization=True),
+        )
+    retriever = vectordb.as_retriever(search_kwargs={"k": 4})
+
+    # LLM
+    llm = ChatOllama(model=LLM_MODEL)
+
+    # ---- UI ----
+
+    # Summary (stuff chain): pass a dict with the expected key for the template variable
+    st.subheader("Summary")
+    with st.spinner("Summarizing..."):
+        summary_text = cache.text(
+            "summary",
+            lambda: create_stuff_documents_chain(
+                llm=llm, prompt=ChatPromptTemplate.from_template(SUMMARY_PROMPT)
+            ).invoke({"context": splits}),
+            variant={"model": LLM_MODEL, "prompt": SUMMARY_PROMPT},
         )
-        summary_chain = create_stuff_documents_chain(llm=llm, prompt=summary_prompt)
+    st.write(summary_text)
 
-        # RAG chain (retrieval + stuff)
+    # Q&A: RAG chain (retrieval + stuff)
+    if question:
         rag_prompt = ChatPromptTemplate.from_template(
             "Use ONLY the provided context to answer the user question.\n"
             "If the answer is not in the context, say you don't know.\n\n"
@@ -66,21 +112,8 @@ if uploaded_file:
         doc_chain = create_stuff_documents_chain(llm=llm, prompt=rag_prompt)
         rag_chain = create_retrieval_chain(retriever, doc_chain)
 
-        # ---- UI ----
-
-        # Summary: pass a dict with the expected key for the template variable
-        st.subheader("Summary")
-        summary_text = summary_chain.invoke({"context": splits})
-        st.write(summary_text)
-
-        # Q&A
-        if question:
-            st.subheader("Answer")
-            result = rag_chain.invoke({"input": question})
-            st.write(result.get("answer", ""))
-
-    finally:
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+        st.subheader("Answer")
+        result = rag_chain.invoke({"input": question})
+        st.write(result.get("answer", ""))
 else:
     st.info("Please upload a text or PDF file to get started.")
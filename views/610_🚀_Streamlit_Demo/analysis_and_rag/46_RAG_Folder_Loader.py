@@ -1,30 +1,44 @@
-import glob
-import os
-
 import streamlit as st
 from lib.helper_streamlit import add_select_model, generate
+from lib.helper_rag import get_folder_index
 
 st.set_page_config(page_title="RAG Folder Loader (Lite)", page_icon="🗂️")
 
 
 st.title("🗂️ RAG: Ordner-Loader (Lite)")
 model = add_select_model()
+embed_model = st.text_input("Embedding-Modell", "nomic-embed-text")
 
 folder = st.text_input("Ordner mit .txt/.md", "./docs")
 query = st.text_input("Frage", "Worum geht es insgesamt?")
+k = st.slider("Anzahl Textstellen", 1, 10, 4)
 
 if st.button("Antwort finden"):
-    texts = []
-    for pth in glob.glob(os.path.join(folder, "**", "*.*"), recursive=True):
-        if pth.lower().endswith((".txt", ".md")):
-            try:
-                texts.append(
-                    open(pth, "r", encoding="utf-8", errors="ignore").read()[:4000]
-                )
-            except Exception as e:  # noqa: F841
-                pass
-    context = "\n---\n".join(texts)[:20000] if texts else ""
-    p = f"Beantworte die Frage auf Basis des Kontexts (Auszüge):\n{context}\n\nFrage: {query}"
-    p = p if context else f"Keine Dateien gefunden. Antworte trotzdem kurz auf: {query}"
+    index = get_folder_index(folder, embed_model)
+    try:
+        with st.spinner("Index wird aktualisiert..."):
+            update = index.update()
+        hits = index.search(query, k=k)
+    except Exception as e:
+        st.error(str(e))
+        st.stop()
+
+    st.caption(
+        f"{len(index.files)} Dateien, {len(index)} Abschnitte im Index · "
+        f"neu: {update.added}, geändert: {update.changed}, entfernt: {update.removed}, "
+        f"{update.embedded} Abschnitte eingebettet"
+    )
+
+    if hits:
+        context = "\n---\n".join(f"[{hit.path}]\n{hit.text}" for hit in hits)
+        p = f"Beantworte die Frage auf Basis des Kontexts (Auszüge):\n{context}\n\nFrage: {query}"
+    else:
+        p = f"Keine Dateien gefunden. Antworte trotzdem kurz auf: {query}"
 
     generate(model, p)
+
+    if hits:
+        with st.expander("Verwendete Textstellen"):
+            for hit in hits:
+                st.markdown(f"**{hit.path}** (Zeichen {hit.start}, Score {hit.score:.2f})")
+                st.text(hit.text)
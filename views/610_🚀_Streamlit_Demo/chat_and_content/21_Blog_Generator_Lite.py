@@ -13,5 +13,5 @@ length = st.slider("Ziel-Länge (Wörter)", 200, 2000, 800, 50)
 
 if st.button("Generieren"):
     p = f"Schreibe einen {tone.lower()}en Blogartikel (~{length} Wörter) über: {topic}. Markdown, H1/H2, Bulletpoints, Fazit."
-    txt = generate(model, p)
+    txt = generate(model, p, cache=True)
     st.download_button("⬇️ Markdown", txt.encode(), f"blog_{topic.replace(' ', '_')}.md")
@@ -19,4 +19,4 @@ if st.button("FAQ erstellen"):
         "Erzeuge 10 FAQ-Fragen mit kurzen, klaren Antworten basierend auf diesem Inhalt (Deutsch):\n\n"
         + source_text
     )
-    generate(model, prompt)
+    generate(model, prompt, cache=True)
@@ -16,4 +16,4 @@ if st.button("Ideen erzeugen"):
         "Erzeuge 10 Content-Ideen mit Titel + 1-Satz-Hook zum Thema: "
         f"{topic}. Gib als nummerierte Liste zurück."
     )
-    generate(model, prompt)
+    generate(model, prompt, cache=True)
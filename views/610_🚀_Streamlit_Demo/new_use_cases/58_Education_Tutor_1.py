@@ -74,4 +74,4 @@ Gib eine strukturierte Antwort mit folgenden Abschnitten:
 Ergänze konkrete Zeitvorschläge.
 """
     with st.spinner():
-        generate(model, prompt)
+        generate(model, prompt, cache=True)
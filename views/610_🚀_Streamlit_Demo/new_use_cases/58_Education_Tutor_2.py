@@ -268,7 +268,7 @@ if submitted:
 
     # LLM-Aufruf
     with st.spinner():
-        llm_text = generate(model, prompt)
+        llm_text = generate(model, prompt, cache=True)
 
     # Tabs zur Anzeige
     tab_plan, tab_json, tab_raw = st.tabs(["📄 Plan", "🧩 JSON", "🗒️ Rohtext"])
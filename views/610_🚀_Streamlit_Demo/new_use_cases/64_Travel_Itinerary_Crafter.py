@@ -50,4 +50,4 @@ Must-do: {must_do}
 
 Gib für jeden Tag Morgen-, Nachmittag- und Abendprogramm, Restauranttipps, Budgetschätzung und praktische Hinweise.
 """
-    generate(model, prompt)
+    generate(model, prompt, cache=True)
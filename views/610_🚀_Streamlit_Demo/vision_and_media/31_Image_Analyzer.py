@@ -3,12 +3,11 @@
 from __future__ import annotations
 
 import base64
-import json
 
-import requests
 import streamlit as st
 
-from lib.helper_streamlit import models
+from lib.helper_ollama.transport import stream_ndjson
+from lib.helper_streamlit import StreamSink, models
 
 st.set_page_config(page_title="Mini Vision Analyzer", page_icon="🖼️")
 
@@ -42,17 +41,12 @@ if trigger and image_file:
         "model": selected_model,
         "prompt": prompt,
         "images": [encoded],
-        "stream": True,
     }
 
-    with requests.post("http://localhost:11434/api/generate", json=payload, stream=True) as response:
-        text = ""
-        for line in response.iter_lines():
-            if not line:
-                continue
-            part = json.loads(line.decode("utf-8"))
-            text += part.get("response", "")
-            placeholder.markdown(text)
-        st.download_button(
+    sink = StreamSink(placeholder)
+    for part in stream_ndjson("/api/generate", payload):
+        sink.write(part.get("response", ""))
+    text = sink.close()
+    st.download_button(
             "⬇️ Ergebnis speichern", text.encode("utf-8"), f"analysis_{image_file.name}.txt"
         )
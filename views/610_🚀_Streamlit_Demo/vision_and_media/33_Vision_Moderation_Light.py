@@ -3,12 +3,11 @@
 from __future__ import annotations
 
 import base64
-import json
 
-import requests
 import streamlit as st
 
-from lib.helper_streamlit import models
+from lib.helper_ollama.transport import stream_ndjson
+from lib.helper_streamlit import StreamSink, models
 
 st.set_page_config(page_title="Vision Moderation Light", page_icon="🛡️")
 st.title("🛡️ Vision Moderation (Hinweise)")
@@ -39,12 +38,8 @@ if st.button("Prüfen", disabled=not image_file):
         "model": selected_model,
         "prompt": prompt,
         "images": [encoded],
-        "stream": True,
     }
-    placeholder, acc = st.empty(), ""
-    with requests.post("http://localhost:11434/api/generate", json=payload, stream=True) as response:
-        for line in response.iter_lines():
-            if not line:
-                continue
-            acc += json.loads(line.decode()).get("response", "")
-            placeholder.markdown(acc)
+    sink = StreamSink()
+    for part in stream_ndjson("/api/generate", payload):
+        sink.write(part.get("response", ""))
+    sink.close()
@@ -11,7 +11,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from lib.helper_streamlit import show_code
+from lib.helper_streamlit import show_code, lazy_tab
 
 st.set_page_config(
     page_title="Tag 1: Einführung Python",
@@ -41,7 +41,7 @@ TAB_NAMES = [
     TAB_EXERCISES,
 ]
 
-tabs = st.tabs(TAB_NAMES)
+tabs = st.tabs(TAB_NAMES, key="tag1_tabs", on_change="rerun")
 
 def get_tab_index(name):
     try:
@@ -50,7 +50,8 @@ def get_tab_index(name):
         return -1
 
 # Tab 1: Übersicht
-with tabs[get_tab_index(TAB_OVERVIEW)]:
+@lazy_tab(tabs[get_tab_index(TAB_OVERVIEW)])
+def tab_overview():
     st.header("📋 Kursübersicht Tag 1")
     
     st.markdown("""
@@ -90,7 +91,8 @@ with tabs[get_tab_index(TAB_OVERVIEW)]:
     st.info("💡 **Tipp**: Nutzen Sie die Tabs oben, um durch die verschiedenen Themen zu navigieren.")
 
 # Tab 2: Variablen & Datentypen
-with tabs[get_tab_index(TAB_VARIABLES)]:
+@lazy_tab(tabs[get_tab_index(TAB_VARIABLES)])
+def tab_variables():
     st.header("1️⃣ Variablen & Datentypen")
     
     st.markdown("""
@@ -177,7 +179,8 @@ bool("text") # True
                 st.error(f"Fehler: {e}")
 
 # Tab 3: Listen & Dictionaries
-with tabs[get_tab_index(TAB_LISTS)]:
+@lazy_tab(tabs[get_tab_index(TAB_LISTS)])
+def tab_lists():
     st.header("2️⃣ Listen & Dictionaries")
     
     col1, col2 = st.columns(2)
@@ -274,7 +277,8 @@ for key, value in person.items():
         st.json(st.session_state.my_dict)
 
 # Tab 4: Funktionen
-with tabs[get_tab_index(TAB_FUNCTIONS)]:
+@lazy_tab(tabs[get_tab_index(TAB_FUNCTIONS)])
+def tab_functions():
     st.header("3️⃣ Funktionen")
     
     st.markdown("""
@@ -387,7 +391,8 @@ print(process_text(text, uppercase=True))
 ''', language='python')
 
 # Tab 5: Klassen
-with tabs[get_tab_index(TAB_CLASSES)]:
+@lazy_tab(tabs[get_tab_index(TAB_CLASSES)])
+def tab_classes():
     st.header("4️⃣ Klassen und Objekte")
     
     st.markdown("""
@@ -512,7 +517,8 @@ class TextModel(AIModel):
 ''', language='python')
 
 # Tab 6: File I/O
-with tabs[get_tab_index(TAB_FILE_IO)]:
+@lazy_tab(tabs[get_tab_index(TAB_FILE_IO)])
+def tab_file_io():
     st.header("5️⃣ Dateien lesen und schreiben")
     
     col1, col2 = st.columns(2)
@@ -600,7 +606,8 @@ with open('data.csv', 'w', newline='') as file:
                 st.error(f"❌ Fehler: {e}")
 
 # Tab 7: Übungen
-with tabs[get_tab_index(TAB_EXERCISES)]:
+@lazy_tab(tabs[get_tab_index(TAB_EXERCISES)])
+def tab_exercises():
     st.header("6️⃣ Praktische Übungen")
     
     # Sub-Tabs für jede Übung
@@ -612,10 +619,11 @@ with tabs[get_tab_index(TAB_EXERCISES)]:
         "🌡️ Temperatur",
         "🔐 Primzahl",
         "🔒 Passwort"
-    ])
+    ], key="tag1_exercise_tabs", on_change="rerun")
     
     # Wort-Zähler
-    with exercise_tabs[0]:
+    @lazy_tab(exercise_tabs[0])
+    def exercise_1():
         st.markdown("""
         ### 🎯 Wort-Zähler
         Schreiben Sie ein Programm, das einen Text analysiert.
@@ -678,7 +686,8 @@ print(result)
 ''', language='python')
     
     # To-Do Liste
-    with exercise_tabs[1]:
+    @lazy_tab(exercise_tabs[1])
+    def exercise_2():
         st.markdown("""
         ### ✅ To-Do Liste
         Erstellen Sie eine einfache To-Do Liste mit Session State.
@@ -754,7 +763,8 @@ todo.show_tasks()
 ''', language='python')
     
     # Fibonacci
-    with exercise_tabs[2]:
+    @lazy_tab(exercise_tabs[2])
+    def exercise_3():
         st.markdown("""
         ### 🔢 Fibonacci-Folge
         Generieren Sie die Fibonacci-Folge.
@@ -816,7 +826,8 @@ def fibonacci_recursive(n):
 ''', language='python')
     
     # Palindrom
-    with exercise_tabs[3]:
+    @lazy_tab(exercise_tabs[3])
+    def exercise_4():
         st.markdown("""
         ### 🔄 Palindrom-Checker
         Prüfen Sie, ob ein Wort ein Palindrom ist.
@@ -864,7 +875,8 @@ print(is_palindrome("A man a plan a canal Panama"))  # True
 ''', language='python')
     
     # Temperatur-Konverter
-    with exercise_tabs[4]:
+    @lazy_tab(exercise_tabs[4])
+    def exercise_5():
         st.markdown("""
         ### 🌡️ Temperatur-Konverter
         Konvertieren Sie zwischen Celsius, Fahrenheit und Kelvin.
@@ -929,7 +941,8 @@ print(conv.celsius_to_kelvin(20))      # 293.15
 ''', language='python')
     
     # Primzahl-Checker
-    with exercise_tabs[5]:
+    @lazy_tab(exercise_tabs[5])
+    def exercise_6():
         st.markdown("""
         ### 🔐 Primzahl-Checker
         Prüfen Sie, ob eine Zahl eine Primzahl ist.
@@ -993,7 +1006,8 @@ print(primes_up_to(20))
 ''', language='python')
     
     # Passwort-Generator
-    with exercise_tabs[6]:
+    @lazy_tab(exercise_tabs[6])
+    def exercise_7():
         st.markdown("""
         ### 🔒 Passwort-Generator
         Generieren Sie sichere Passwörter.
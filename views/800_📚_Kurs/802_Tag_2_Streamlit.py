@@ -12,7 +12,7 @@ import pandas as pd
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from lib.helper_streamlit import show_code
+from lib.helper_streamlit import show_code, lazy_tab
 
 st.set_page_config(
     page_title="Tag 2: Streamlit",
@@ -42,7 +42,7 @@ TAB_NAMES = [
     TAB_EXERCISES,
 ]
 
-tabs = st.tabs(TAB_NAMES)
+tabs = st.tabs(TAB_NAMES, key="tag2_tabs", on_change="rerun")
 
 def get_tab_index(name):
     try:
@@ -51,7 +51,8 @@ def get_tab_index(name):
         return -1
 
 # Tab 1: Übersicht
-with tabs[get_tab_index(TAB_OVERVIEW)]:
+@lazy_tab(tabs[get_tab_index(TAB_OVERVIEW)])
+def tab_overview():
     st.header("📋 Kursübersicht Tag 2")
     
     st.markdown("""
@@ -109,7 +110,8 @@ with tabs[get_tab_index(TAB_OVERVIEW)]:
         """)
 
 # Tab 2: Basics
-with tabs[get_tab_index(TAB_BASICS)]:
+@lazy_tab(tabs[get_tab_index(TAB_BASICS)])
+def tab_basics():
     st.header("1️⃣ Streamlit Basics")
     
     st.markdown("""
@@ -226,7 +228,8 @@ st.json({"name": "Alice", "age": 25})
         col_c.metric("Umsatz", "€15k", "-3%")
 
 # Tab 3: Widgets
-with tabs[get_tab_index(TAB_WIDGETS)]:
+@lazy_tab(tabs[get_tab_index(TAB_WIDGETS)])
+def tab_widgets():
     st.header("2️⃣ Streamlit Widgets")
     
     st.markdown("### Eingabe-Widgets - Ihr Werkzeugkasten für Interaktivität")
@@ -348,7 +351,8 @@ color = st.color_picker("Farbe wählen:", "#00f900")
             st.write(f"- Newsletter: {'✅ Ja' if demo_check else '❌ Nein'}")
 
 # Tab 4: Layout
-with tabs[get_tab_index(TAB_LAYOUT)]:
+@lazy_tab(tabs[get_tab_index(TAB_LAYOUT)])
+def tab_layout():
     st.header("3️⃣ Layout-Elemente")
     
     st.markdown("### Spalten (Columns)")
@@ -486,7 +490,8 @@ with tab3:
             st.write("Inhalt von Tab 3")
 
 # Tab 5: Session State
-with tabs[get_tab_index(TAB_SESSION_STATE)]:
+@lazy_tab(tabs[get_tab_index(TAB_SESSION_STATE)])
+def tab_session_state():
     st.header("4️⃣ Session State - Zustandsverwaltung")
     
     st.markdown("""
@@ -546,17 +551,17 @@ st.button("Increment", on_click=increment)
         with col_a:
             if st.button("➕ +1", key="inc"):
                 st.session_state.demo_counter += 1
-                st.rerun()
+                st.rerun(scope="fragment")
         
         with col_b:
             if st.button("➖ -1", key="dec"):
                 st.session_state.demo_counter -= 1
-                st.rerun()
+                st.rerun(scope="fragment")
         
         with col_c:
             if st.button("🔄 Reset", key="reset"):
                 st.session_state.demo_counter = 0
-                st.rerun()
+                st.rerun(scope="fragment")
     
     st.divider()
     
@@ -612,7 +617,7 @@ for i, todo in enumerate(st.session_state.todos):
         if st.button("➕ Hinzufügen", key="add_todo"):
             if new_todo:
                 st.session_state.demo_todos.append(new_todo)
-                st.rerun()
+                st.rerun(scope="fragment")
         
         # Todos anzeigen
         if st.session_state.demo_todos:
@@ -623,12 +628,13 @@ for i, todo in enumerate(st.session_state.todos):
                 with col_d:
                     if st.button("🗑️", key=f"del_todo_{i}"):
                         st.session_state.demo_todos.pop(i)
-                        st.rerun()
+                        st.rerun(scope="fragment")
         else:
             st.info("Keine Todos vorhanden")
 
 # Tab 6: Daten
-with tabs[get_tab_index(TAB_DATA)]:
+@lazy_tab(tabs[get_tab_index(TAB_DATA)])
+def tab_data():
     st.header("5️⃣ Daten & Visualisierung")
     
     st.markdown("### 📊 Charts & Diagramme")
@@ -739,7 +745,8 @@ st.download_button(
         )
 
 # Tab 7: Übungen
-with tabs[get_tab_index(TAB_EXERCISES)]:
+@lazy_tab(tabs[get_tab_index(TAB_EXERCISES)])
+def tab_exercises():
     st.header("6️⃣ Praktische Übungen")
     
     # Sub-Tabs für jede Übung
@@ -750,10 +757,11 @@ with tabs[get_tab_index(TAB_EXERCISES)]:
         "🔢 Taschenrechner",
         "⏱️ Timer",
         "💱 Währung"
-    ])
+    ], key="tag2_exercise_tabs", on_change="rerun")
     
     # BMI-Rechner
-    with exercise_tabs[0]:
+    @lazy_tab(exercise_tabs[0])
+    def exercise_1():
         st.markdown("""
         ### ⚖️ BMI-Rechner
         Erstellen Sie einen interaktiven BMI-Rechner.
@@ -821,7 +829,8 @@ if st.button("Berechnen"):
 ''', language='python')
     
     # Notiz-App
-    with exercise_tabs[1]:
+    @lazy_tab(exercise_tabs[1])
+    def exercise_2():
         st.markdown("""
         ### 📝 Notiz-App
         Erstellen Sie eine Notiz-App mit Session State.
@@ -868,7 +877,8 @@ for i, note in enumerate(st.session_state.notes):
 ''', language='python')
     
     # Quiz-App
-    with exercise_tabs[2]:
+    @lazy_tab(exercise_tabs[2])
+    def exercise_3():
         st.markdown("""
         ### ❓ Quiz-App
         Erstellen Sie eine interaktive Quiz-App.
@@ -920,7 +930,7 @@ for i, note in enumerate(st.session_state.notes):
                 if st.button("Neu starten", key="restart_quiz"):
                     st.session_state.quiz_score = 0
                     st.session_state.quiz_answered = set()
-                    st.rerun()
+                    st.rerun(scope="fragment")
         
         with col2:
             st.markdown("**Lösungsansatz:**")
@@ -946,7 +956,8 @@ st.metric("Score", st.session_state.score)
 ''', language='python')
     
     # Taschenrechner
-    with exercise_tabs[3]:
+    @lazy_tab(exercise_tabs[3])
+    def exercise_4():
         st.markdown("""
         ### 🔢 Taschenrechner
         Erstellen Sie einen interaktiven Taschenrechner.
@@ -1022,7 +1033,8 @@ if st.button("="):
 ''', language='python')
     
     # Countdown-Timer
-    with exercise_tabs[4]:
+    @lazy_tab(exercise_tabs[4])
+    def exercise_5():
         st.markdown("""
         ### ⏱️ Countdown-Timer
         Erstellen Sie einen interaktiven Countdown-Timer.
@@ -1088,7 +1100,8 @@ if st.button("Start"):
 ''', language='python')
     
     # Währungsrechner
-    with exercise_tabs[5]:
+    @lazy_tab(exercise_tabs[5])
+    def exercise_6():
         st.markdown("""
         ### 💱 Währungsrechner
         Erstellen Sie einen interaktiven Währungsrechner.
@@ -11,8 +11,8 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from lib.helper_streamlit import show_code, add_select_model
-from lib.helper_ollama import check_ollama_status, get_available_models
+from lib.helper_streamlit import StreamSink, show_code, add_select_model, lazy_tab
+from lib.helper_ollama import chat, check_ollama_status, generate, get_available_models, get_model_registry
 
 st.set_page_config(
     page_title="Tag 3: Ollama",
@@ -44,7 +44,7 @@ TAB_NAMES = [
     TAB_EXERCISES,
 ]
 
-tabs = st.tabs(TAB_NAMES)
+tabs = st.tabs(TAB_NAMES, key="tag3_tabs", on_change="rerun")
 
 def get_tab_index(name):
     try:
@@ -53,7 +53,8 @@ def get_tab_index(name):
         return -1
 
 # Tab 1: Übersicht
-with tabs[get_tab_index(TAB_OVERVIEW)]:
+@lazy_tab(tabs[get_tab_index(TAB_OVERVIEW)])
+def tab_overview():
     st.header("📋 Kursübersicht Tag 3")
     
     st.markdown("""
@@ -111,7 +112,8 @@ with tabs[get_tab_index(TAB_OVERVIEW)]:
         """)
 
 # Tab 2: Setup
-with tabs[get_tab_index(TAB_SETUP)]:
+@lazy_tab(tabs[get_tab_index(TAB_SETUP)])
+def tab_setup():
     st.header("1️⃣ Ollama Setup")
     
     st.markdown("""
@@ -191,7 +193,8 @@ with tabs[get_tab_index(TAB_SETUP)]:
                     st.info("Stellen Sie sicher, dass Ollama installiert und gestartet ist.")
 
 # Tab 3: Modelle
-with tabs[get_tab_index(TAB_MODELS)]:
+@lazy_tab(tabs[get_tab_index(TAB_MODELS)])
+def tab_models():
     st.header("2️⃣ Modell-Management")
     
     st.markdown("### 📦 Beliebte Modelle")
@@ -248,7 +251,7 @@ with tabs[get_tab_index(TAB_MODELS)]:
     st.markdown("### 📊 Ihre Modelle")
     
     if st.button("Modelle neu laden", key="reload_models"):
-        st.rerun()
+        st.rerun(scope="fragment")
     
     available_models = get_available_models()
     
@@ -259,10 +262,9 @@ with tabs[get_tab_index(TAB_MODELS)]:
         models_list = []
         
         try:
-            import ollama
             for model_name in available_models:
                 try:
-                    info = ollama.show(model_name)
+                    info = get_model_registry().get(model_name) or {}
                     size = info.get('size', 0)
                     models_list.append({
                         'Modell': model_name,
@@ -286,7 +288,8 @@ with tabs[get_tab_index(TAB_MODELS)]:
         st.info("Installieren Sie ein Modell mit `ollama pull llama3.2`")
 
 # Tab 4: API Basics
-with tabs[get_tab_index(TAB_API_BASICS)]:
+@lazy_tab(tabs[get_tab_index(TAB_API_BASICS)])
+def tab_api_basics():
     st.header("3️⃣ Ollama Python API")
     
     st.markdown("### 📝 Generate - Text generieren")
@@ -338,9 +341,8 @@ print(response['response'])
             if st.button("Generieren", key="gen_button"):
                 with st.spinner("Generiere..."):
                     try:
-                        import ollama
-                        response = ollama.generate(
-                            model=gen_model,
+                        response = generate(
+                            model_name=gen_model,
                             prompt=gen_prompt,
                             options={'temperature': gen_temp}
                         )
@@ -390,7 +392,8 @@ print(response['response'])
         """)
 
 # Tab 5: Chat
-with tabs[get_tab_index(TAB_CHAT)]:
+@lazy_tab(tabs[get_tab_index(TAB_CHAT)])
+def tab_chat():
     st.header("4️⃣ Chat API")
     
     st.markdown("### 💬 Chat mit Konversations-History")
@@ -475,12 +478,11 @@ response = ollama.chat(
                         
                         with st.spinner("Denke nach..."):
                             try:
-                                import ollama
                                 messages = [{"role": "system", "content": system_prompt}]
                                 messages.extend(st.session_state.simple_chat)
                                 
-                                response = ollama.chat(
-                                    model=chat_model,
+                                response = chat(
+                                    model_name=chat_model,
                                     messages=messages
                                 )
                                 
@@ -489,19 +491,20 @@ response = ollama.chat(
                                     "content": response['message']['content']
                                 })
                                 
-                                st.rerun()
+                                st.rerun(scope="fragment")
                             except Exception as e:
                                 st.error(f"Fehler: {e}")
             
             with col_clear:
                 if st.button("Löschen", key="clear_btn"):
                     st.session_state.simple_chat = []
-                    st.rerun()
+                    st.rerun(scope="fragment")
         else:
             st.warning("Keine Modelle verfügbar")
 
 # Tab 6: Streaming
-with tabs[get_tab_index(TAB_STREAMING)]:
+@lazy_tab(tabs[get_tab_index(TAB_STREAMING)])
+def tab_streaming():
     st.header("5️⃣ Streaming")
     
     st.markdown("""
@@ -582,22 +585,20 @@ response_placeholder.markdown(full_response)
             
             if st.button("Mit Streaming generieren", key="stream_btn"):
                 response_placeholder = st.empty()
-                full_response = ""
                 
                 try:
-                    import ollama
-                    stream = ollama.generate(
-                        model=stream_model,
+                    stream = generate(
+                        model_name=stream_model,
                         prompt=stream_prompt,
                         stream=True
                     )
                     
+                    sink = StreamSink(response_placeholder)
                     for chunk in stream:
                         if 'response' in chunk:
-                            full_response += chunk['response']
-                            response_placeholder.markdown(full_response + "▌")
+                            sink.write(chunk['response'])
                     
-                    response_placeholder.markdown(full_response)
+                    sink.close()
                     
                 except Exception as e:
                     st.error(f"Fehler: {e}")
@@ -605,7 +606,8 @@ response_placeholder.markdown(full_response)
             st.warning("Keine Modelle verfügbar")
 
 # Tab 7: Integration
-with tabs[get_tab_index(TAB_INTEGRATION)]:
+@lazy_tab(tabs[get_tab_index(TAB_INTEGRATION)])
+def tab_integration():
     st.header("6️⃣ Streamlit + Ollama Integration")
     
     st.markdown("### 🎯 Vollständiges Chat-Beispiel")
@@ -714,10 +716,11 @@ if st.button("🗑️ Chat löschen"):
         "🌍 Übersetzer",
         "💻 Code-Erklärer",
         "📖 Story-Generator"
-    ])
+    ], key="tag3_integration_exercise_tabs", on_change="rerun")
     
     # Text-Zusammenfassung
-    with exercise_tabs[0]:
+    @lazy_tab(exercise_tabs[0])
+    def exercise_1():
         st.markdown("""
         ### 📄 Text-Zusammenfassung
         Erstellen Sie ein Tool zur automatischen Text-Zusammenfassung.
@@ -760,12 +763,10 @@ if st.button("🗑️ Chat löschen"):
                 if st.button("Zusammenfassen", key="ex1_btn"):
                     with st.spinner("Fasse zusammen..."):
                         try:
-                            import ollama
-                            
                             prompt = f"Fasse diesen Text zusammen ({summary_length}): {summary_text}"
                             
-                            response = ollama.generate(
-                                model=available_models[0],
+                            response = generate(
+                                model_name=available_models[0],
                                 prompt=prompt,
                                 options={'temperature': 0.3}
                             )
@@ -843,12 +844,10 @@ if st.button("Zusammenfassen"):
                 if st.button("Übersetzen", key="ex2_btn"):
                     with st.spinner("Übersetze..."):
                         try:
-                            import ollama
-                            
                             prompt = f"Übersetze diesen Text nach {target_lang}: {translate_text}"
                             
-                            response = ollama.generate(
-                                model=available_models[0],
+                            response = generate(
+                                model_name=available_models[0],
                                 prompt=prompt,
                                 options={'temperature': 0.3}
                             )
@@ -886,7 +885,8 @@ if st.button("Übersetzen"):
 ''', language='python')
     
     # Code-Erklärer
-    with exercise_tabs[2]:
+    @lazy_tab(exercise_tabs[2])
+    def exercise_3():
         st.markdown("""
         ### 💻 Code-Erklärer
         Erstellen Sie einen intelligenten Code-Erklärer.
@@ -929,12 +929,10 @@ if st.button("Übersetzen"):
                 if st.button("Erklären", key="ex3_btn"):
                     with st.spinner("Analysiere Code..."):
                         try:
-                            import ollama
-                            
                             prompt = f"Erkläre diesen {lang} Code Zeile für Zeile:\n\n{code_input}"
                             
-                            response = ollama.generate(
-                                model=available_models[0],
+                            response = generate(
+                                model_name=available_models[0],
                                 prompt=prompt,
                                 options={'temperature': 0.3}
                             )
@@ -968,7 +966,8 @@ if st.button("Erklären"):
 ''', language='python')
     
     # Kreativ-Story-Generator
-    with exercise_tabs[3]:
+    @lazy_tab(exercise_tabs[3])
+    def exercise_4():
         st.markdown("""
         ### 📖 Kreativ-Story-Generator
         Erstellen Sie einen kreativen Story-Generator mit KI.
@@ -1027,8 +1026,6 @@ if st.button("Erklären"):
                 if st.button("Story generieren", key="ex4_btn"):
                     with st.spinner("Schreibe Story..."):
                         try:
-                            import ollama
-                            
                             prompt = f"""Schreibe eine {length} {genre}-Geschichte über {protagonist}.
                             
 Setting: {setting}
@@ -1040,21 +1037,20 @@ Schreibe kreativ und fesselnd!"""
                             st.markdown(f"**📖 {genre}-Story: {protagonist}**")
                             
                             response_placeholder = st.empty()
-                            full_story = ""
                             
-                            stream = ollama.generate(
-                                model=available_models[0],
+                            stream = generate(
+                                model_name=available_models[0],
                                 prompt=prompt,
                                 stream=True,
                                 options={'temperature': 0.9}  # Hohe Kreativität
                             )
                             
+                            sink = StreamSink(response_placeholder)
                             for chunk in stream:
                                 if 'response' in chunk:
-                                    full_story += chunk['response']
-                                    response_placeholder.markdown(full_story + "▌")
+                                    sink.write(chunk['response'])
                             
-                            response_placeholder.markdown(full_story)
+                            full_story = sink.close()
                             
                             # Statistiken
                             word_count = len(full_story.split())
@@ -1114,7 +1110,8 @@ if st.button("Story generieren"):
 ''', language='python')
 
 # Tab 8: Übungen
-with tabs[get_tab_index(TAB_EXERCISES)]:
+@lazy_tab(tabs[get_tab_index(TAB_EXERCISES)])
+def tab_exercises():
     st.header("7️⃣ Praktische Übungen")
     
     st.markdown("""
@@ -1128,10 +1125,11 @@ with tabs[get_tab_index(TAB_EXERCISES)]:
         "Übersetzer",
         "Code-Erklärer",
         "Story-Generator"
-    ])
+    ], key="tag3_exercise_tabs", on_change="rerun")
     
     # Text-Zusammenfassung
-    with exercise_tabs[0]:
+    @lazy_tab(exercise_tabs[0])
+    def exercise_1():
         st.subheader("📝 Text-Zusammenfassung")
         
         st.markdown("""
@@ -1189,9 +1187,8 @@ sind wichtige Themen in der aktuellen Diskussion.""",
                     
                     with st.spinner("Zusammenfassung wird erstellt..."):
                         try:
-                            import ollama
-                            response = ollama.generate(
-                                model=selected_model,
+                            response = generate(
+                                model_name=selected_model,
                                 prompt=prompt,
                                 options={'temperature': 0.3}
                             )
@@ -1261,7 +1258,8 @@ if st.button("Zusammenfassen"):
 ''', language='python')
     
     # Übersetzer
-    with exercise_tabs[1]:
+    @lazy_tab(exercise_tabs[1])
+    def exercise_2():
         st.subheader("🌍 Multi-Sprachen-Übersetzer")
         
         st.markdown("""
@@ -1304,28 +1302,25 @@ if st.button("Zusammenfassen"):
                     
                     with st.spinner("Übersetzung läuft..."):
                         try:
-                            import ollama
-                            
                             if use_streaming:
                                 st.markdown("**Übersetzung:**")
                                 placeholder = st.empty()
-                                translation = ""
                                 
-                                stream = ollama.generate(
-                                    model=selected_model,
+                                stream = generate(
+                                    model_name=selected_model,
                                     prompt=prompt,
                                     stream=True
                                 )
                                 
+                                sink = StreamSink(placeholder)
                                 for chunk in stream:
                                     if 'response' in chunk:
-                                        translation += chunk['response']
-                                        placeholder.markdown(translation + "▌")
+                                        sink.write(chunk['response'])
                                 
-                                placeholder.markdown(translation)
+                                sink.close()
                             else:
-                                response = ollama.generate(
-                                    model=selected_model,
+                                response = generate(
+                                    model_name=selected_model,
                                     prompt=prompt
                                 )
                                 st.success("✅ Übersetzung abgeschlossen!")
@@ -1380,7 +1375,8 @@ if st.button("Übersetzen"):
 ''', language='python')
     
     # Code-Erklärer
-    with exercise_tabs[2]:
+    @lazy_tab(exercise_tabs[2])
+    def exercise_3():
         st.subheader("💻 Code-Erklärer")
         
         st.markdown("""
@@ -1441,9 +1437,8 @@ Code:
                     
                     with st.spinner("Code wird analysiert..."):
                         try:
-                            import ollama
-                            response = ollama.generate(
-                                model=selected_model,
+                            response = generate(
+                                model_name=selected_model,
                                 prompt=prompt,
                                 options={'temperature': 0.4}
                             )
@@ -1499,7 +1494,8 @@ Code:
 ''', language='python')
     
     # Story-Generator
-    with exercise_tabs[3]:
+    @lazy_tab(exercise_tabs[3])
+    def exercise_4():
         st.subheader("📚 Kreativer Story-Generator")
         
         st.markdown("""
@@ -1570,27 +1566,24 @@ Die Geschichte sollte spannend sein und eine klare Struktur haben (Anfang, Konfl
                 
                 with st.spinner("Story wird generiert..."):
                     try:
-                        import ollama
-                        
                         st.markdown("### 📖 Deine Story:")
                         st.markdown("---")
                         
                         placeholder = st.empty()
-                        full_story = ""
                         
-                        stream = ollama.generate(
-                            model=selected_model,
+                        stream = generate(
+                            model_name=selected_model,
                             prompt=prompt,
                             options={'temperature': temperature},
                             stream=True
                         )
                         
+                        sink = StreamSink(placeholder)
                         for chunk in stream:
                             if 'response' in chunk:
-                                full_story += chunk['response']
-                                placeholder.markdown(full_story + "▌")
+                                sink.write(chunk['response'])
                         
-                        placeholder.markdown(full_story)
+                        full_story = sink.close()
                         
                         st.markdown("---")
                         st.success("✅ Story abgeschlossen!")
@@ -11,9 +11,8 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from lib.helper_streamlit import show_code, add_select_model
-from lib.helper_ollama import get_available_models
-import ollama
+from lib.helper_streamlit import StreamSink, show_code, add_select_model
+from lib.helper_ollama import chat, generate, get_available_models
 
 st.set_page_config(
     page_title="Tag 3: Streamlit Ollama Apps",
@@ -140,7 +139,6 @@ with tabs[get_tab_index(TAB_CHAT_APP)]:
         # Assistant response mit Streaming
         with st.chat_message("assistant"):
             message_placeholder = st.empty()
-            full_response = ""
             
             try:
                 # Messages für API vorbereiten
@@ -148,8 +146,8 @@ with tabs[get_tab_index(TAB_CHAT_APP)]:
                 messages.extend(st.session_state.chat_messages)
                 
                 # Streaming Response
-                stream = ollama.chat(
-                    model=selected_model,
+                stream = chat(
+                    model_name=selected_model,
                     messages=messages,
                     stream=True,
                     options={
@@ -158,12 +156,12 @@ with tabs[get_tab_index(TAB_CHAT_APP)]:
                     }
                 )
                 
+                sink = StreamSink(message_placeholder)
                 for chunk in stream:
                     if 'message' in chunk and 'content' in chunk['message']:
-                        full_response += chunk['message']['content']
-                        message_placeholder.markdown(full_response + "▌")
+                        sink.write(chunk['message']['content'])
                 
-                message_placeholder.markdown(full_response)
+                full_response = sink.close()
                 
                 # Response zur History hinzufügen
                 st.session_state.chat_messages.append({
@@ -259,10 +257,9 @@ Bitte generiere qualitativ hochwertigen Inhalt."""
                 with st.spinner("Generiere..."):
                     try:
                         response_placeholder = st.empty()
-                        full_text = ""
                         
-                        stream = ollama.generate(
-                            model=selected_model,
+                        stream = generate(
+                            model_name=selected_model,
                             prompt=prompt,
                             stream=True,
                             options={
@@ -271,12 +268,12 @@ Bitte generiere qualitativ hochwertigen Inhalt."""
                             }
                         )
                         
+                        sink = StreamSink(response_placeholder)
                         for chunk in stream:
                             if 'response' in chunk:
-                                full_text += chunk['response']
-                                response_placeholder.markdown(full_text + "▌")
+                                sink.write(chunk['response'])
                         
-                        response_placeholder.markdown(full_text)
+                        full_text = sink.close()
                         
                         # Download Button
                         st.download_button(
@@ -361,21 +358,20 @@ with tabs[get_tab_index(TAB_CODE_ASSISTANT)]:
                 with st.spinner("Verarbeite..."):
                     try:
                         response_placeholder = st.empty()
-                        full_response = ""
                         
-                        stream = ollama.generate(
-                            model=selected_model,
+                        stream = generate(
+                            model_name=selected_model,
                             prompt=prompt,
                             stream=True,
                             options={'temperature': 0.3}  # Niedrigere Temp für Code
                         )
                         
+                        sink = StreamSink(response_placeholder)
                         for chunk in stream:
                             if 'response' in chunk:
-                                full_response += chunk['response']
-                                response_placeholder.markdown(full_response + "▌")
+                                sink.write(chunk['response'])
                         
-                        response_placeholder.markdown(full_response)
+                        sink.close()
                         
                     except Exception as e:
                         st.error(f"❌ Fehler: {e}")
@@ -437,21 +433,20 @@ Zusammenfassung:"""
                         with st.spinner("Fasse zusammen..."):
                             try:
                                 response_placeholder = st.empty()
-                                full_summary = ""
                                 
-                                stream = ollama.generate(
-                                    model=selected_model,
+                                stream = generate(
+                                    model_name=selected_model,
                                     prompt=prompt,
                                     stream=True,
                                     options={'temperature': 0.3}
                                 )
                                 
+                                sink = StreamSink(response_placeholder)
                                 for chunk in stream:
                                     if 'response' in chunk:
-                                        full_summary += chunk['response']
-                                        response_placeholder.markdown(full_summary + "▌")
+                                        sink.write(chunk['response'])
                                 
-                                response_placeholder.markdown(full_summary)
+                                full_summary = sink.close()
                                 
                                 # Statistiken
                                 st.divider()
@@ -518,8 +513,8 @@ with tabs[get_tab_index(TAB_MULTI_MODEL)]:
                                 import time
                                 start_time = time.time()
                                 
-                                response1 = ollama.generate(
-                                    model=model1,
+                                response1 = generate(
+                                    model_name=model1,
                                     prompt=compare_prompt,
                                     options={'temperature': temperature}
                                 )
@@ -541,8 +536,8 @@ with tabs[get_tab_index(TAB_MULTI_MODEL)]:
                                 import time
                                 start_time = time.time()
                                 
-                                response2 = ollama.generate(
-                                    model=model2,
+                                response2 = generate(
+                                    model_name=model2,
                                     prompt=compare_prompt,
                                     options={'temperature': temperature}
                                 )
@@ -13,9 +13,8 @@ from datetime import datetime
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from lib.helper_streamlit import show_code, add_select_model
-from lib.helper_ollama import get_available_models, list_models_by_capability
-import ollama
+from lib.helper_streamlit import StreamSink, show_code, add_select_model
+from lib.helper_ollama import chat, generate, get_available_models, list_models_by_capability
 
 st.set_page_config(
     page_title="Tag 4: Komplette Anwendung",
@@ -267,26 +266,25 @@ with tabs[get_tab_index(TAB_AI_ASSISTANT)]:
             # Generate response
             with st.chat_message("assistant"):
                 message_placeholder = st.empty()
-                full_response = ""
                 
                 try:
                     messages = [{"role": "system", "content": system_prompt}]
                     messages.extend([{"role": m["role"], "content": m["content"]} 
                                    for m in st.session_state.pro_chat])
                     
-                    stream = ollama.chat(
-                        model=model,
+                    stream = chat(
+                        model_name=model,
                         messages=messages,
                         stream=True,
                         options={'temperature': temperature, 'num_predict': max_tokens}
                     )
                     
+                    sink = StreamSink(message_placeholder)
                     for chunk in stream:
                         if 'message' in chunk and 'content' in chunk['message']:
-                            full_response += chunk['message']['content']
-                            message_placeholder.markdown(full_response + "▌")
+                            sink.write(chunk['message']['content'])
                     
-                    message_placeholder.markdown(full_response)
+                    full_response = sink.close()
                     
                     response_timestamp = datetime.now().strftime("%H:%M:%S")
                     st.caption(response_timestamp)
@@ -350,21 +348,20 @@ with tabs[get_tab_index(TAB_AI_ASSISTANT)]:
                         with st.spinner("Generiere..."):
                             try:
                                 response_placeholder = st.empty()
-                                full_text = ""
                                 
-                                stream = ollama.generate(
-                                    model=model,
+                                stream = generate(
+                                    model_name=model,
                                     prompt=f"Erstelle {gen_type}: {gen_prompt}",
                                     stream=True,
                                     options={'temperature': temperature}
                                 )
                                 
+                                sink = StreamSink(response_placeholder)
                                 for chunk in stream:
                                     if 'response' in chunk:
-                                        full_text += chunk['response']
-                                        response_placeholder.markdown(full_text + "▌")
+                                        sink.write(chunk['response'])
                                 
-                                response_placeholder.markdown(full_text)
+                                full_text = sink.close()
                                 
                                 st.session_state.pro_stats['generations'] += 1
                                 
@@ -430,8 +427,8 @@ with tabs[get_tab_index(TAB_AI_ASSISTANT)]:
                         st.markdown(f"**{title}:**")
                         
                         try:
-                            response = ollama.generate(
-                                model=model,
+                            response = generate(
+                                model_name=model,
                                 prompt=prompt,
                                 options={'temperature': 0.3}
                             )
@@ -4,6 +4,7 @@ Test: embeddings()
 Tests embedding generation with Ollama embedding models.
 """
 
+import numpy as np
 import streamlit as st
 import sys
 from pathlib import Path
@@ -11,7 +12,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from lib.helper_ollama import embeddings as ollama_embeddings, get_local_llms
+from lib.helper_ollama import embeddings as ollama_embeddings, embed_many, get_local_llms
 from lib.helper_streamlit import show_code, add_select_model
 
 st.set_page_config(
@@ -276,18 +277,16 @@ with tabs[1]:
         else:
             with st.spinner("Generating embeddings for comparison..."):
                 try:
-                    # Generate embeddings for both texts
-                    result1 = ollama_embeddings(model_name=model_name, text=text1)
-                    result2 = ollama_embeddings(model_name=model_name, text=text2)
+                    # Generate embeddings for both texts in one batched request
+                    matrix = embed_many(model_name, [text1, text2])
                     
-                    if hasattr(result1, 'embedding') and hasattr(result2, 'embedding'):
-                        vec1 = result1.embedding
-                        vec2 = result2.embedding
+                    if matrix.shape[0] == 2:
+                        vec1, vec2 = matrix
                         
                         # Calculate cosine similarity
-                        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-                        norm1 = sum(x**2 for x in vec1) ** 0.5
-                        norm2 = sum(x**2 for x in vec2) ** 0.5
+                        dot_product = float(vec1 @ vec2)
+                        norm1 = float(np.linalg.norm(vec1))
+                        norm2 = float(np.linalg.norm(vec2))
                         cosine_sim = dot_product / (norm1 * norm2)
                         
                         st.success("✅ Similarity calculated!")
@@ -339,6 +338,7 @@ with tabs[2]:
 st.markdown("""
 ### Function Tested:
 - ✅ `embeddings(model_name, text, **kwargs)` - Generate embeddings for text
+- ✅ `embed_many(model_name, texts, batch_size=64)` - Batched embeddings as a float32 matrix (used for the comparison)
 
 ### Parameters:
 - **model_name**: Name of the embedding model (e.g., 'nomic-embed-text')